@@ -110,49 +110,75 @@ Running this gives the result::
              `- ')'
 '''
 
-from lepl.contrib.matchers import SmartSeparator2
-from lepl.core.config import Configuration, ConfigBuilder
-from lepl.core.manager import GeneratorManager
-from lepl.core.trace import RecordDeepest, TraceStack
-from lepl.matchers.combine import And, Or, First, Difference, Limit
-from lepl.matchers.core import Empty, Any, Delayed, Literal, Empty, \
-    Lookahead, Regexp
-from lepl.matchers.complex import PostMatch, Columns, Iterate
-from lepl.matchers.monitor import Trace
-from lepl.matchers.derived import Apply, args, KApply, Join, \
-    AnyBut, Optional, Star, ZeroOrMore, Map, Add, Drop, Repeat, Plus, \
-    OneOrMore, Substitute, Name, Eof, Eos, Identity, Newline, Space, \
-    Whitespace, Digit, Letter, Upper, Lower, Printable, Punctuation, \
-    UnsignedInteger, SignedInteger, Integer, UnsignedFloat, SignedFloat, \
-    UnsignedEFloat, SignedEFloat, Float, UnsignedReal, SignedReal, \
-    UnsignedEReal, SignedEReal, Real, Word, DropEmpty, Literals, \
-    String, SingleLineString, SkipString, SkipTo
-from lepl.matchers.error import Error, make_error, raise_error
-from lepl.matchers.memo import RMemo, LMemo, MemoException
-from lepl.matchers.operators import Override, Separator, SmartSeparator1, \
-    GREEDY, NON_GREEDY, DEPTH_FIRST, BREADTH_FIRST, DroppedSpace, REDUCE
-from lepl.matchers.support import function_matcher, function_matcher_factory, \
-    sequence_matcher, sequence_matcher_factory, \
-    trampoline_matcher, trampoline_matcher_factory
-from lepl.matchers.transform import PostCondition, Transform, Assert
-from lepl.matchers.variables import TraceVariables
-from lepl.lexer.matchers import Token
-from lepl.lexer.support import LexerError, RuntimeLexerError
-from lepl.lexer.lines.matchers import Block, Line, LineStart, LineEnd, \
-    constant_indent, explicit, to_right, ContinuedLineFactory, Extend, \
-    NO_BLOCKS, DEFAULT_POLICY
-from lepl.regexp.core import RegexpError
-from lepl.regexp.matchers import NfaRegexp, DfaRegexp
-from lepl.regexp.unicode import UnicodeAlphabet
-from lepl.stream.core import s_debug, s_deepest, s_delta, s_empty, s_eq, \
-    s_factory, s_fmt, s_global_kargs, s_id, s_join, s_kargs, s_key, \
-    s_len, s_line, s_max, s_next, s_stream
-from lepl.stream.maxdepth import FullFirstMatchException
-from lepl.stream.factory import DEFAULT_STREAM_FACTORY
-from lepl.support.list import List, sexpr_fold, sexpr_throw, sexpr_flatten, \
-    sexpr_to_tree
-from lepl.support.node import Node, make_dict, join_with, node_throw
-from lepl.support.timer import print_timing
+from sys import modules as _modules, version_info as _version_info
+from types import ModuleType as _ModuleType
+
+
+# Names are imported from the sub-modules when they are first used (see
+# _LazyModule below), so that "import lepl" is cheap and programs that use
+# only some of the library do not pay to load (and initialise) the rest.
+
+_EXPORTS = [
+    ('lepl.contrib.matchers', ['SmartSeparator2']),
+    ('lepl.core.config', ['Configuration', 'ConfigBuilder']),
+    ('lepl.core.incremental', ['ParseSession']),
+    ('lepl.core.push', ['PushParser', 'PushParserException']),
+    ('lepl.core.manager', ['GeneratorManager']),
+    ('lepl.core.trace', ['RecordDeepest', 'TraceStack']),
+    ('lepl.matchers.combine', ['And', 'Or', 'First', 'Difference', 'Limit']),
+    ('lepl.matchers.core', ['Empty', 'Any', 'Delayed', 'Literal', 'Lookahead',
+                            'Regexp']),
+    ('lepl.matchers.complex', ['PostMatch', 'Columns', 'Iterate']),
+    ('lepl.matchers.monitor', ['Trace']),
+    ('lepl.matchers.derived', ['Apply', 'args', 'KApply', 'Join', 'AnyBut',
+                               'Optional', 'Star', 'ZeroOrMore', 'Map', 'Add',
+                               'Drop', 'Repeat', 'Plus', 'OneOrMore',
+                               'Substitute', 'Name', 'Eof', 'Eos', 'Identity',
+                               'Newline', 'Space', 'Whitespace', 'Digit',
+                               'Letter', 'Upper', 'Lower', 'Printable',
+                               'Punctuation', 'UnsignedInteger',
+                               'SignedInteger', 'Integer', 'UnsignedFloat',
+                               'SignedFloat', 'UnsignedEFloat', 'SignedEFloat',
+                               'Float', 'UnsignedReal', 'SignedReal',
+                               'UnsignedEReal', 'SignedEReal', 'Real', 'Word',
+                               'DropEmpty', 'Literals', 'String',
+                               'SingleLineString', 'SkipString', 'SkipTo']),
+    ('lepl.matchers.error', ['Error', 'make_error', 'raise_error']),
+    ('lepl.matchers.memo', ['RMemo', 'LMemo', 'MemoException']),
+    ('lepl.matchers.operators', ['Override', 'Separator', 'SmartSeparator1',
+                                 'GREEDY', 'NON_GREEDY', 'DEPTH_FIRST',
+                                 'BREADTH_FIRST', 'DroppedSpace', 'REDUCE']),
+    ('lepl.matchers.support', ['function_matcher', 'function_matcher_factory',
+                               'sequence_matcher', 'sequence_matcher_factory',
+                               'trampoline_matcher',
+                               'trampoline_matcher_factory']),
+    ('lepl.matchers.transform', ['PostCondition', 'Transform', 'Assert']),
+    ('lepl.matchers.variables', ['TraceVariables']),
+    ('lepl.lexer.matchers', ['Token']),
+    ('lepl.lexer.support', ['LexerError', 'RuntimeLexerError']),
+    ('lepl.lexer.lines.matchers', ['Block', 'Line', 'LineStart', 'LineEnd',
+                                   'constant_indent', 'explicit', 'to_right',
+                                   'ContinuedLineFactory', 'Extend',
+                                   'NO_BLOCKS', 'DEFAULT_POLICY']),
+    ('lepl.regexp.core', ['RegexpError']),
+    ('lepl.regexp.matchers', ['NfaRegexp', 'DfaRegexp']),
+    ('lepl.regexp.unicode', ['UnicodeAlphabet']),
+    ('lepl.regexp.byte', ['ByteAlphabet']),
+    ('lepl.stream.core', ['s_debug', 's_deepest', 's_delta', 's_empty', 's_eq',
+                          's_factory', 's_fmt', 's_global_kargs', 's_id',
+                          's_join', 's_kargs', 's_key', 's_len', 's_line',
+                          's_max', 's_next', 's_stream']),
+    ('lepl.stream.maxdepth', ['FullFirstMatchException']),
+    ('lepl.stream.factory', ['DEFAULT_STREAM_FACTORY']),
+    ('lepl.support.list', ['List', 'sexpr_fold', 'sexpr_throw',
+                           'sexpr_flatten', 'sexpr_to_tree', 'sexpr_leaves',
+                           'sexpr_tree_lines']),
+    ('lepl.support.node', ['Node', 'make_dict', 'join_with', 'node_throw']),
+    ('lepl.support.timer', ['print_timing']),
+    ]
+'''
+The exported names, by module.
+'''
 
 __all__ = [
            
@@ -160,6 +186,13 @@ __all__ = [
         'Configuration',
         'ConfigBuilder',
         
+        # lepl.core.incremental
+        'ParseSession',
+        
+        # lepl.core.push
+        'PushParser',
+        'PushParserException',
+        
         # lepl.contrib.matchers
         'SmartSeparator2',
         
@@ -288,6 +321,8 @@ __all__ = [
         'sexpr_throw',
         'sexpr_flatten',
         'sexpr_to_tree',
+        'sexpr_leaves',
+        'sexpr_tree_lines',
         
         # lepl.lexer.matchers
         'Token',
@@ -316,6 +351,9 @@ __all__ = [
         # lepl.regexp.unicode
         'UnicodeAlphabet',
         
+        # lepl.regexp.byte
+        'ByteAlphabet',
+        
         # lepl.stream.core
         's_debug', 
         's_deepest', 
@@ -355,9 +393,57 @@ __all__ = [
         'print_timing'
        ]
 
+
+_MODULES = dict((name, module) 
+                for (module, names) in _EXPORTS for name in names)
+'''
+The module that defines each exported name.
+'''
+
+_SUBPACKAGES = ('apps', 'bin', 'contrib', 'core', 'lexer', 'matchers', 
+                'regexp', 'stream', 'support')
+'''
+Sub-packages that are loaded on attribute access.
+'''
+
+
+class _LazyModule(_ModuleType):
+    '''
+    The type of this module: names in `__all__` are imported on first use
+    (after which they are stored as normal module attributes).
+    '''
+    
+    def __getattr__(self, name):
+        if name in _MODULES:
+            module = __import__(_MODULES[name], fromlist=[name])
+            value = getattr(module, name)
+        elif name in _SUBPACKAGES:
+            value = __import__(__name__ + '.' + name, fromlist=['__name__'])
+        else:
+            raise AttributeError(
+                "module '{0}' has no attribute '{1}'".format(__name__, name))
+        setattr(self, name, value)
+        return value
+    
+    def __dir__(self):
+        return sorted(set(self.__dict__) | set(_MODULES))
+
+
 __version__ = '6.0.0'
 
 if __version__.find('b') > -1:
     from logging import getLogger, basicConfig, WARN
     #basicConfig(level=WARN)
     getLogger('lepl').warn('You are using a BETA version of LEPL.')
+
+# __version__ (like all other names) must be defined before the module is 
+# replaced below
+if _version_info >= (3, 5):
+    _modules[__name__].__class__ = _LazyModule
+else:
+    # older versions cannot change a module's class, so replace the module
+    # (keeping a reference so that the original namespace is not cleared)
+    _lazy = _LazyModule(__name__, __doc__)
+    _lazy.__dict__.update(_modules[__name__].__dict__)
+    _lazy._original = _modules[__name__]
+    _modules[__name__] = _lazy
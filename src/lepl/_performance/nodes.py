@@ -0,0 +1,108 @@
+# The contents of this file are subject to the Mozilla Public License
+# (MPL) Version 1.1 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License
+# at http://www.mozilla.org/MPL/
+#
+# Software distributed under the License is distributed on an "AS IS"
+# basis, WITHOUT WARRANTY OF ANY KIND, either express or implied. See
+# the License for the specific language governing rights and
+# limitations under the License.
+#
+# The Original Code is LEPL (http://www.acooke.org/lepl)
+# The Initial Developer of the Original Code is Andrew Cooke.
+# Portions created by the Initial Developer are Copyright (C) 2009-2010
+# Andrew Cooke (andrew@acooke.org). All Rights Reserved.
+#
+# Alternatively, the contents of this file may be used under the terms
+# of the LGPL license (the GNU Lesser General Public License,
+# http://www.gnu.org/licenses/lgpl.html), in which case the provisions
+# of the LGPL License are applicable instead of those above.
+#
+# If you wish to allow use of your version of this file only under the
+# terms of the LGPL License and not to allow others to use your version
+# of this file under the MPL, indicate your decision by deleting the
+# provisions above and replace them with the notice and other provisions
+# required by the LGPL License.  If you do not delete the provisions
+# above, a recipient may use your version of this file under either the
+# MPL or the LGPL License.
+
+'''
+Measure the memory used by AST nodes.
+
+Large inputs can generate very many `Node` instances, so the size of a 
+single node matters.  This builds a number of small trees of a few typical
+shapes and reports the average number of bytes allocated per node (using
+`tracemalloc`, so Python 3.4 or later is required; otherwise nothing is
+measured):
+
+  python -m lepl._performance.nodes
+'''
+
+from __future__ import print_function
+
+from gc import collect
+from sys import getsizeof
+try:
+    from tracemalloc import start, stop, take_snapshot
+except ImportError:
+    start = None
+
+from lepl import Node
+
+
+class Term(Node): pass
+class Expression(Node): pass
+
+
+def anonymous():
+    '''A node with anonymous children only.'''
+    return Node('1', '+', '2')
+
+def named():
+    '''A node with named pairs.'''
+    return Node(('number', '1'), ('operator', '+'), ('number', '2'))
+
+def nested():
+    '''A node containing node subclasses (three nodes in total).'''
+    return Expression(Term('1'), ('operator', '+'), Term('2'))
+
+
+SHAPES = [(anonymous, 1), (named, 1), (nested, 3)]
+'''Node factories and the number of nodes each creates.'''
+
+
+def bytes_per_node(factory, nodes_per_call, count=10000):
+    '''
+    The average number of bytes allocated for each node (including the
+    lists of children and names, but not the values themselves, which are
+    shared constants).
+    '''
+    collect()
+    start()
+    try:
+        before = take_snapshot()
+        kept = [factory() for _i in range(count)]
+        after = take_snapshot()
+    finally:
+        stop()
+    allocated = sum(stat.size_diff 
+                    for stat in after.compare_to(before, 'filename'))
+    # exclude the list that holds the results
+    allocated -= getsizeof(kept)
+    return allocated / float(count * nodes_per_call)
+
+
+def main():
+    '''
+    Print the bytes per node for each shape.
+    '''
+    if start is None:
+        print('tracemalloc unsupported in this Python version')
+        return
+    for (factory, nodes) in SHAPES:
+        print('{0:10s} {1:8.1f} bytes/node'.format(
+                    factory.__name__, bytes_per_node(factory, nodes)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+# The contents of this file are subject to the Mozilla Public License
+# (MPL) Version 1.1 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License
+# at http://www.mozilla.org/MPL/
+#
+# Software distributed under the License is distributed on an "AS IS"
+# basis, WITHOUT WARRANTY OF ANY KIND, either express or implied. See
+# the License for the specific language governing rights and
+# limitations under the License.
+#
+# The Original Code is LEPL (http://www.acooke.org/lepl)
+# The Initial Developer of the Original Code is Andrew Cooke.
+# Portions created by the Initial Developer are Copyright (C) 2009-2010
+# Andrew Cooke (andrew@acooke.org). All Rights Reserved.
+#
+# Alternatively, the contents of this file may be used under the terms
+# of the LGPL license (the GNU Lesser General Public License,
+# http://www.gnu.org/licenses/lgpl.html), in which case the provisions
+# of the LGPL License are applicable instead of those above.
+#
+# If you wish to allow use of your version of this file only under the
+# terms of the LGPL License and not to allow others to use your version
+# of this file under the MPL, indicate your decision by deleting the
+# provisions above and replace them with the notice and other provisions
+# required by the LGPL License.  If you do not delete the provisions
+# above, a recipient may use your version of this file under either the
+# MPL or the LGPL License.
+
+'''
+Measure the start-up cost of using Lepl.
+
+Each case is a short script run in a new interpreter; we report the best
+wall-clock time (less the time to start an empty interpreter) and the
+number of Lepl modules loaded.  On Python 3.7 or later the cumulative
+import time reported by ``python -X importtime`` is also given:
+
+  python -m lepl._performance.startup
+'''
+
+from __future__ import print_function
+
+from os import environ, pathsep
+from os.path import dirname
+from subprocess import Popen, PIPE
+from sys import executable, version_info
+from time import time
+
+import lepl
+
+
+CASES = [('import', 'import lepl'),
+         ('node', 'from lepl import Node'),
+         ('matchers', 'from lepl import Literal, Delayed, Or'),
+         ('star', 'from lepl import *'),
+         ('parse', 'from lepl import Digit; Digit()[1:,...].parse("1")')]
+'''(name, script) pairs.'''
+
+COUNT = ('; import sys; '
+         'print(len([n for n in sys.modules if n.startswith("lepl")]))')
+
+
+def run(script, options=()):
+    '''
+    Run the script, returning (elapsed time, stdout, stderr).
+    '''
+    env = dict(environ)
+    path = dirname(dirname(lepl.__file__))
+    env['PYTHONPATH'] = pathsep.join(filter(None, 
+                                            [path, env.get('PYTHONPATH')]))
+    begin = time()
+    process = Popen([executable] + list(options) + ['-c', script], 
+                    stdout=PIPE, stderr=PIPE, env=env)
+    (out, err) = process.communicate()
+    elapsed = time() - begin
+    return (elapsed, out.decode('utf8'), err.decode('utf8'))
+
+
+def best_of(repeat, script):
+    '''
+    The shortest time taken to run the script.
+    '''
+    return min(run(script)[0] for _i in range(repeat))
+
+
+def import_time(script):
+    '''
+    The cumulative time (in seconds) reported by -X importtime for lepl,
+    or None if not supported.
+    '''
+    if version_info < (3, 7):
+        return None
+    (_elapsed, _out, err) = run(script, ['-X', 'importtime'])
+    total = 0
+    for line in err.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == 'lepl':
+            total += int(parts[1])
+    return total / 1e6
+
+
+def main(repeat=10):
+    '''
+    Print the start-up cost of each case.
+    '''
+    empty = best_of(repeat, 'pass')
+    print('{0:10s} {1:>10s} {2:>10s} {3:>8s}'.format(
+                'case', 'time', 'importtime', 'modules'))
+    for (name, script) in CASES:
+        elapsed = best_of(repeat, script) - empty
+        modules = run(script + COUNT)[1].strip()
+        imported = import_time(script)
+        print('{0:10s} {1:10.4f} {2:>10s} {3:>8s}'.format(
+                    name, elapsed, 
+                    '-' if imported is None else '{0:.4f}'.format(imported),
+                    modules))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,443 @@
+# The contents of this file are subject to the Mozilla Public License
+# (MPL) Version 1.1 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License
+# at http://www.mozilla.org/MPL/
+#
+# Software distributed under the License is distributed on an "AS IS"
+# basis, WITHOUT WARRANTY OF ANY KIND, either express or implied. See
+# the License for the specific language governing rights and
+# limitations under the License.
+#
+# The Original Code is LEPL (http://www.acooke.org/lepl)
+# The Initial Developer of the Original Code is Andrew Cooke.
+# Portions created by the Initial Developer are Copyright (C) 2009-2010
+# Andrew Cooke (andrew@acooke.org). All Rights Reserved.
+#
+# Alternatively, the contents of this file may be used under the terms
+# of the LGPL license (the GNU Lesser General Public License,
+# http://www.gnu.org/licenses/lgpl.html), in which case the provisions
+# of the LGPL License are applicable instead of those above.
+#
+# If you wish to allow use of your version of this file only under the
+# terms of the LGPL License and not to allow others to use your version
+# of this file under the MPL, indicate your decision by deleting the
+# provisions above and replace them with the notice and other provisions
+# required by the LGPL License.  If you do not delete the provisions
+# above, a recipient may use your version of this file under either the
+# MPL or the LGPL License.
+
+'''
+A benchmark runner for complete parsers.
+
+A catalogue of grammars (each with a generator for fixed input of a given
+size) is run across a set of configurations.  For each grammar,
+configuration and size we record the time to rewrite (compile) the parser,
+the time to parse, the peak memory allocated while parsing (when
+`tracemalloc` is available) and the number of generators created by the
+trampoline (from a separate, profiled run).
+
+Results can be saved as a baseline and later runs compared against it:
+
+  python -m lepl._performance.suite --save baseline.json
+  python -m lepl._performance.suite --baseline baseline.json
+
+The second command exits with a non-zero status if any parse time exceeds
+the baseline by more than the threshold (or if a parse that worked now
+fails), so it can be used to check that a change does not make things
+worse.
+
+Configurations that a grammar does not support (eg those without the 
+lexer, for grammars with tokens), or that it would change into another
+configuration, are skipped.  Other combinations that fail
+are recorded with an error rather than stopping the run.
+'''
+
+from __future__ import print_function
+
+from optparse import OptionParser
+import sys
+
+from lepl import *
+from lepl.apps.rfc3696 import _Email, _HttpUrl
+from lepl.lexer.lines.matchers import Block, Line, explicit
+from lepl.support.lib import fmt
+from lepl.support.timer import best_of, peak_memory, compare, save_json, \
+    load_json
+
+
+# pylint: disable-msg=W0401, W0614
+# (the grammars are written in the usual style)
+
+
+def default(config):
+    '''The default configuration.'''
+    config.default()
+
+def clear(config):
+    '''No rewriters or monitors.'''
+    config.clear()
+
+def low_memory(config):
+    '''The default configuration with reduced memory use.'''
+    config.default().low_memory()
+
+def auto_memoize(config):
+    '''The default configuration with automatic memoisation.'''
+    config.default().auto_memoize()
+
+def no_lexer(config):
+    '''The default configuration without the lexer.'''
+    config.default()
+    config.no_lexer()
+
+
+CONFIGURATIONS = {'default': default, 'clear': clear,
+                  'low_memory': low_memory, 'auto_memoize': auto_memoize,
+                  'no_lexer': no_lexer}
+'''The configurations that can be benchmarked (by name).'''
+
+WITHOUT_LEXER = ('clear', 'no_lexer')
+'''The configurations that cannot be used with tokens.'''
+
+FIELDS = ['grammar', 'config', 'size', 'rewrite', 'parse', 'peak_kb',
+          'generators', 'error']
+'''The fields in each result.'''
+
+
+class Grammar(object):
+    '''
+    A function that creates a matcher, a function that generates a list of
+    inputs of a given size, an optional function to further configure
+    the matcher (called after the configuration being benchmarked), and 
+    the names of configurations that the grammar does not support (which
+    are skipped).
+    '''
+
+    def __init__(self, name, matcher, inputs, configure=None, skip=()):
+        self.name = name
+        self.matcher = matcher
+        self.inputs = inputs
+        self.configure = configure
+        self.skip = skip
+
+    def __str__(self):
+        return self.name
+
+    def build(self, configuration):
+        '''
+        Create and configure a new matcher.
+        '''
+        matcher = self.matcher()
+        configuration(matcher.config)
+        if self.configure:
+            self.configure(matcher.config)
+        return matcher
+
+
+def json():
+    '''
+    The simple JSON parser from `lepl.contrib.json`.
+    '''
+    from lepl.contrib.json import Simple
+    return Simple() & Eos()
+
+
+def json_tokens():
+    '''
+    The JSON parser from `lepl.contrib.json` that uses tokens.
+    '''
+    from lepl.contrib.json import Fast
+    return Fast() & Eos()
+
+
+def json_inputs(size):
+    '''
+    A JSON object containing a list of `size` records.
+    '''
+    records = [fmt('{{"id": {0}, "name": "item {0}", "tags": ["a", "b"], '
+                   '"price": {0}.5e2, "stock": [{0}, 0]}}', i)
+               for i in range(size)]
+    return ['{"items": [' + ', '.join(records) + ']}']
+
+
+def expression():
+    '''
+    Arithmetic expressions, without tokens.
+    '''
+    expr   = Delayed()
+    number = UnsignedEReal()                        > 'number'
+    with DroppedSpace():
+        term    = number | '(' & expr & ')'         > list
+        factor  = term & (Any('*/') & term)[:]      > list
+        expr   += factor & (Any('+-') & factor)[:]  > list
+    return expr & Eos()
+
+
+def token_expression():
+    '''
+    Arithmetic expressions, using tokens (and so the lexer).
+    '''
+    expr   = Delayed()
+    number = Token(UnsignedEReal())                 > 'number'
+    symbol = Token('[^0-9a-zA-Z \t\r\n]')
+    term    = number | symbol('(') & expr & symbol(')') > list
+    factor  = term & (symbol(Any('*/')) & term)[:]  > list
+    expr   += factor & (symbol(Any('+-')) & factor)[:] > list
+    return expr & Eos()
+
+
+def expression_inputs(size):
+    '''
+    An expression with `size` parenthesised terms.
+    '''
+    return [' + '.join(['1.5 * (2 - 3.25e1) / 4'] * size)]
+
+
+def offside():
+    '''
+    Indented blocks (the offside rule), using explicit block policy.
+    '''
+    word  = Token('[a-z]+')
+    block = Delayed()
+    line  = Or(Line(word[1:]), Line(word[1:] & Token(':')) & block) > list
+    block += Block(line[1:])
+    return line[1:]
+
+
+def configure_offside(config):
+    '''
+    Offside grammars must use the line-aware lexer.
+    '''
+    config.lines(block_policy=explicit)
+
+
+def offside_inputs(size):
+    '''
+    `size` nested groups of indented lines.
+    '''
+    lines = []
+    for _i in range(size):
+        lines.extend(['group one:', ' alpha beta', ' nested two:',
+                      '  gamma delta', '  epsilon', ' zeta'])
+    return ['\n'.join(lines) + '\n']
+
+
+def email():
+    '''
+    RFC 3696 email addresses.
+    '''
+    return _Email() & Eos()
+
+
+def email_inputs(size):
+    '''
+    `size` email addresses.
+    '''
+    return [fmt('first.last{0}@sub{0}.example.com', i) for i in range(size)]
+
+
+def url():
+    '''
+    RFC 3696 HTTP URLs.
+    '''
+    return _HttpUrl() & Eos()
+
+
+def url_inputs(size):
+    '''
+    `size` HTTP URLs.
+    '''
+    return [fmt('http://www.example{0}.com:80/path/to/page{0}.html?a={0}', i)
+            for i in range(size)]
+
+
+def frames():
+    '''
+    Ethernet frame headers (binary parsing, from `lepl.bin`).
+    '''
+    from lepl.bin import BEnd, Const
+    preamble  = ~Const('0b10101010')[7]
+    start_    = ~Const('0b10101011')
+    destn     = BEnd(6.0)
+    source    = BEnd(6.0)
+    ethertype = ~Const('0800x0')
+    header    = preamble & start_ & destn & source & ethertype > list
+    return header[1:] & Eos()
+
+
+def frame_inputs(size):
+    '''
+    `size` consecutive frame headers.
+    '''
+    from lepl.bin import BitString
+    header = bytes(bytearray([0xaa] * 7 + [0xab] + list(range(1, 13))
+                             + [0x08, 0x00]))
+    return [BitString.from_bytearray(header * size)]
+
+
+CATALOGUE = [
+    Grammar('json', json, json_inputs),
+    Grammar('json-tokens', json_tokens, json_inputs, skip=WITHOUT_LEXER),
+    Grammar('expression', expression, expression_inputs),
+    Grammar('token-expression', token_expression, expression_inputs,
+            skip=WITHOUT_LEXER),
+    # configure_offside() adds the lexer, so no_lexer would repeat default
+    Grammar('offside', offside, offside_inputs, configure_offside,
+            skip=('no_lexer',)),
+    Grammar('rfc3696-email', email, email_inputs),
+    Grammar('rfc3696-url', url, url_inputs),
+    Grammar('binary', frames, frame_inputs),
+]
+'''The default grammars.'''
+
+SIZES = [10, 100]
+'''The default sizes.'''
+
+
+def count_generators(grammar, configuration, inputs):
+    '''
+    The number of generators created by the trampoline when parsing the
+    inputs (measured with `ConfigBuilder.profile()`).
+    '''
+    matcher = grammar.build(configuration)
+    matcher.config.profile()
+    parser = matcher.get_parse()
+    for value in inputs:
+        parser(value)
+    return sum(profile.calls
+               for profile in matcher.config.profiler.profiles())
+
+
+def measure(grammar, name, size, repeat=3, memory=True, generators=True):
+    '''
+    Measure a single grammar, configuration and size.
+    '''
+    result = dict((field, None) for field in FIELDS)
+    result.update(grammar=grammar.name, config=name, size=size)
+    configuration = CONFIGURATIONS[name]
+    inputs = grammar.inputs(size)
+    try:
+        matcher = grammar.build(configuration)
+        result['rewrite'] = best_of(repeat, matcher.get_parse,
+                                    matcher.config.clear_cache)
+        # memoisation tables persist between parses (of equal input) so
+        # each parse uses a new parser
+        parsers = []
+        def rebuild():
+            matcher.config.clear_cache()
+            parsers[:] = [matcher.get_parse()]
+        def parse():
+            for value in inputs:
+                if parsers[0](value) is None:
+                    raise ValueError(fmt('No match for {0!r}', value))
+        result['parse'] = best_of(repeat, parse, rebuild)
+        if memory:
+            rebuild()
+            result['peak_kb'] = peak_memory(parse)
+        if generators:
+            result['generators'] = \
+                count_generators(grammar, configuration, inputs)
+    except Exception as error: # pylint: disable-msg=W0703
+        result['error'] = fmt('{0}: {1}', type(error).__name__,
+                              str(error).split('\n')[0])
+    return result
+
+
+def format_result(result):
+    '''
+    A single line summary of a result.
+    '''
+    if result['error']:
+        return fmt('{0:16s} {1:12s} {2:6d}  {3}', result['grammar'],
+                   result['config'], result['size'], result['error'])
+    else:
+        return fmt('{0:16s} {1:12s} {2:6d} {3:9.4f} {4:9.4f} {5:>10s} {6:>9s}',
+                   result['grammar'], result['config'], result['size'],
+                   result['rewrite'], result['parse'],
+                   '-' if result['peak_kb'] is None
+                       else fmt('{0:.1f}', result['peak_kb']),
+                   '-' if result['generators'] is None
+                       else str(result['generators']))
+
+
+def run(grammars=None, configs=None, sizes=None, repeat=3, memory=True,
+        generators=True, max_secs=5.0, trace=False):
+    '''
+    Run the benchmarks, returning a list of results.  `configs` is a list
+    of names from `CONFIGURATIONS`.  Larger sizes are skipped once a parse
+    takes more than `max_secs`.
+    '''
+    grammars = CATALOGUE if grammars is None else grammars
+    configs = sorted(CONFIGURATIONS) if configs is None else configs
+    sizes = SIZES if sizes is None else sizes
+    results = []
+    for grammar in grammars:
+        for name in configs:
+            if name in grammar.skip:
+                continue
+            for size in sorted(sizes):
+                result = measure(grammar, name, size, repeat=repeat,
+                                 memory=memory, generators=generators)
+                results.append(result)
+                if trace:
+                    print(format_result(result))
+                if result['error'] or result['parse'] > max_secs:
+                    break
+    return results
+
+
+def key(result):
+    '''
+    Identify a result (for comparison between runs).
+    '''
+    return (result['grammar'], result['config'], result['size'])
+
+
+def main(args=None):
+    '''
+    Run from the command line.  Returns a non-zero value if the comparison
+    with a baseline fails.
+    '''
+    parser = OptionParser(usage='%prog [options]')
+    parser.add_option('-g', '--grammar', action='append', dest='grammars',
+                      help='grammar to run (repeat for more; default all)')
+    parser.add_option('-c', '--config', action='append', dest='configs',
+                      help='configuration (repeat for more; default all)')
+    parser.add_option('-s', '--size', action='append', dest='sizes',
+                      type='int', help='input size (repeat for more)')
+    parser.add_option('-r', '--repeat', type='int', default=3,
+                      help='number of timings (the best is used)')
+    parser.add_option('--no-memory', action='store_false', dest='memory',
+                      default=True, help='do not measure memory')
+    parser.add_option('--no-generators', action='store_false',
+                      dest='generators', default=True,
+                      help='do not count generators')
+    parser.add_option('--save', help='save results as a baseline (JSON)')
+    parser.add_option('--baseline', help='baseline (JSON) to compare')
+    parser.add_option('--threshold', type='float', default=1.25,
+                      help='slow-down ratio that fails the comparison')
+    (options, _) = parser.parse_args(args)
+    grammars = CATALOGUE
+    if options.grammars:
+        grammars = [grammar for grammar in CATALOGUE
+                    if grammar.name in options.grammars]
+    print(fmt('{0:16s} {1:12s} {2:>6s} {3:>9s} {4:>9s} {5:>10s} {6:>9s}',
+              'grammar', 'config', 'size', 'rewrite', 'parse', 'peak_kb',
+              'generators'))
+    results = run(grammars, options.configs, options.sizes,
+                  repeat=options.repeat, memory=options.memory,
+                  generators=options.generators, trace=True)
+    if options.save:
+        save_json(results, options.save)
+    if options.baseline:
+        failures = compare(load_json(options.baseline), results, key,
+                           options.threshold, 'parse')
+        for (ident, before, after) in failures:
+            print(fmt('FAIL {0}: {1} -> {2}', ident, before, after))
+        print('FAIL' if failures else 'PASS')
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -43,6 +43,7 @@ import lepl
 # pylint: disable-msg=E0611, W0401
 #@PydevCodeAnalysisIgnore
 import lepl._test.bug_stalled_parser
+import lepl._test.lazy
 import lepl._test.magus
 import lepl._test.wrong_cache_bug
 import lepl._test.wrong_depth_bug
@@ -0,0 +1,88 @@
+
+# The contents of this file are subject to the Mozilla Public License
+# (MPL) Version 1.1 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License
+# at http://www.mozilla.org/MPL/
+#
+# Software distributed under the License is distributed on an "AS IS"
+# basis, WITHOUT WARRANTY OF ANY KIND, either express or implied. See
+# the License for the specific language governing rights and
+# limitations under the License.
+#
+# The Original Code is LEPL (http://www.acooke.org/lepl)
+# The Initial Developer of the Original Code is Andrew Cooke.
+# Portions created by the Initial Developer are Copyright (C) 2009-2010
+# Andrew Cooke (andrew@acooke.org). All Rights Reserved.
+#
+# Alternatively, the contents of this file may be used under the terms
+# of the LGPL license (the GNU Lesser General Public License,
+# http://www.gnu.org/licenses/lgpl.html), in which case the provisions
+# of the LGPL License are applicable instead of those above.
+#
+# If you wish to allow use of your version of this file only under the
+# terms of the LGPL License and not to allow others to use your version
+# of this file under the MPL, indicate your decision by deleting the
+# provisions above and replace them with the notice and other provisions
+# required by the LGPL License.  If you do not delete the provisions
+# above, a recipient may use your version of this file under either the
+# MPL or the LGPL License.
+
+'''
+Tests for the lazy loading of names in the lepl package.
+'''
+
+from subprocess import Popen, PIPE
+from sys import executable
+from unittest import TestCase
+
+import lepl
+
+
+def run(script):
+    '''
+    Run a script in a new interpreter, returning the output.
+    '''
+    process = Popen([executable, '-c', script], stdout=PIPE, stderr=PIPE)
+    (out, _err) = process.communicate()
+    assert process.returncode == 0, _err
+    return out.decode('ascii').strip()
+
+
+class LazyTest(TestCase):
+    
+    def test_all(self):
+        for name in lepl.__all__:
+            value = getattr(lepl, name)
+            module = __import__(lepl._MODULES[name], fromlist=[name])
+            assert value is getattr(module, name), name
+        assert set(lepl._MODULES) == set(lepl.__all__)
+        
+    def test_dir(self):
+        names = dir(lepl)
+        assert 'Node' in names
+        assert '__version__' in names
+        
+    def test_missing(self):
+        try:
+            lepl.NoSuchMatcher
+            assert False, 'expected error'
+        except AttributeError:
+            pass
+        
+    def test_subpackage(self):
+        assert lepl.matchers.core.Literal is lepl.Literal
+        
+    def test_import(self):
+        loaded = run('import sys, lepl; '
+                     'print(len([n for n in sys.modules '
+                     'if n.startswith("lepl.") '
+                     'and sys.modules[n] is not None]))')
+        assert loaded == '0', loaded
+        loaded = run('import sys; from lepl import Node; '
+                     'print("lepl.matchers.core" in sys.modules)')
+        assert loaded == 'False', loaded
+        
+    def test_star(self):
+        result = run('from lepl import *; '
+                     'print(Digit()[1:,...].parse("123"))')
+        assert result == "['123']", result
@@ -1,5 +1,9 @@
 
-from lepl.apps.json import Simple
+from unittest import TestCase
+
+from lepl.apps.json import Simple, Fast, ArrayElements
+from lepl.lexer.support import LexerError
+from lepl.stream.maxdepth import FullFirstMatchException
 from lepl._test.base import BaseTest
 
 
@@ -28,3 +32,44 @@ class JsonTest(BaseTest):
     def test_spaces(self):
         self.assert_direct('{"a": 1, "b":"c","d"  : [ 2, 3.]}', Simple(),
                            [[{'a': 1.0, 'b': 'c', 'd': [2.0, 3.0]}]])
+
+
+class FastTest(BaseTest):
+    
+    def test_same(self):
+        for text in ['"abc"', '123', '[1,2,[3,4],[[5], 6]]', '{"a": 1}',
+                     '{"a": 1, "b": [2,3]}', '[]', '{}', '[true, false, null]',
+                     '{"a": 1, "b":"c","d"  : [ 2, 3.]}']:
+            self.assertEqual(Simple().parse(text), Fast().parse(text), text)
+    
+    def test_escapes(self):
+        assert Fast().parse(r'"a\"b\\c\u0041\/\n"') == ['a"b\\cA/\n']
+        for text in (r'"\x"', r'"\u12"', r'"\u12g4"'):
+            self.assertRaises(LexerError, Fast().parse, text)
+        
+    def test_error(self):
+        self.assertRaises(FullFirstMatchException, 
+                          lambda: Fast().parse('[1,]'))
+        
+
+class ArrayElementsTest(TestCase):
+    
+    def test_elements(self):
+        elements = ArrayElements()
+        assert list(elements('[1, "a", [2, {"b": null}], true]')) == \
+            [1.0, 'a', [2.0, {'b': None}], True], \
+            list(elements('[1, "a", [2, {"b": null}], true]'))
+        assert list(elements('[]')) == []
+        assert list(elements(' [ [ ] ] ')) == [[]]
+        assert list(elements('["a", "]", "b"]')) == ['a', ']', 'b']
+        assert list(elements('["]"]')) == [']']
+    
+    def test_errors(self):
+        elements = ArrayElements()
+        generator = elements('[1, 2,]')
+        assert next(generator) == 1.0
+        assert next(generator) == 2.0
+        self.assertRaises(FullFirstMatchException, lambda: next(generator))
+        self.assertRaises(ValueError, lambda: list(elements('{"a": 1}')))
+        self.assertRaises(FullFirstMatchException, 
+                          lambda: list(elements('[1, 2')))
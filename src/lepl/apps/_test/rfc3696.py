@@ -36,7 +36,8 @@ from logging import basicConfig, DEBUG
 from lepl import *
 from lepl._test.base import BaseTest
 from lepl.apps.rfc3696 import _PreferredFullyQualifiedDnsName, _EmailLocalPart,\
-    _Email, _HttpUrl, MailToUrl, HttpUrl, Email, _IpV4Address, _Ipv6Address
+    _Email, _HttpUrl, MailToUrl, HttpUrl, Email, _IpV4Address, _Ipv6Address, \
+    _matcher_to_validator
 
 
 class DnsNameTest(BaseTest):
@@ -80,6 +81,7 @@ class IpV4AddressTest(BaseTest):
         self.assert_fail('1.256.3.4', address)
         self.assert_fail('1.a.3.4', address)
         self.assert_fail('1.-1.3.4', address)
+        self.assert_fail('1x2.3.4', address)
         
         
 class IpV6AddressTest(BaseTest):
@@ -271,3 +273,40 @@ class MailToUrlTest(BaseTest):
         assert mailToUrl('mailto:$A12345@example.com')
         assert mailToUrl('mailto:!def!xyz%25abc@example.com')
         assert mailToUrl('mailto:_somename@example.com')
+        assert list(mailToUrl.validate_many(['mailto:a@b.c', 'a@b.c'])) == \
+            [True, False]
+
+
+class ValidatorTest(BaseTest):
+    '''
+    The validators use a regular expression before the matchers; the 
+    results should be the same as the matchers alone.
+    '''
+    
+    def assert_same(self, validator, factory, values):
+        matcher = _matcher_to_validator(factory)
+        expected = [matcher(value) for value in values]
+        assert list(validator.validate_many(values)) == expected
+        assert True in expected and False in expected
+        
+    def test_email(self):
+        self.assert_same(Email(), _Email, 
+            ['a@b.com', 'a.b@c.d', '"a b"@x.org', r'a\@b@c.de', 'x@1.2.c', 
+             '.a.@b.c', '.ab@c.d', 'a..b@c.d', '"a"."b"@c.d', 'a@b-c.d-e.f', 
+             'a@b.12', 'a@b.12a', 'a@1.2', 'a@b.c\n', None, 
+             'ab@' + 'c' * 63 + '.com', 'ab@' + 'c' * 64 + '.com', 
+             'a' * 64 + '@b.c', 'a' * 65 + '@b.c', 
+             'a@' + 'b.' * 127 + 'c', 'a@' + 'b.' * 128 + 'c'])
+        
+    def test_http_url(self):
+        self.assert_same(HttpUrl(), _HttpUrl,
+            ['http://a.b', 'http://1.2.3.4', 'http://1.2.3.4a', 
+             'http://1.2.3.256', 'http://1.2.3.255:80/x/y?z#w', 
+             'http://1.2.3.25a', 'http://[::1]/', 'http://[1:2:3:4:5:6:7:8]', 
+             'http://[1::2:3:4:5:6:7]', 'http://[1:2::3:4:5:6:7:8]', 
+             'http://[::1.2.3.4]', 'http://[1:2:3:4:5:6:1.2.3.4]', 
+             'http://[1::2:3:4:1.2.3.4]', 'http://[1::2:3:41.2.3.4]', 
+             'http://[1::2:3:4:5:1.2.3.4]', 'http://[1::2:3:4:5:6:1.2.3.4]', 
+             'http://[::1.2.3.256]', 'http://a.b/%41b/c/', 'http://a.b/a//b', 
+             'http://a.b/?a/b#c', 'http://a.b#x', 'http://a.b/%4', 
+             'http://' + 'a' * 64 + '.com', 'http://a.' + 'b' * 63])
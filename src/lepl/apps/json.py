@@ -31,5 +31,5 @@
 Punt to the contrib package (this is just to keep copyright clear).
 '''
 
-from lepl.contrib.json import Simple
+from lepl.contrib.json import Simple, Fast, ArrayElements
 
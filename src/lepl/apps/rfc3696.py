@@ -36,13 +36,21 @@ just useful practical approximations.  Read RFC3696 to see what I mean
 (or the quotes from that doc in the source below).
 '''
 
-from re import compile as compile_
+from re import compile as compile_, escape
 from string import ascii_letters, digits, printable, whitespace
 
 from lepl import *
 
     
 _HEX = digits + 'abcdef' + 'ABCDEF'
+_LD = ascii_letters + digits
+_LDH = _LD + '-'
+_UNESCAPED = ascii_letters + digits + "!#$%&'*+-/=?^_`.{|}~"
+_ESCAPABLE = _UNESCAPED + r'@\",[] '
+_QUOTABLE = _UNESCAPED + r'@\,[] '
+_PATH = ''.join(set(printable).difference(set(whitespace))
+                              .difference('/;?<>#%'))
+_OTHER = _PATH + '/'
 
 
 def _guarantee_bool(function):
@@ -100,6 +108,150 @@ def _LimitCount(matcher, char, max):
     return PostCondition(matcher, lambda results: results[0].count(char) <= max) 
 
 
+def _chars(chars):
+    '''
+    A regular expression that matches any one of the characters.
+    '''
+    return '[' + ''.join(escape(char) for char in chars) + ']'
+
+def _repeat(pattern, min, max, separator):
+    '''
+    A regular expression equivalent to ``matcher[min:max, separator, ...]``
+    (where `max` is None for no limit).
+    '''
+    return '{0}(?:{1}{0}){{{2},{3}}}'.format(
+        pattern, escape(separator), min - 1, '' if max is None else max - 1)
+
+
+# Regular expressions for the matchers below, without the PostConditions.
+# Alternatives and repetitions are in the same order as the matchers, so
+# the first match is the first match of the matcher unless a PostCondition
+# would reject it (see _Validator).
+
+_DNS_LABEL = '{0}(?:{1}*{0})?'.format(_chars(_LD), _chars(_LDH))
+_DNS_NAME = '(?P<dns>{0}\\.{1})'.format(
+    _repeat(_DNS_LABEL, 1, None, '.'), _DNS_LABEL)
+
+def _ipv4(name):
+    '''
+    A regular expression for `_IpV4Address()`, in the named group.
+    '''
+    return '(?P<' + name + '>' + _repeat('[0-9]+', 4, 4, '.') + ')'
+
+_IPV6_PIECE = _chars(_HEX) + '{1,4}'
+_IPV6 = '(?:{0}|{1}|{2})'.format(
+    _repeat(_IPV6_PIECE, 8, 8, ':'),
+    '(?P<compact>{0}::{0})|::{1}|{1}::|::'.format(
+        _repeat(_IPV6_PIECE, 1, 6, ':'), _repeat(_IPV6_PIECE, 1, 7, ':')),
+    # the matcher for the second alternative is compiled to a single regular
+    # expression, so cannot backtrack into the IPv4 address; the lookahead
+    # and back-reference do the same here
+    '(?:{0}:|(?=(?P<alternate>{1}::{1}))(?P=alternate)|::{2}:|{2}::|::){3}'
+    .format(
+        _repeat(_IPV6_PIECE, 6, 6, ':'), _repeat(_IPV6_PIECE, 1, 4, ':'),
+        _repeat(_IPV6_PIECE, 1, 5, ':'), _ipv4('ipv6v4')))
+
+_LOCAL_PART = '(?P<local>"{0}+"|(?:\\\\{1}|{2})+)'.format(
+    _chars(_QUOTABLE), _chars(_ESCAPABLE), _chars(_UNESCAPED))
+
+_EMAIL = _LOCAL_PART + '@' + _DNS_NAME
+
+_HTTP_URL = 'http://(?:{0}|\\[{1}\\]|{2})(?::[0-9]+)?' \
+            '(?:/(?:{3}/?)?(?:\\?{4})?(?:#{4})?)?'.format(
+    _ipv4('ipv4'), _IPV6, _DNS_NAME,
+    _repeat('(?:%{0}{{2}}|{1})+'.format(_chars(_HEX), _chars(_PATH)), 
+            1, None, '/'),
+    '(?:%{0}{{2}}|{1})+'.format(_chars(_HEX), _chars(_OTHER)))
+
+_NUMERIC = compile_(r'^[0-9]+$')
+_NUMERIC_NAME = compile_(r'^[0-9\.]+$')
+_EXTREME_DOT = compile_(r'"?\..*\."?')
+_DOUBLE_DOT = compile_(r'.*\."*\..*')
+
+
+def _dns_name_ok(name):
+    '''
+    The PostConditions from `_PreferredFullyQualifiedDnsName()`.
+    '''
+    labels = name.split('.')
+    return len(name) <= 255 and not _NUMERIC_NAME.match(name) \
+        and not _NUMERIC.match(labels[-1]) \
+        and all(len(label) <= 63 for label in labels)
+
+def _ipv4_ok(address):
+    '''
+    The PostConditions from `_IpV4Address()`.
+    '''
+    return address is None \
+        or all(int(octet) <= 255 for octet in address.split('.'))
+
+def _email_ok(match):
+    '''
+    The PostConditions from `_Email()`.
+    '''
+    local = match.group('local')
+    return len(local) <= 64 and not _EXTREME_DOT.match(local) \
+        and not _DOUBLE_DOT.match(local) and _dns_name_ok(match.group('dns'))
+
+def _http_url_ok(match):
+    '''
+    The PostConditions from `_HttpUrl()`.
+    '''
+    (ipv4, ipv6v4, compact, alternate, dns) = \
+        match.group('ipv4', 'ipv6v4', 'compact', 'alternate', 'dns')
+    return _ipv4_ok(ipv4) and _ipv4_ok(ipv6v4) \
+        and (compact is None or compact.count(':') <= 7) \
+        and (alternate is None or alternate.count(':') <= 5) \
+        and (dns is None or _dns_name_ok(dns))
+
+
+class _Validator(object):
+    '''
+    A validator that uses a regular expression, with simple checks in place
+    of the PostConditions, before the matcher (which is slower).
+    
+    The matcher succeeds if its first match consumes all the input.  If 
+    the regular expression does not match then neither does the matcher.  
+    If it matches, and the checks pass, then it found the matcher's first
+    match.  Otherwise (when a PostCondition would reject the first match, 
+    and the matcher would continue to search) the matcher is called, so 
+    the result is always the same as the matcher alone.
+    '''
+    
+    def __init__(self, pattern, check, factory):
+        self.__match = compile_(pattern).match
+        self.__check = check
+        self.__factory = factory
+        self.__matcher = None
+        
+    def __slow(self, value):
+        '''
+        Call the matcher (built when first needed).
+        '''
+        if self.__matcher is None:
+            self.__matcher = _matcher_to_validator(self.__factory)
+        return self.__matcher(value)
+        
+    @_guarantee_bool
+    def __call__(self, value):
+        if '\n' in value or '\r' in value:
+            return False
+        match = self.__match(value)
+        if not match:
+            return False
+        elif self.__check(match):
+            return match.end() == len(value)
+        else:
+            return self.__slow(value)
+        
+    def validate_many(self, values):
+        '''
+        Generate True or False for each value in turn.
+        '''
+        for value in values:
+            yield self(value)
+
+
 def _PreferredFullyQualifiedDnsName():
     '''
     A matcher for DNS names.
@@ -150,8 +302,8 @@ def _PreferredFullyQualifiedDnsName():
     can be accommodated.  A complete, fully-qualified, domain name must
     not exceed 255 octets.
     '''
-    ld = Any(ascii_letters + digits)
-    ldh = ld | '-'
+    ld = Any(_LD)
+    ldh = Any(_LDH)
     label = ld + Optional(ldh[:] + ld)
     short_label = _LimitLength(label, 63)
     tld = _RejectRegexp(short_label, r'^[0-9]+$')
@@ -169,7 +321,7 @@ def _IpV4Address():
     on numerical values, but it must be 255.
     '''
     octet = _LimitIntValue(Any(digits)[1:, ...], 255)
-    address = octet[4, '.', ...]
+    address = octet[4, r'\.', ...]
     return address
 
 
@@ -308,12 +460,8 @@ def _EmailLocalPart():
     addresses which are that long, even though they are rarely
     encountered.
     '''
-    unescaped_chars = ascii_letters + digits + "!#$%&'*+-/=?^_`.{|}~"
-    escapable_chars = unescaped_chars + r'@\",[] '
-    quotable_chars = unescaped_chars + r'@\,[] '
-    unquoted_string = (('\\' + Any(escapable_chars)) 
-                       | Any(unescaped_chars))[1:, ...]
-    quoted_string = '"' + Any(quotable_chars)[1:, ...] + '"'
+    unquoted_string = (('\\' + Any(_ESCAPABLE)) | Any(_UNESCAPED))[1:, ...]
+    quoted_string = '"' + Any(_QUOTABLE)[1:, ...] + '"'
     local_part = quoted_string | unquoted_string
     no_extreme_dot = _RejectRegexp(local_part, r'"?\..*\."?')
     no_double_dot = _RejectRegexp(no_extreme_dot, r'.*\."*\..*')
@@ -331,9 +479,10 @@ def _Email():
 def Email():
     '''
     Generate a validator for emails, according to RFC3696, which returns True
-    if the email is valid, and False otherwise.
+    if the email is valid, and False otherwise.  The validator's 
+    `validate_many()` method checks a series of values.
     '''
-    return _matcher_to_validator(_Email)
+    return _Validator(_EMAIL, _email_ok, _Email)
     
 
 def _HttpUrl():
@@ -397,11 +546,8 @@ def _HttpUrl():
     the first of these may be used unencoded, and is often used within
     the path, to designate hierarchy.
     '''
-    path_chars = ''.join(set(printable).difference(set(whitespace))
-                                       .difference('/;?<>#%'))
-    other_chars = path_chars + '/'
-    path_string = ('%' + Any(_HEX)[2, ...] | Any(path_chars))[1:, ...]
-    other_string = ('%' + Any(_HEX)[2, ...] | Any(other_chars))[1:, ...]
+    path_string = ('%' + Any(_HEX)[2, ...] | Any(_PATH))[1:, ...]
+    other_string = ('%' + Any(_HEX)[2, ...] | Any(_OTHER))[1:, ...]
     
     host = _IpV4Address() | ('[' + _Ipv6Address() + ']') | \
             _PreferredFullyQualifiedDnsName()
@@ -419,9 +565,10 @@ def _HttpUrl():
 def HttpUrl():
     '''
     Generate a validator for HTTP URLs, according to RFC3696, which returns 
-    True if the email is valid, and False otherwise.
+    True if the email is valid, and False otherwise.  The validator's 
+    `validate_many()` method checks a series of values.
     '''
-    return _matcher_to_validator(_HttpUrl)
+    return _Validator(_HTTP_URL, _http_url_ok, _HttpUrl)
 
 
 def MailToUrl():
@@ -457,8 +604,7 @@ def MailToUrl():
     
     MAIL_TO = 'mailto:'
     encoded_token = compile_('(%.{0,2})')
-    email = _Email()
-    email.config.compile_to_re()
+    email = Email()
     
     @_guarantee_bool
     def validator(url):
@@ -474,6 +620,14 @@ def MailToUrl():
                 return chunk
         url = ''.join(unpack(chunk) for chunk in encoded_token.split(url))
         assert url
-        return email.parse(url)
-
+        return email(url)
+    
+    def validate_many(urls):
+        '''
+        Generate True or False for each URL in turn.
+        '''
+        for url in urls:
+            yield validator(url)
+    
+    validator.validate_many = validate_many
     return validator
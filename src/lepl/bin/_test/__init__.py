@@ -40,3 +40,4 @@ import lepl.bin._test.bits
 import lepl.bin._test.encode
 import lepl.bin._test.literal
 import lepl.bin._test.matchers
+import lepl.bin._test.stream
@@ -0,0 +1,100 @@
+
+# The contents of this file are subject to the Mozilla Public License
+# (MPL) Version 1.1 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License
+# at http://www.mozilla.org/MPL/
+#
+# Software distributed under the License is distributed on an "AS IS"
+# basis, WITHOUT WARRANTY OF ANY KIND, either express or implied. See
+# the License for the specific language governing rights and
+# limitations under the License.
+#
+# The Original Code is LEPL (http://www.acooke.org/lepl)
+# The Initial Developer of the Original Code is Andrew Cooke.
+# Portions created by the Initial Developer are Copyright (C) 2009-2010
+# Andrew Cooke (andrew@acooke.org). All Rights Reserved.
+#
+# Alternatively, the contents of this file may be used under the terms
+# of the LGPL license (the GNU Lesser General Public License,
+# http://www.gnu.org/licenses/lgpl.html), in which case the provisions
+# of the LGPL License are applicable instead of those above.
+#
+# If you wish to allow use of your version of this file only under the
+# terms of the LGPL License and not to allow others to use your version
+# of this file under the MPL, indicate your decision by deleting the
+# provisions above and replace them with the notice and other provisions
+# required by the LGPL License.  If you do not delete the provisions
+# above, a recipient may use your version of this file under either the
+# MPL or the LGPL License.
+
+'''
+Tests for the lepl.bin.stream module.
+'''
+
+if bytes is str:
+    print('Binary parsing unsupported in this Python version')
+else:
+
+    from random import Random
+    from unittest import TestCase
+    
+    from lepl.bin import *
+    from lepl.bin.matchers import LEnd, ByteArray, String
+    from lepl.bin.stream import BitHelper
+    from lepl.stream.factory import DEFAULT_STREAM_FACTORY
+    
+    
+    # pylint: disable-msg=C0103, C0111, C0301
+    # (dude this is just a test)
+    
+    class BitHelperTest(TestCase):
+        
+        def test_factory(self):
+            (state, helper) = DEFAULT_STREAM_FACTORY(BitString.from_int(3))
+            assert state == 0
+            assert isinstance(helper, BitHelper), helper
+        
+        def test_random(self):
+            '''
+            Direct reads agree with BitString conversions (including when 
+            the BitString has an internal offset).
+            '''
+            random = Random(0)
+            for _trial in range(100):
+                data = bytes(random.randrange(256) 
+                             for _ in range(random.randrange(1, 10)))
+                bits = BitString.from_bytearray(data)[random.randrange(8):]
+                (_, helper) = DEFAULT_STREAM_FACTORY(bits)
+                for _read in range(10):
+                    if not len(bits):
+                        break
+                    start = random.randrange(len(bits))
+                    length = random.randrange(1, len(bits) - start + 1)
+                    expected = bits[start:start+length]
+                    (value, (state, _)) = helper.int(start, length)
+                    assert value == expected.to_int(), (value, expected)
+                    assert len(value) == length
+                    assert state == start + length
+                    (value, _) = helper.bytes(start, length)
+                    assert value == expected.to_bytes(), (value, expected)
+                    if not length % 8:
+                        (value, _) = helper.int(start, length, True)
+                        assert value == expected.to_int(big_endian=True)
+                        
+        def test_end(self):
+            (_, helper) = DEFAULT_STREAM_FACTORY(BitString.from_int(3, 8))
+            try:
+                helper.int(1, 8)
+                assert False, 'expected error'
+            except StopIteration:
+                pass
+            
+        def test_matchers(self):
+            data = BitString.from_bytearray(b'\x12\x34abc\xff')
+            matcher = BEnd(16) & LEnd(4) & LEnd(4) & ByteArray(8) & \
+                      String(8) & Const('0xff', 8)
+            matcher.config.no_full_first_match()
+            result = matcher.parse(data)
+            assert result == [0x1234, 1, 6, b'b', 'c', 
+                              BitString.from_int('0xff', 8)], result
+            assert isinstance(result[0], Int) and len(result[0]) == 16
@@ -83,11 +83,12 @@ else:
         '''
         
         def __new__(cls, value, length):
-            return super(Int, cls).__new__(cls, str(value), 0)
-        
-        def __init__(self, value, length):
-            super(Int, self).__init__()
+            if isinstance(value, int):
+                self = super(Int, cls).__new__(cls, value)
+            else:
+                self = super(Int, cls).__new__(cls, str(value), 0)
             self.__length = length
+            return self
             
         def __len__(self):
             return self.__length
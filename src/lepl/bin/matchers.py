@@ -38,6 +38,7 @@ if bytes is str:
 else:
 
     from lepl.bin.bits import unpack_length, BitString, STRICT
+    from lepl.bin.stream import BitHelper
     from lepl.matchers.support import OperatorMatcher
     from lepl.core.parser import tagged
     from lepl.stream.core import s_next
@@ -65,6 +66,8 @@ else:
             '''
             super(_Constant, self).__init__()
             self._arg(value=value)
+            # for comparison with values read directly by BitHelper
+            self.__int = value.to_int()
             
         @tagged
         def _match(self, stream):
@@ -75,9 +78,15 @@ else:
             Need to be careful here to use only the restricted functionality
             provided by the stream interface.
             '''
-            (value, next_stream) = s_next(stream, count=len(self.value))
-            if self.value == value:
-                yield ([self.value], next_stream)
+            (state, helper) = stream
+            if isinstance(helper, BitHelper):
+                (value, next_stream) = helper.int(state, len(self.value))
+                if self.__int == value:
+                    yield ([self.value], next_stream)
+            else:
+                (value, next_stream) = s_next(stream, count=len(self.value))
+                if self.value == value:
+                    yield ([self.value], next_stream)
             
             
     class Const(_Constant):
@@ -112,8 +121,13 @@ else:
             Need to be careful here to use only the restricted functionality
             provided by the stream interface.
             '''
-            (value, next_stream) = s_next(stream, count=self.length)
-            yield ([self._convert(value)], next_stream)
+            (state, helper) = stream
+            if isinstance(helper, BitHelper):
+                (value, next_stream) = self._read(helper, state)
+            else:
+                (value, next_stream) = s_next(stream, count=self.length)
+                value = self._convert(value)
+            yield ([value], next_stream)
     
         def _convert(self, bits):
             '''
@@ -121,6 +135,14 @@ else:
             '''
             return bits
         
+        def _read(self, helper, state):
+            '''
+            Read the value directly from a `BitHelper` (this should give the 
+            same result as `_convert()`).  By default, read the bits.
+            '''
+            (bits, next_stream) = helper.next(state, count=self.length)
+            return (self._convert(bits), next_stream)
+        
         
     class _ByteArray(_Variable):
         '''
@@ -141,6 +163,12 @@ else:
             '''
             return bits.to_bytes()
         
+        def _read(self, helper, state):
+            '''
+            Read bytes directly.
+            '''
+            return helper.bytes(state, self.length)
+        
     
     class BEnd(_Variable):
         '''
@@ -163,6 +191,12 @@ else:
             '''
             return bits.to_int(big_endian=True)
         
+        def _read(self, helper, state):
+            '''
+            Read the int directly.
+            '''
+            return helper.int(state, self.length, big_endian=True)
+        
     
     class LEnd(_Variable):
         '''
@@ -175,6 +209,12 @@ else:
             '''
             return bits.to_int()
         
+        def _read(self, helper, state):
+            '''
+            Read the int directly.
+            '''
+            return helper.int(state, self.length)
+        
     
     def BitStr(value):
         '''
@@ -296,6 +336,18 @@ else:
             '''
             return bits.to_str(encoding=self.encoding, errors=self.errors)
         
+        def _read(self, helper, state):
+            '''
+            Read bytes directly and decode.
+            '''
+            (value, next_stream) = helper.bytes(state, self.length)
+            if self.encoding:
+                value = value.decode(encoding=self.encoding, 
+                                     errors=self.errors)
+            else:
+                value = value.decode(errors=self.errors)
+            return (value, next_stream)
+        
         
     def String(value, encoding=None, errors=STRICT):
         '''
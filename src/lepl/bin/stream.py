@@ -0,0 +1,122 @@
+
+# The contents of this file are subject to the Mozilla Public License
+# (MPL) Version 1.1 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License
+# at http://www.mozilla.org/MPL/
+#
+# Software distributed under the License is distributed on an "AS IS"
+# basis, WITHOUT WARRANTY OF ANY KIND, either express or implied. See
+# the License for the specific language governing rights and
+# limitations under the License.
+#
+# The Original Code is LEPL (http://www.acooke.org/lepl)
+# The Initial Developer of the Original Code is Andrew Cooke.
+# Portions created by the Initial Developer are Copyright (C) 2009-2010
+# Andrew Cooke (andrew@acooke.org). All Rights Reserved.
+#
+# Alternatively, the contents of this file may be used under the terms
+# of the LGPL license (the GNU Lesser General Public License,
+# http://www.gnu.org/licenses/lgpl.html), in which case the provisions
+# of the LGPL License are applicable instead of those above.
+#
+# If you wish to allow use of your version of this file only under the
+# terms of the LGPL License and not to allow others to use your version
+# of this file under the MPL, indicate your decision by deleting the
+# provisions above and replace them with the notice and other provisions
+# required by the LGPL License.  If you do not delete the provisions
+# above, a recipient may use your version of this file under either the
+# MPL or the LGPL License.
+
+'''
+A stream helper for `BitString` data.
+
+The state is the offset in bits.  Generic matchers still receive 
+`BitString` values (via `s_next()`), but the matchers in `lepl.bin.matchers`
+check for this helper and read integers, bytes and constants directly from
+the underlying buffer with shifts and masks, so no intermediate `BitString`
+instances are constructed.
+'''
+
+if bytes is str:
+    print('Binary parsing unsupported in this Python version')
+else:
+
+    from lepl.bin.bits import Int, bytes_for_bits
+    from lepl.stream.core import OFFSET
+    from lepl.stream.simple import SequenceHelper
+    
+    
+    class BitHelper(SequenceHelper):
+        '''
+        A helper for `BitString` streams, with direct access to the data.
+        '''
+        
+        def __init__(self, sequence, id=None, factory=None, max=None, 
+                     global_kargs=None, cache_level=None, delta=None):
+            super(BitHelper, self).__init__(sequence, id=id, factory=factory,
+                    max=max, global_kargs=global_kargs, 
+                    cache_level=cache_level, delta=delta)
+            # the data, without copying (bit 0 is at self.__offset)
+            self.__offset = sequence.offset()
+            self.__bytes = memoryview(sequence.to_bytes(self.__offset))
+            self.__length = len(sequence)
+            
+        def __advance(self, state, length):
+            '''
+            The stream after `length` bits (updating the maximum depth).
+            '''
+            new_state = state + length
+            if new_state > self.__length:
+                raise StopIteration
+            stream = (new_state, self)
+            if self.max.track:
+                self.max.update(self._delta[OFFSET] + new_state - 1, stream)
+            return stream
+        
+        def __read(self, state, length):
+            '''
+            The `length` bits at `state`, as a little-endian integer.
+            '''
+            start = state + self.__offset
+            stop = start + length
+            value = int.from_bytes(self.__bytes[start >> 3:(stop + 7) >> 3],
+                                   'little') >> (start & 7)
+            return value & ((1 << length) - 1)
+            
+        def int(self, state, length, big_endian=False):
+            '''
+            Read `length` bits as an integer, returning `(Int, stream)`.  
+            This gives the same value as `BitString.to_int()`.
+            '''
+            stream = self.__advance(state, length)
+            if big_endian:
+                if length % 8:
+                    raise ValueError('Length is not a multiple of 8 bits, so '
+                                     'big endian integer poorly defined: {0}'
+                                     .format(length))
+                start = state + self.__offset
+                if start & 7:
+                    value = int.from_bytes(
+                        self.__read(state, length).to_bytes(length >> 3, 
+                                                            'little'), 'big')
+                else:
+                    value = int.from_bytes(
+                        self.__bytes[start >> 3:(start + length) >> 3], 'big')
+            else:
+                value = self.__read(state, length)
+            return (Int(value, length), stream)
+        
+        def bytes(self, state, length):
+            '''
+            Read `length` bits as bytes (right-padded with zero bits if 
+            necessary), returning `(bytes, stream)`.  This gives the same 
+            value as `BitString.to_bytes()`.
+            '''
+            stream = self.__advance(state, length)
+            start = state + self.__offset
+            if start & 7 or length & 7:
+                value = self.__read(state, length).to_bytes(
+                                        bytes_for_bits(length), 'little')
+            else:
+                value = self.__bytes[start >> 3:(start + length) >> 3].tobytes()
+            return (value, stream)
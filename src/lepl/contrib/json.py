@@ -37,8 +37,12 @@ http://www.ietf.org/rfc/rfc4627.txt
 '''
 
 
+from re import compile as compile_
+
 from lepl import *
-from lepl.support.lib import str
+from lepl.core.parser import trampoline
+from lepl.stream.core import s_empty
+from lepl.support.lib import str, chr
 
 
 def Simple():
@@ -73,9 +77,137 @@ def Simple():
         object_        = Drop("{") & pair[:, comma] & Drop("}")   > dict
     
     
-    value         += ((Literal('true')  >= (lambda x: True)) |
-                      (Literal('false') >= (lambda x: False)) |
-                      (Literal('null')  >= (lambda x: None)) |
+    value         += ((Literal('true')  >> (lambda x: True)) |
+                      (Literal('false') >> (lambda x: False)) |
+                      (Literal('null')  >> (lambda x: None)) |
                       array | object_ | number | string)
 
     return value
+
+
+_KEYWORDS = {'true': True, 'false': False, 'null': None}
+
+_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 
+            'n': '\n', 'r': '\r', 't': '\t'}
+
+_ESCAPE = compile_(r'\\(u[0-9a-fA-F]{4}|.)')
+
+
+def _unescape(match):
+    '''
+    Replace a single escape sequence.
+    '''
+    escape = match.group(1)
+    if len(escape) == 5:
+        return chr(int(escape[1:], 16))
+    else:
+        return _ESCAPES[escape]
+    
+
+def _string(text):
+    '''
+    Convert the text of a string token (including quotes) to a string.
+    '''
+    text = text[1:-1]
+    return _ESCAPE.sub(_unescape, text) if '\\' in text else text
+
+
+def _Fast():
+    '''
+    The matcher for `Fast()`, and the (undropped) tokens for array 
+    punctuation, which `ArrayElements()` uses.
+    '''
+    
+    value   = Delayed()
+    
+    # only valid escapes (lepl's regular expressions have no {n})
+    string  = Token(r'"(?:[^"\\]|\\["\\/bfnrt]|\\u' + r'[0-9a-fA-F]' * 4 
+                    + ')*"')                >> _string
+    number  = Token(Real())                 >> float
+    keyword = Token('(?:true|false|null)')  >> _KEYWORDS.__getitem__
+    
+    (open_array, close_array, open_object, close_object, colon, comma) = \
+        [Token(regexp) for regexp in (r'\[', r'\]', r'\{', r'\}', ':', ',')]
+
+    array   = ~open_array & value[:, ~comma] & ~close_array      > list
+    # a flat list of names and values, paired here, avoids making a tuple 
+    # for each pair
+    object_ = ~open_object & (string & ~colon & value)[:, ~comma] \
+                & ~close_object  > (lambda results: 
+                                        dict(zip(results[::2], results[1::2])))
+    
+    value  += string | number | array | object_ | keyword
+    value.config.no_memoize()
+    
+    return (value, open_array, close_array, comma)
+
+
+def Fast():
+    '''
+    A JSON parser that gives the same results as `Simple()`, but is faster.
+    
+    A lexer splits the text into tokens, so the text of strings and numbers
+    is converted to values directly (not a character at a time) and spaces
+    are discarded before matching.  The matcher is configured without 
+    memoisation, which JSON does not need (this configuration is lost if 
+    the matcher is used inside another, so configure that in the same way).
+    '''
+    return _Fast()[0]
+
+
+_CLOSE = object()
+'''Marks the end of the array in `ArrayElements()`.'''
+
+
+def ArrayElements():
+    '''
+    Generate a function that takes the text of a JSON array and generates 
+    the elements (as `Fast()` would parse them) one at a time.
+    
+    The array is not parsed as a whole: each element is matched separately
+    (continuing from the tokens for the previous element), so memory use 
+    does not grow with the length of the array.  If the text
+    is invalid, the elements before the error are generated and then the 
+    error from parsing the whole text is raised.
+    '''
+    
+    (value, open_array, close_array, comma) = _Fast()
+    # the elements are preceded by the open bracket or a comma; the close
+    # bracket is replaced so that it is not confused with the string "]"
+    close = close_array >> (lambda _: _CLOSE)
+    element = (open_array & close) | \
+              ((open_array | comma) & value) | \
+              close
+    element.config.no_memoize().no_full_first_match()
+    document = value & Eos()
+    
+    def error(text):
+        '''
+        Raise the error from parsing the whole text.
+        '''
+        document.parse(text)
+        raise ValueError('The JSON value is not an array')
+    
+    def elements(text):
+        parser = element._raw_parser()
+        # the rewriters add the lexer at the top of the graph; after the 
+        # first element we continue with the tokens that it generated
+        tokens = parser.matcher.matcher
+        matches = parser.match_stream(parser.make_stream(text))
+        first = True
+        while True:
+            try:
+                (results, stream) = next(matches)
+            except StopIteration:
+                error(text)
+            if first != (results[0] == '['):
+                error(text)
+            first = False
+            if results[-1] is _CLOSE:
+                break
+            yield results[1]
+            matches = trampoline(tokens._match(stream))
+        if not s_empty(stream):
+            error(text)
+        
+    return elements
@@ -37,11 +37,16 @@ Tests for the lepl.core package.
 
 # pylint: disable-msg=E0611
 #@PydevCodeAnalysisIgnore
+import lepl.core._test.batch
 import lepl.core._test.clone
 import lepl.core._test.config
 import lepl.core._test.dynamic
+import lepl.core._test.incremental
 import lepl.core._test.manager
 import lepl.core._test.parser
+import lepl.core._test.profile
+import lepl.core._test.push
 import lepl.core._test.rewrite_delayed_bug
 import lepl.core._test.rewrite_repeat_bug
 import lepl.core._test.rewriters
+import lepl.core._test.scan
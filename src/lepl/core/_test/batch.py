@@ -0,0 +1,156 @@
+
+# The contents of this file are subject to the Mozilla Public License
+# (MPL) Version 1.1 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License
+# at http://www.mozilla.org/MPL/
+#
+# Software distributed under the License is distributed on an "AS IS"
+# basis, WITHOUT WARRANTY OF ANY KIND, either express or implied. See
+# the License for the specific language governing rights and
+# limitations under the License.
+#
+# The Original Code is LEPL (http://www.acooke.org/lepl)
+# The Initial Developer of the Original Code is Andrew Cooke.
+# Portions created by the Initial Developer are Copyright (C) 2009-2010
+# Andrew Cooke (andrew@acooke.org). All Rights Reserved.
+#
+# Alternatively, the contents of this file may be used under the terms
+# of the LGPL license (the GNU Lesser General Public License,
+# http://www.gnu.org/licenses/lgpl.html), in which case the provisions
+# of the LGPL License are applicable instead of those above.
+#
+# If you wish to allow use of your version of this file only under the
+# terms of the LGPL License and not to allow others to use your version
+# of this file under the MPL, indicate your decision by deleting the
+# provisions above and replace them with the notice and other provisions
+# required by the LGPL License.  If you do not delete the provisions
+# above, a recipient may use your version of this file under either the
+# MPL or the LGPL License.
+
+'''
+Tests for the lepl.core.batch module.
+'''
+
+#from logging import basicConfig, DEBUG
+from unittest import TestCase
+
+from lepl.matchers.core import Any, Delayed
+from lepl.matchers.derived import Word, Letter, Digit, Integer, Drop
+from lepl.matchers.memo import _RMemo, _LMemo
+from lepl.matchers.matcher import Matcher
+from lepl.stream.maxdepth import FullFirstMatchException
+from lepl.support.graph import preorder
+
+
+def assignment():
+    key = Word(Letter(), Letter() | Digit())
+    return key & Drop('=') & (key | Integer())
+
+
+def tables(matcher):
+    '''
+    The (private) memo tables in the matcher graph.
+    '''
+    return [getattr(node, '_' + type(node).__name__.lstrip('_') + '__table')
+            for node in preorder(matcher._raw_parser().matcher, Matcher)
+            if isinstance(node, (_RMemo, _LMemo))]
+
+
+class BatchTest(TestCase):
+    
+    def test_parse_many(self):
+        #basicConfig(level=DEBUG)
+        matcher = assignment()
+        inputs = ['a=1', 'b2=c', 'c=d3', 'd=-12']
+        assert list(matcher.parse_many(inputs)) == \
+            [matcher.parse(input_) for input_ in inputs]
+        
+    def test_no_match(self):
+        matcher = assignment()
+        matcher.config.no_full_first_match()
+        assert list(matcher.parse_many(['a=1', '1=a', 'b=2'])) == \
+            [['a', '1'], None, ['b', '2']]
+        
+    def test_error(self):
+        matcher = assignment()
+        results = matcher.parse_many(['a=1', '1=a'])
+        assert next(results) == ['a', '1']
+        self.assertRaises(FullFirstMatchException, next, results)
+        
+    def test_errors(self):
+        matcher = assignment()
+        inputs = ['a=1', '1=a', 'b=2']
+        assert list(matcher.parse_many(inputs, errors='none')) == \
+            [['a', '1'], None, ['b', '2']]
+        results = list(matcher.parse_many(inputs, errors='return'))
+        assert results[0] == ['a', '1'] and results[2] == ['b', '2'], results
+        assert isinstance(results[1], FullFirstMatchException), results
+        self.assertRaises(ValueError, list, 
+                          matcher.parse_many(inputs, errors='ignore'))
+        
+    def test_match_many(self):
+        matcher = Any()[:, ...]
+        matcher.config.no_full_first_match()
+        results = [(result, stream[0]) 
+                   for (result, stream) in matcher.match_many(['ab', 'c'])]
+        assert results == [(['ab'], 2), (['c'], 1)], results
+        
+    def test_types(self):
+        matcher = Any()[:, ...]
+        matcher.config.no_compile_to_regexp()
+        assert list(matcher.parse_many(['ab', [1, 2], 'c'])) == \
+            [['ab'], [[1, 2]], ['c']]
+        
+    def test_memo_cleared(self):
+        matcher = assignment()
+        matcher.config.auto_memoize(full=True)
+        for _result in matcher.parse_many(['a=1', 'b=2']):
+            assert all(not table for table in tables(matcher))
+        assert not any(tables(matcher))
+        matcher.parse('c=3')
+        assert any(table for table in tables(matcher))
+        
+    def test_left_recursive(self):
+        expr = Delayed()
+        expr += (expr & Drop('+') & Digit()) | Digit()
+        expr.config.auto_memoize(full=True)
+        assert list(expr.parse_many(['1+2', '3', '4+5+6'])) == \
+            [['1', '2'], ['3'], ['4', '5', '6']]
+        
+    def test_processes(self):
+        matcher = assignment()
+        inputs = ['k{0}={0}'.format(i) for i in range(50)]
+        assert list(matcher.parse_many(inputs, processes=2, chunksize=7)) \
+            == [['k{0}'.format(i), str(i)] for i in range(50)]
+        
+    def test_processes_error(self):
+        matcher = Word(Letter())[:, Drop(',')]
+        results = matcher.parse_many(['a,b', 'c,1', 'd'], processes=2, 
+                                     chunksize=1)
+        assert next(results) == ['a', 'b']
+        self.assertRaises(FullFirstMatchException, next, results)
+        
+    def test_processes_errors(self):
+        matcher = Word(Letter())[:, Drop(',')]
+        inputs = ['a,b', 'c,1', 'd']
+        assert list(matcher.parse_many(inputs, processes=2, chunksize=1,
+                                       errors='none')) == \
+            [['a', 'b'], None, ['d']]
+        results = list(matcher.parse_many(inputs, processes=2, chunksize=1,
+                                          errors='return'))
+        assert isinstance(results[1], FullFirstMatchException), results
+        assert 'line 1' in str(results[1]), results
+        
+    def test_no_fork(self):
+        '''
+        Without fork the inputs are parsed in this process.
+        '''
+        from lepl.core import batch
+        fork_pool = batch._fork_pool
+        batch._fork_pool = lambda: None
+        try:
+            matcher = assignment()
+            assert list(matcher.parse_many(['a=1', 'b=2'], processes=2)) \
+                == [['a', '1'], ['b', '2']]
+        finally:
+            batch._fork_pool = fork_pool
@@ -115,6 +115,38 @@ class ParseTest(TestCase):
 config=lambda m: m.config.no_compile_to_regexp())
 
 
+class LazyDeepestTest(TestCase):
+    
+    def assert_error(self, matcher, text, parser='parse'):
+        messages = []
+        for lazy in (False, True):
+            matcher.config.lazy_deepest(lazy)
+            try:
+                getattr(matcher, parser)(text())
+                assert False, 'expected error'
+            except FullFirstMatchException as e:
+                messages.append(str(e))
+        assert messages[0] == messages[1], messages
+        return messages[1]
+            
+    def test_string(self):
+        error = self.assert_error(Any('a')[:, ...] & Any('b'), lambda: 'aac')
+        assert_str(error, 
+            "The match failed in <string> at '' (line 1, character 4).")
+        
+    def test_iterable(self):
+        error = self.assert_error(Any('a\n')[:, ...] & Any('b'), 
+                                  lambda: iter(['aa\n', 'ac\n']),
+                                  'parse_iterable')
+        assert_str(error, 
+            "The match failed in <string> at '' (line 3, character 3).")
+        
+    def test_success(self):
+        matcher = Any('a')[:, ...] & Any('b')
+        matcher.config.lazy_deepest()
+        assert matcher.parse('aab') == ['aa', 'b'], matcher.parse('aab')
+
+
 class BugTest(TestCase):
     
     def test_bug(self):
@@ -0,0 +1,167 @@
+
+# The contents of this file are subject to the Mozilla Public License
+# (MPL) Version 1.1 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License
+# at http://www.mozilla.org/MPL/
+#
+# Software distributed under the License is distributed on an "AS IS"
+# basis, WITHOUT WARRANTY OF ANY KIND, either express or implied. See
+# the License for the specific language governing rights and
+# limitations under the License.
+#
+# The Original Code is LEPL (http://www.acooke.org/lepl)
+# The Initial Developer of the Original Code is Andrew Cooke.
+# Portions created by the Initial Developer are Copyright (C) 2009-2010
+# Andrew Cooke (andrew@acooke.org). All Rights Reserved.
+#
+# Alternatively, the contents of this file may be used under the terms
+# of the LGPL license (the GNU Lesser General Public License,
+# http://www.gnu.org/licenses/lgpl.html), in which case the provisions
+# of the LGPL License are applicable instead of those above.
+#
+# If you wish to allow use of your version of this file only under the
+# terms of the LGPL License and not to allow others to use your version
+# of this file under the MPL, indicate your decision by deleting the
+# provisions above and replace them with the notice and other provisions
+# required by the LGPL License.  If you do not delete the provisions
+# above, a recipient may use your version of this file under either the
+# MPL or the LGPL License.
+
+'''
+Tests for the lepl.core.incremental module.
+'''
+
+#from logging import basicConfig, DEBUG
+from unittest import TestCase
+
+from lepl.matchers.core import Literal, Delayed
+from lepl.matchers.derived import Word, Letter, Digit, Integer, Newline, \
+    Drop, Eos
+from lepl.stream.factory import DEFAULT_STREAM_FACTORY
+from lepl.stream.maxdepth import FullFirstMatchException
+from lepl.stream.core import s_next, s_line, s_empty
+
+
+TEXT = ''.join('key{0}=value{0}\n'.format(i) for i in range(20))
+
+
+class IncrementalTest(TestCase):
+    
+    def setUp(self):
+        self.calls = []
+        def record(value):
+            self.calls.append(value)
+            return value
+        key = Word(Letter(), Letter() | Digit()) >> record
+        value = key | Integer()
+        entry = (key & Drop(Literal('=')) & value & Drop(Newline())) > tuple
+        self.matcher = entry[:] & Eos()
+        
+    def assert_edit(self, session, offset, removed, inserted):
+        self.calls = []
+        edited = self.matcher.reparse(session, offset, removed, inserted)
+        self.edit_calls = list(self.calls)
+        text = session.text[:offset] + inserted + session.text[offset+removed:]
+        assert edited.text == text, edited.text
+        assert edited.result == self.matcher.parse(text), edited.result
+        return edited
+        
+    def test_edits(self):
+        #basicConfig(level=DEBUG)
+        session = self.matcher.parse_session(TEXT)
+        assert len(session.result) == 20, session.result
+        assert session.reused == 0
+        middle = TEXT.index('value10')
+        for (offset, removed, inserted) in [(middle, 7, 'other'),
+                                            (middle, 0, 'x'),
+                                            (middle, 1, ''),
+                                            (0, 0, 'first=1\n'),
+                                            (0, 8, ''),
+                                            (None, 0, 'last=2\n'),
+                                            (-7, 7, '')]:
+            if offset is None:
+                offset = len(session.text)
+            elif offset < 0:
+                offset += len(session.text)
+            session = self.assert_edit(session, offset, removed, inserted)
+            assert session.reused, (offset, removed, inserted)
+        assert session.text == TEXT.replace('value10', 'other')
+        assert session.result[10] == ('key10', 'other'), session.result
+        
+    def test_reuse(self):
+        session = self.matcher.parse_session(TEXT)
+        assert len(self.calls) == 40, self.calls
+        session = self.assert_edit(session, TEXT.index('value10'), 7, 'other')
+        assert session.result[10] == ('key10', 'other'), session.result
+        assert self.edit_calls == ['other'], self.edit_calls
+        
+    def test_end(self):
+        '''
+        Matches that found the end of the text are not re-used when text
+        is added there.
+        '''
+        matcher = Literal('a')[:, ...] & Eos()
+        session = matcher.parse_session('aa')
+        assert session.result == ['aa'], session.result
+        session = matcher.reparse(session, 2, 0, 'a')
+        assert session.result == ['aaa'], session.result
+        session = matcher.reparse(session, 0, 1, '')
+        assert session.result == ['aa'], session.result
+        
+    def test_error(self):
+        session = self.matcher.parse_session(TEXT)
+        session = session.edit(TEXT.index('value10'), 0, '!')
+        assert session.result is None
+        assert isinstance(session.error, FullFirstMatchException), \
+            session.error
+        assert 'line 11' in str(session.error), session.error
+        session = self.assert_edit(session, TEXT.index('value10'), 1, '')
+        assert session.error is None
+        assert session.reused
+        assert len(session.result) == 20, session.result
+        
+    def test_bad_edit(self):
+        session = self.matcher.parse_session('a=1\n')
+        self.assertRaises(ValueError, session.edit, 3, 2, '')
+        self.assertRaises(ValueError, session.edit, -1, 0, '')
+        
+    def test_left_memo(self):
+        '''
+        Parsers with left recursion are parsed in full.
+        '''
+        expr = Delayed()
+        expr += (expr & Literal('+') & Digit()) | Digit()
+        matcher = expr & Eos()
+        matcher.config.auto_memoize()
+        session = matcher.parse_session('1+2+3')
+        assert session.result == ['1', '+', '2', '+', '3'], session.result
+        session = matcher.reparse(session, 2, 1, '4')
+        assert session.result == ['1', '+', '4', '+', '3'], session.result
+        assert session.reused == 0
+        
+
+class HelperTest(TestCase):
+    
+    def test_horizon(self):
+        stream = DEFAULT_STREAM_FACTORY.from_incremental('ab\ncd')
+        helper = stream[1]
+        assert helper.horizon == 0
+        (_, stream) = s_next(stream)
+        assert helper.horizon == 1
+        assert not s_empty(stream)
+        assert helper.horizon == 2
+        (_, stream) = s_line(stream, False)
+        assert helper.horizon == 3
+        (_, stream) = s_line(stream, False)
+        assert helper.horizon == 6
+        assert s_empty(stream)
+        helper.horizon = 0
+        (_, (_, copy)) = helper.new_max(0)
+        s_next((0, copy), count=2)
+        assert helper.horizon == 2
+        
+    def test_ids(self):
+        stream1 = DEFAULT_STREAM_FACTORY.from_incremental('abc')
+        stream2 = DEFAULT_STREAM_FACTORY.from_incremental('abc')
+        assert stream1[1].id != stream2[1].id
+        
@@ -0,0 +1,177 @@
+
+# The contents of this file are subject to the Mozilla Public License
+# (MPL) Version 1.1 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License
+# at http://www.mozilla.org/MPL/
+#
+# Software distributed under the License is distributed on an "AS IS"
+# basis, WITHOUT WARRANTY OF ANY KIND, either express or implied. See
+# the License for the specific language governing rights and
+# limitations under the License.
+#
+# The Original Code is LEPL (http://www.acooke.org/lepl)
+# The Initial Developer of the Original Code is Andrew Cooke.
+# Portions created by the Initial Developer are Copyright (C) 2009-2010
+# Andrew Cooke (andrew@acooke.org). All Rights Reserved.
+#
+# Alternatively, the contents of this file may be used under the terms
+# of the LGPL license (the GNU Lesser General Public License,
+# http://www.gnu.org/licenses/lgpl.html), in which case the provisions
+# of the LGPL License are applicable instead of those above.
+#
+# If you wish to allow use of your version of this file only under the
+# terms of the LGPL License and not to allow others to use your version
+# of this file under the MPL, indicate your decision by deleting the
+# provisions above and replace them with the notice and other provisions
+# required by the LGPL License.  If you do not delete the provisions
+# above, a recipient may use your version of this file under either the
+# MPL or the LGPL License.
+
+'''
+Tests for the lepl.core.profile module.
+'''
+
+#from logging import basicConfig, DEBUG
+from os import remove
+from pstats import Stats
+from tempfile import mkstemp
+from unittest import TestCase
+
+from lepl.core.profile import Profile, StackSamples
+from lepl.matchers.combine import DepthFirst
+from lepl.matchers.core import Any, Literal
+from lepl.matchers.derived import Eos
+from lepl.matchers.matcher import canonical_matcher_type, matcher_type
+from lepl.support.lib import StringIO
+
+
+class ProfileTest(TestCase):
+    
+    def profiled(self):
+        matcher = (Literal('a') | Literal('b'))[:] & Eos()
+        matcher.config.clear().profile()
+        return matcher
+    
+    def counts(self, profile, attribute):
+        return dict((str(p.matcher), getattr(p, attribute)) 
+                    for p in profile.profiles())
+    
+    def test_counts(self):
+        #basicConfig(level=DEBUG)
+        matcher = self.profiled()
+        assert matcher.parse('abba') == ['a', 'b', 'b', 'a']
+        profile = matcher.config.profiler
+        results = self.counts(profile, 'results')
+        assert results["Literal('a')"] == 2, results
+        assert results["Literal('b')"] == 2, results
+        calls = self.counts(profile, 'calls')
+        assert calls["Literal('a')"] == 5, calls
+        assert calls["Literal('b')"] == 3, calls
+        assert calls['Eof()'] == 1, calls
+        failures = self.counts(profile, 'failures')
+        assert failures["Literal('a')"] == 3, failures
+        for p in profile.profiles():
+            assert p.inclusive >= p.exclusive >= 0, p
+        
+    def test_backtrack(self):
+        matcher = Any()[:] & Literal('a')
+        matcher.config.clear().profile()
+        assert matcher.parse('bba') == ['b', 'b', 'a']
+        backtracks = [p.backtracks 
+                      for p in matcher.config.profiler.profiles()
+                      if matcher_type(p.matcher) 
+                      is canonical_matcher_type(DepthFirst)]
+        assert len(backtracks) == 1 and backtracks[0], backtracks
+        
+    def test_shared(self):
+        profile = Profile()
+        matcher = Literal('a')
+        matcher.config.clear().profile(profile)
+        matcher.parse('a')
+        matcher.parse('a')
+        assert matcher.config.profiler is profile
+        assert profile.profiles()[0].calls == 2
+        profile.clear()
+        assert not profile.profiles()
+        
+    def test_report(self):
+        matcher = self.profiled()
+        matcher.parse('aab')
+        report = matcher.config.profiler.report(sort='index', limit=2)
+        lines = report.split('\n')
+        assert len(lines) == 3, report
+        assert lines[0].split() == ['calls', 'backtrk', 'results', 'failure',
+                                    'inclusive', 'exclusive', 'matcher'], report
+        assert lines[1].endswith('0:And(DepthFirst, Eof)'), report
+        self.assertRaises(ValueError, 
+                          matcher.config.profiler.report, sort='foo')
+        
+    def test_pstats(self):
+        matcher = self.profiled()
+        matcher.parse('ab')
+        output = StringIO()
+        stats = Stats(matcher.config.profiler, stream=output)
+        stats.sort_stats('calls').print_stats()
+        assert "Literal('a')" in output.getvalue(), output.getvalue()
+        (handle, path) = mkstemp()
+        try:
+            matcher.config.profiler.dump_stats(path)
+            assert Stats(path).total_calls == stats.total_calls
+        finally:
+            remove(path)
+
+
+class SampleTest(TestCase):
+    
+    def test_interval(self):
+        matcher = (Literal('a') | Literal('b'))[:] & Eos()
+        matcher.config.clear().sample(1)
+        assert matcher.parse('abba') == ['a', 'b', 'b', 'a']
+        samples = matcher.config.sampler
+        counts = samples.counts()
+        assert sum(counts.values()) == samples.total, counts
+        for path in counts:
+            assert str(path[0]) == 'And(DepthFirst, Eof)', path
+        lines = samples.folded().split('\n')
+        assert len(lines) == 6, lines
+        for line in lines:
+            assert line.startswith('And(DepthFirst, Eof)'), lines
+        # root, repetition, choice and literal
+        assert [line for line in lines 
+                if len(line.split(';')) == 4 
+                and line.endswith("Literal('b') 3")], lines
+        
+    def test_sparse(self):
+        matcher = Any()[:] & Eos()
+        matcher.config.clear().sample(10)
+        matcher.parse('a' * 100)
+        total = matcher.config.sampler.total
+        assert 10 < total < 50, total
+        matcher.config.sampler.clear()
+        assert not matcher.config.sampler.folded()
+        
+    def test_name(self):
+        assert StackSamples.name("a;b\n c") == 'a,b c'
+        
+    def test_timer(self):
+        try:
+            from signal import setitimer
+        except ImportError:
+            return
+        from signal import getsignal, SIGPROF
+        previous = getsignal(SIGPROF)
+        matcher = Any()[:] & Eos()
+        matcher.config.clear().sample(period=0.001)
+        samples = matcher.config.sampler
+        # the timer counts CPU time, so parse until it has fired
+        for _i in range(100):
+            assert matcher.parse('a' * 1000) == ['a'] * 1000
+            assert getsignal(SIGPROF) == previous
+            if samples.total:
+                break
+        assert samples.total > 0, samples.total
+        lines = samples.folded().split('\n')
+        assert sum(int(line.rsplit(' ', 1)[1]) for line in lines) == \
+            samples.total, lines
+        for line in lines:
+            assert line.startswith('And(DepthFirst, Eof)'), lines
@@ -0,0 +1,205 @@
+
+# The contents of this file are subject to the Mozilla Public License
+# (MPL) Version 1.1 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License
+# at http://www.mozilla.org/MPL/
+#
+# Software distributed under the License is distributed on an "AS IS"
+# basis, WITHOUT WARRANTY OF ANY KIND, either express or implied. See
+# the License for the specific language governing rights and
+# limitations under the License.
+#
+# The Original Code is LEPL (http://www.acooke.org/lepl)
+# The Initial Developer of the Original Code is Andrew Cooke.
+# Portions created by the Initial Developer are Copyright (C) 2009-2010
+# Andrew Cooke (andrew@acooke.org). All Rights Reserved.
+#
+# Alternatively, the contents of this file may be used under the terms
+# of the LGPL license (the GNU Lesser General Public License,
+# http://www.gnu.org/licenses/lgpl.html), in which case the provisions
+# of the LGPL License are applicable instead of those above.
+#
+# If you wish to allow use of your version of this file only under the
+# terms of the LGPL License and not to allow others to use your version
+# of this file under the MPL, indicate your decision by deleting the
+# provisions above and replace them with the notice and other provisions
+# required by the LGPL License.  If you do not delete the provisions
+# above, a recipient may use your version of this file under either the
+# MPL or the LGPL License.
+
+'''
+Tests for the lepl.core.push and lepl.core.aio modules.
+'''
+
+#from logging import basicConfig, DEBUG
+from sys import version_info
+from unittest import TestCase, skipIf
+
+from lepl.core.push import PushParserException
+from lepl.matchers.core import Literal
+from lepl.matchers.derived import Word, Letter, Digit, Integer, Newline, \
+    Drop, Eos
+from lepl.stream.maxdepth import FullFirstMatchException
+
+
+def message():
+    key = Word(Letter(), Letter() | Digit())
+    return (key & Drop(Literal('=')) & (key | Integer()) & Drop(Newline())) \
+        > tuple
+
+
+class PushTest(TestCase):
+    
+    def test_messages(self):
+        #basicConfig(level=DEBUG)
+        matcher = message()
+        matcher.config.full_first_match(False)
+        parser = matcher.push_parser()
+        results = [parser.feed(chunk) 
+                   for chunk in ['ke', 'y1=', '12', '3\nk2=v', '2\nk3=x\n']]
+        assert results == [[], [], [], [[('key1', '123')]], 
+                           [[('k2', 'v2')], [('k3', 'x')]]], results
+        assert parser.close() == []
+        assert parser.closed
+        self.assertRaises(PushParserException, parser.feed, 'a=b\n')
+        
+    def test_incomplete(self):
+        matcher = message()
+        matcher.config.full_first_match(False)
+        parser = matcher.push_parser()
+        assert parser.feed('a=1\nb=') == [[('a', '1')]]
+        self.assertRaises(FullFirstMatchException, parser.close)
+        
+    def test_error(self):
+        '''
+        An error is raised as soon as more text cannot help.
+        '''
+        matcher = message()
+        matcher.config.full_first_match(False)
+        parser = matcher.push_parser()
+        self.assertRaises(FullFirstMatchException, parser.feed, 'a!')
+        
+    def test_error_after_results(self):
+        '''
+        Results before an error are returned; the error is raised next.
+        '''
+        matcher = message()
+        matcher.config.full_first_match(False)
+        parser = matcher.push_parser()
+        assert parser.feed('ab=1\n!!\n') == [[('ab', '1')]]
+        self.assertRaises(FullFirstMatchException, parser.feed, 'c=2\n')
+        self.assertRaises(FullFirstMatchException, parser.close)
+        parser = matcher.push_parser()
+        assert parser.feed('ab=1\n!') == [[('ab', '1')]]
+        self.assertRaises(FullFirstMatchException, parser.close)
+        
+    def test_no_error(self):
+        matcher = message()
+        matcher.config.no_full_first_match()
+        parser = matcher.push_parser()
+        assert parser.feed('a=1\n') == [[('a', '1')]]
+        self.assertRaises(PushParserException, parser.feed, '!')
+        
+    def test_document(self):
+        '''
+        With the default configuration the whole text is matched.
+        '''
+        matcher = message()[:] & Eos()
+        parser = matcher.push_parser()
+        assert parser.feed('a=1\n') == []
+        assert parser.feed('b=2\n') == []
+        assert parser.close() == [[('a', '1'), ('b', '2')]]
+        
+    def test_growth(self):
+        '''
+        Text is buffered until it has doubled since the last parse.
+        '''
+        matcher = message()[:] & Eos()
+        parser = matcher.push_parser()
+        text = ''.join('k{0}={0}\n'.format(i) for i in range(100))
+        chunks = [text[i:i+10] for i in range(0, len(text), 10)]
+        for chunk in chunks:
+            assert parser.feed(chunk) == []
+        result = parser.close()
+        assert len(result) == 1 and len(result[0]) == 100, result
+        assert result[0][-1] == ('k99', '99'), result
+        
+    def test_delimiter(self):
+        '''
+        A delimiter forces a parse, even if the text has not grown enough.
+        '''
+        matcher = message()
+        matcher.config.full_first_match(False)
+        parser = matcher.push_parser()
+        assert parser.feed('abcdefgh=1') == []
+        assert parser.feed('\n') == []
+        assert parser.close() == [[('abcdefgh', '1')]]
+        parser = matcher.push_parser(delimiter='\n')
+        assert parser.feed('abcdefgh=1') == []
+        assert parser.feed('\n') == [[('abcdefgh', '1')]]
+        parser = matcher.push_parser(growth=1)
+        assert parser.feed('abcdefgh=1') == []
+        assert parser.feed('\n') == [[('abcdefgh', '1')]]
+        self.assertRaises(ValueError, matcher.push_parser, growth=0.5)
+        
+    def test_bytes(self):
+        matcher = Literal('\u00e9')[:, ...] & Eos()
+        parser = matcher.push_parser()
+        data = '\u00e9\u00e9'.encode('utf8')
+        assert parser.feed(data[:1]) == []
+        assert parser.feed(data[1:]) == []
+        assert parser.close() == [['\u00e9\u00e9']]
+        
+        
+@skipIf(version_info < (3, 6), 'Asynchronous generators need Python 3.6')
+class AsyncTest(TestCase):
+    
+    def collect(self, results):
+        from asyncio import get_event_loop
+        loop = get_event_loop()
+        collected = []
+        try:
+            while True:
+                collected.append(loop.run_until_complete(results.__anext__()))
+        except StopAsyncIteration:
+            return collected
+        
+    def test_reader(self):
+        from asyncio import StreamReader
+        matcher = message()
+        matcher.config.full_first_match(False)
+        reader = StreamReader()
+        for i in range(5):
+            reader.feed_data('a{0}={0}\n'.format(i).encode('utf8'))
+        reader.feed_eof()
+        results = self.collect(matcher.aparse(reader, size=3))
+        assert results == [[('a{0}'.format(i), str(i))] for i in range(5)], \
+            results
+            
+    def test_iterable(self):
+        from asyncio import Future
+        class Chunks(object):
+            '''An asynchronous iterable (without the new syntax).'''
+            def __init__(self, chunks):
+                self.chunks = list(chunks)
+            def __aiter__(self):
+                return self
+            def __anext__(self):
+                future = Future()
+                if self.chunks:
+                    future.set_result(self.chunks.pop(0))
+                else:
+                    future.set_exception(StopAsyncIteration())
+                return future
+        matcher = message()
+        matcher.config.full_first_match(False)
+        results = self.collect(matcher.aparse(Chunks(['a=', '1\nb', '=2\n'])))
+        assert results == [[('a', '1')], [('b', '2')]], results
+
+
+@skipIf(version_info >= (3, 6), 'Asynchronous generators are available')
+class NoAsyncTest(TestCase):
+    
+    def test_unsupported(self):
+        matcher = message()
+        self.assertRaises(NotImplementedError, matcher.aparse, [])
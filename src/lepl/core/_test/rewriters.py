@@ -42,6 +42,10 @@ from lepl.matchers.combine import Or
 from lepl.support.graph import preorder
 from lepl.matchers.matcher import Matcher, is_child
 from lepl.matchers.support import TransformableWrapper
+from lepl.core.rewriters import rewrite, RightMemoize, TraceVariables, \
+    SetArguments, Flatten, ComposeTransforms, DirectEvaluation
+from lepl.regexp.matchers import BaseRegexp, NfaRegexp
+from lepl.regexp.unicode import UnicodeAlphabet
 
 
 # pylint: disable-msg=C0103, C0111, C0301, W0702, C0324, C0321
@@ -308,4 +312,83 @@ class FlattenTest(TestCase):
         parser = matcher.get_parse_string()
         result = parser('foo')
         assert result == [('bar', 'foo')], result
-        
\ No newline at end of file
+        
+
+class FuseTest(TestCase):
+    
+    def grammar(self):
+        expr = Delayed()
+        term = NfaRegexp('[0-9]+') | Drop('(') & expr & Drop(')') > Node
+        expr += term & (Any('+-') & term)[:] > list
+        return expr
+    
+    def sequential(self, matcher, rewriters):
+        for rewriter in rewriters:
+            matcher = rewriter(matcher)
+        return matcher
+    
+    def assert_same(self, rewriters, names):
+        times = []
+        fused = rewrite(self.grammar(), rewriters, times)
+        separate = self.sequential(self.grammar(), rewriters)
+        assert fused.tree() == separate.tree(), fused.tree()
+        assert [name for (name, _) in times] == names, times
+        return fused
+        
+    def test_memoize_trace(self):
+        self.assert_same([RightMemoize(), TraceVariables()], 
+                         ['Right memoize+TraceVariables'])
+        
+    def test_set_arguments(self):
+        alphabet = UnicodeAlphabet.instance()
+        matcher = self.assert_same(
+            [SetArguments(BaseRegexp, alphabet=alphabet), Flatten()],
+            ['SetArguments(<class \'lepl.regexp.matchers.BaseRegexp\'>, '
+             '{\'alphabet\': <Unicode>})+Flatten'])
+        regexps = [m for m in preorder(matcher, Matcher) 
+                   if isinstance(m, BaseRegexp)]
+        assert regexps and regexps[0].alphabet is alphabet
+        
+    def test_inspects_children(self):
+        self.assert_same([ComposeTransforms(), Flatten(), DirectEvaluation()],
+                         ['ComposeTransforms', 'Flatten', 
+                          'DirectEvaluation(None)'])
+        
+    def test_default(self):
+        parser = self.grammar().get_parse()
+        names = [name for (name, _) in parser.rewrite_times]
+        assert 'Right memoize+TraceVariables' in names, names
+        result = parser('1+(2-3)')[0]
+        assert result[0][0] == '1', result
+        assert result[1] == '+', result
+        assert result[2][0][1] == '-', result
+
+
+class CopyFactoryTest(TestCase):
+    
+    def clone(self, matcher, **extra):
+        (args, kargs) = matcher._constructor_args()
+        kargs.update(extra)
+        copy = type(matcher)(*args, **kargs)
+        copy._copy_factory(matcher)
+        return copy
+    
+    def test_same_names(self):
+        matcher = Any('ab')
+        copy = self.clone(matcher)
+        assert copy.restrict == 'ab', copy.restrict
+        assert copy._constructor_args() == matcher._constructor_args()
+        assert copy.parse('b') == ['b']
+        
+    def test_varargs(self):
+        matcher = Or('a', 'b', 'c')
+        copy = self.clone(matcher)
+        assert copy.matchers == matcher.matchers
+        assert copy.parse('c') == ['c']
+        
+    def test_new_name(self):
+        try:
+            self.clone(Any('ab'), nonsense=1)
+            assert False, 'expected error'
+        except TypeError:
+            pass
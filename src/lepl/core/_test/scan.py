@@ -0,0 +1,131 @@
+
+# The contents of this file are subject to the Mozilla Public License
+# (MPL) Version 1.1 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License
+# at http://www.mozilla.org/MPL/
+#
+# Software distributed under the License is distributed on an "AS IS"
+# basis, WITHOUT WARRANTY OF ANY KIND, either express or implied. See
+# the License for the specific language governing rights and
+# limitations under the License.
+#
+# The Original Code is LEPL (http://www.acooke.org/lepl)
+# The Initial Developer of the Original Code is Andrew Cooke.
+# Portions created by the Initial Developer are Copyright (C) 2009-2010
+# Andrew Cooke (andrew@acooke.org). All Rights Reserved.
+#
+# Alternatively, the contents of this file may be used under the terms
+# of the LGPL license (the GNU Lesser General Public License,
+# http://www.gnu.org/licenses/lgpl.html), in which case the provisions
+# of the LGPL License are applicable instead of those above.
+#
+# If you wish to allow use of your version of this file only under the
+# terms of the LGPL License and not to allow others to use your version
+# of this file under the MPL, indicate your decision by deleting the
+# provisions above and replace them with the notice and other provisions
+# required by the LGPL License.  If you do not delete the provisions
+# above, a recipient may use your version of this file under either the
+# MPL or the LGPL License.
+
+'''
+Tests for the lepl.core.scan module.
+'''
+
+#from logging import basicConfig, DEBUG
+from unittest import TestCase
+
+from lepl.core.scan import first_pattern
+from lepl.lexer.matchers import Token
+from lepl.matchers.core import Any, Literal, Lookahead, Regexp
+from lepl.matchers.derived import Word, Letter, Digit, Integer, Drop, \
+    Optional, Space
+
+
+def assignment():
+    key = Word(Letter(), Letter() | Digit())
+    return key & Drop('=') & (key | Integer())
+
+
+class FirstPatternTest(TestCase):
+    
+    def assert_pattern(self, matcher, pattern):
+        found = first_pattern(matcher)
+        if pattern is None:
+            assert found is None, found.pattern
+        else:
+            assert found.pattern == pattern, found.pattern
+    
+    def test_literal(self):
+        self.assert_pattern(Literal('a.b'), r'a\.b')
+        self.assert_pattern(Literal('ab') & Any('xy'), 'ab')
+        self.assert_pattern(Literal('ab') | Any('x-'), r'[x\-]|ab')
+        
+    def test_empty(self):
+        self.assert_pattern(Optional('a') & 'b', 'a|b')
+        self.assert_pattern(~Lookahead('a') & Any('b'), '[b]')
+        self.assert_pattern(Any('a')[:], '[a]')
+        self.assert_pattern(Literal(''), '(?!)')
+        
+    def test_regexp(self):
+        # rewritten (by default) as a regular expression
+        self.assert_pattern(assignment()._raw_parser().matcher.matcher,
+                            '[A-Za-z]')
+        
+    def test_any(self):
+        self.assert_pattern(Any()[:] & 'b', '.|b')
+
+    def test_unknown(self):
+        self.assert_pattern(Regexp('a') & 'b', None)
+        
+        
+class ScanTest(TestCase):
+    
+    def test_scan(self):
+        #basicConfig(level=DEBUG)
+        matcher = assignment()
+        text = 'x a=1, b2=c;= c=d3 d=-12 e='
+        assert list(matcher.scan(text)) == \
+            [(2, 5, ['a', '1']), (7, 11, ['b2', 'c']), (14, 18, ['c', 'd3']),
+             (19, 24, ['d', '-12'])], list(matcher.scan(text))
+        for (start, end, results) in matcher.scan(text):
+            assert matcher.parse(text[start:end]) == results
+            
+    def test_overlap(self):
+        matcher = Literal('aa') | Literal('a')
+        assert [(start, end) for (start, end, _) in matcher.scan('aaab a')] \
+            == [(0, 2), (2, 3), (5, 6)]
+        
+    def test_empty(self):
+        matcher = Any('a')[:]
+        assert [(start, end) for (start, end, _) in matcher.scan('baab')] \
+            == [(1, 3)]
+        assert list(matcher.scan('')) == []
+        
+    def test_unknown(self):
+        matcher = Regexp('[0-9]+') >> int
+        assert [results for (_, _, results) in matcher.scan('a12b3')] \
+            == [[12], [3]]
+        
+    def test_tokens(self):
+        matcher = Token('[a-z]+') & Token('[0-9]+')
+        # the end is the start of the following token, and text that 
+        # cannot be split into tokens does not match
+        assert list(matcher.scan('ab 12 !! c 3 x')) == \
+            [(0, 6, ['ab', '12']), (9, 13, ['c', '3'])], \
+            list(matcher.scan('ab 12 !! c 3 x'))
+        
+    def test_tokens_unknown(self):
+        # without a pattern the start is still that of the first token
+        scanner = (Token('[a-z]+') & Token('[0-9]+')).get_scan()
+        scanner.pattern = None
+        assert list(scanner('ab 12 !! c 3 x')) == \
+            [(0, 6, ['ab', '12']), (9, 13, ['c', '3'])], \
+            list(scanner('ab 12 !! c 3 x'))
+        
+    def test_cache(self):
+        matcher = assignment()
+        scanner = matcher.get_scan()
+        assert matcher.get_scan() is scanner
+        matcher.config.no_memoize()
+        assert matcher.get_scan() is not scanner
+
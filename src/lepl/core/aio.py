@@ -0,0 +1,79 @@
+
+# The contents of this file are subject to the Mozilla Public License
+# (MPL) Version 1.1 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License
+# at http://www.mozilla.org/MPL/
+#
+# Software distributed under the License is distributed on an "AS IS"
+# basis, WITHOUT WARRANTY OF ANY KIND, either express or implied. See
+# the License for the specific language governing rights and
+# limitations under the License.
+#
+# The Original Code is LEPL (http://www.acooke.org/lepl)
+# The Initial Developer of the Original Code is Andrew Cooke.
+# Portions created by the Initial Developer are Copyright (C) 2009-2010
+# Andrew Cooke (andrew@acooke.org). All Rights Reserved.
+#
+# Alternatively, the contents of this file may be used under the terms
+# of the LGPL license (the GNU Lesser General Public License,
+# http://www.gnu.org/licenses/lgpl.html), in which case the provisions
+# of the LGPL License are applicable instead of those above.
+#
+# If you wish to allow use of your version of this file only under the
+# terms of the LGPL License and not to allow others to use your version
+# of this file under the MPL, indicate your decision by deleting the
+# provisions above and replace them with the notice and other provisions
+# required by the LGPL License.  If you do not delete the provisions
+# above, a recipient may use your version of this file under either the
+# MPL or the LGPL License.
+
+'''
+Parse text from asyncio streams (this module requires Python 3.6, for 
+asynchronous generators).
+
+The coroutines are compiled from source only when the syntax is available,
+so that the module can still be imported (eg. by test discovery) in older
+versions, where `aparse()` raises an error.
+'''
+
+from sys import version_info
+
+
+_SOURCE = '''
+async def _chunks(reader, size):
+    """
+    The data from the reader, which can be an `asyncio.StreamReader` (or
+    anything with a `read(size)` coroutine) or an asynchronous iterable.
+    """
+    if hasattr(reader, 'read'):
+        while True:
+            data = await reader.read(size)
+            if not data:
+                break
+            yield data
+    else:
+        async for data in reader:
+            yield data
+
+
+async def aparse(parser, reader, size=65536):
+    """
+    Feed the data from the reader to a `PushParser`, yielding the results
+    as they are completed.  The parser is closed when the data end.
+    """
+    async for data in _chunks(reader, size):
+        for result in parser.feed(data):
+            yield result
+    for result in parser.close():
+        yield result
+'''
+
+
+if version_info >= (3, 6):
+    exec(_SOURCE)
+else:
+    def aparse(parser, reader, size=65536):
+        '''
+        Asynchronous generators are not available in this version.
+        '''
+        raise NotImplementedError('Asynchronous parsing requires Python 3.6.')
@@ -0,0 +1,210 @@
+
+# The contents of this file are subject to the Mozilla Public License
+# (MPL) Version 1.1 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License
+# at http://www.mozilla.org/MPL/
+#
+# Software distributed under the License is distributed on an "AS IS"
+# basis, WITHOUT WARRANTY OF ANY KIND, either express or implied. See
+# the License for the specific language governing rights and
+# limitations under the License.
+#
+# The Original Code is LEPL (http://www.acooke.org/lepl)
+# The Initial Developer of the Original Code is Andrew Cooke.
+# Portions created by the Initial Developer are Copyright (C) 2009-2010
+# Andrew Cooke (andrew@acooke.org). All Rights Reserved.
+#
+# Alternatively, the contents of this file may be used under the terms
+# of the LGPL license (the GNU Lesser General Public License,
+# http://www.gnu.org/licenses/lgpl.html), in which case the provisions
+# of the LGPL License are applicable instead of those above.
+#
+# If you wish to allow use of your version of this file only under the
+# terms of the LGPL License and not to allow others to use your version
+# of this file under the MPL, indicate your decision by deleting the
+# provisions above and replace them with the notice and other provisions
+# required by the LGPL License.  If you do not delete the provisions
+# above, a recipient may use your version of this file under either the
+# MPL or the LGPL License.
+
+'''
+Parse many (typically short) inputs with the same parser.
+'''
+
+from logging import getLogger
+
+from lepl.matchers.matcher import Matcher
+from lepl.matchers.memo import _RMemo, _LMemo
+from lepl.support.graph import preorder
+from lepl.support.lib import fmt
+
+
+# what parse_many() does with an error: raise it, or generate None or the
+# exception in place of the result
+ERRORS = ('raise', 'none', 'return')
+
+
+class Batch(object):
+    '''
+    Match a series of inputs.  The work done for each input by `parse()` is
+    reduced: the parser, the stream arguments and the choice of stream for
+    each type of input are found once.  Memoised results are discarded 
+    after each input (otherwise the memo tables keep the results for every
+    input, which, for millions of inputs, is a lot of memory).
+    '''
+    
+    def __init__(self, parser, kargs=None):
+        '''
+        `parser` is a raw parser (from ``matcher._raw_parser()``) and 
+        `kargs` are passed to the stream.
+        '''
+        self.__parser = parser
+        self.__kargs = dict(parser.stream_kargs)
+        self.__kargs.update(kargs or {})
+        self.__streams = {} # type -> factory method
+        self.__memos = [node for node in preorder(parser.matcher, Matcher)
+                        if isinstance(node, (_RMemo, _LMemo))]
+        
+    def __stream(self, input_):
+        '''
+        Create the stream, checking the type of input only once per type.
+        '''
+        type_ = type(input_)
+        try:
+            factory = self.__streams[type_]
+        except KeyError:
+            factory = self.__parser.stream_factory
+            dispatch = getattr(factory, 'dispatch', None)
+            if dispatch:
+                factory = dispatch(input_)
+            self.__streams[type_] = factory
+        return factory(input_, **self.__kargs)
+        
+    def match(self, input_):
+        '''
+        The first match, as a (results, stream) pair, or None.
+        '''
+        try:
+            return next(self.__parser.match_stream(self.__stream(input_)))
+        except StopIteration:
+            return None
+        finally:
+            for memo in self.__memos:
+                memo._clear()
+    
+    def parse(self, input_):
+        '''
+        The results from the first match, or None.
+        '''
+        match = self.match(input_)
+        return None if match is None else match[0]
+    
+    
+# the batch used by each worker process (see _start_worker())
+_WORKER = None
+
+
+def _start_worker(matcher, kargs):
+    '''
+    Prepare a worker process.  The worker process is forked, so the 
+    matcher is not pickled.
+    '''
+    global _WORKER
+    _WORKER = Batch(matcher._raw_parser(), kargs)
+    
+    
+class _Failure(object):
+    '''
+    An exception raised in a worker process.  Exceptions are not sent to 
+    the parent directly because many (eg. `FullFirstMatchException`) 
+    cannot be unpickled (which stops the pool).
+    '''
+    
+    def __init__(self, error):
+        self.type_ = type(error)
+        self.message = str(error)
+        
+    def error(self):
+        '''
+        Construct the exception again (in the parent).  The constructor is
+        not called, since it may expect something other than the message.
+        '''
+        error = self.type_.__new__(self.type_, self.message)
+        error.args = (self.message,)
+        return error
+        
+    def raise_(self):
+        '''
+        Raise the exception again (in the parent).
+        '''
+        raise self.error()
+
+
+def _parse_in_worker(input_):
+    '''
+    Parse the input in a worker process.
+    '''
+    try:
+        return _WORKER.parse(input_)
+    except Exception as error: # pylint: disable-msg=W0703
+        return _Failure(error)
+
+
+def _fork_pool():
+    '''
+    The `Pool` class for worker processes that are forked, or None if the
+    operating system cannot fork.
+    '''
+    try:
+        from multiprocessing import get_context
+    except ImportError: # Python 2, which always forks on Unix
+        from multiprocessing import Pool
+        return Pool
+    try:
+        return get_context('fork').Pool
+    except ValueError: # eg. Windows
+        return None
+
+
+def parse_many(matcher, inputs, processes=None, chunksize=100, kargs=None,
+               errors='raise'):
+    '''
+    Parse each input, generating the results in order (see 
+    `ParserMixin.parse_many()`).
+    '''
+    if errors not in ERRORS:
+        raise ValueError(fmt('errors must be one of {0}, not {1!r}.', 
+                             ', '.join(ERRORS), errors))
+    Pool = None
+    if processes is not None:
+        Pool = _fork_pool()
+        if Pool is None:
+            # a new (not forked) process would need the matcher pickled
+            getLogger('lepl.core.batch.parse_many').warning(
+                'Cannot fork worker processes; parsing in this process.')
+    if Pool is None:
+        batch = Batch(matcher._raw_parser(), kargs)
+        for input_ in inputs:
+            if errors == 'raise':
+                yield batch.parse(input_)
+            else:
+                try:
+                    result = batch.parse(input_)
+                except Exception as error: # pylint: disable-msg=W0703
+                    result = None if errors == 'none' else error
+                yield result
+    else:
+        # build the parser before forking so that it is shared
+        matcher._raw_parser()
+        pool = Pool(processes, _start_worker, (matcher, kargs))
+        try:
+            for result in pool.imap(_parse_in_worker, inputs, chunksize):
+                if isinstance(result, _Failure):
+                    if errors == 'raise':
+                        result.raise_()
+                    result = None if errors == 'none' else result.error()
+                yield result
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
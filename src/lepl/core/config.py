@@ -68,6 +68,12 @@ class ConfigBuilder(object):
         self.__stream_factory = DEFAULT_STREAM_FACTORY
         self.__alphabet = None
         self.__stream_kargs = {}
+        # the `Profile` used by the profile monitor, if any
+        self.profiler = None
+        # the `StackSamples` used by the sample monitor, if any
+        self.sampler = None
+        # the `MemoAdvisor` used by advised memoization, if any
+        self.memo_advisor = None
         # this is set from the matcher.  it gives a memory loop, but not a 
         # very serious one, and allows single line configuration which is 
         # useful for timing.
@@ -79,7 +85,8 @@ class ConfigBuilder(object):
         '''
         if not self.__started:
             self.__started = True
-            self.default()
+            # no need to clear, and an alphabet may already have been given
+            self.__default()
             
         
     # raw access to basic components
@@ -278,6 +285,23 @@ class ConfigBuilder(object):
         from lepl.core.rewriters import FullFirstMatch
         return self.remove_all_rewriters(FullFirstMatch)
     
+    def lazy_deepest(self, lazy=True):
+        '''
+        Do not track the deepest point read from the stream while parsing
+        (this is only used for the error message from `full_first_match()`
+        and otherwise has a cost for every value read).  Instead, if the 
+        first match fails, it is repeated with tracking enabled to find the
+        location of the error.
+        
+        Because the match is repeated, any actions are called a second time
+        when there is an error.
+        
+        This is not used by default.  It can be disabled with 
+        ``lazy_deepest(False)``.
+        '''
+        self.clear_cache()
+        return self.add_stream_kargs(deepest=not lazy)
+    
     def flatten(self):
         '''
         Combined nested `And()` and `Or()` matchers.  This does not change
@@ -314,10 +338,15 @@ class ConfigBuilder(object):
         efficiency and should not change the parser semantics.
         
         This is part of the default configuration.  It can be removed with
-        `no_compile_regexp`.
+        `no_compile_regexp`.  NFA regular expressions cannot match bytes,
+        so a `ByteAlphabet` is rejected (use `compile_to_dfa()`).
         '''
+        from lepl.regexp.byte import ByteAlphabet
         from lepl.regexp.matchers import NfaRegexp
         from lepl.regexp.rewriters import CompileRegexp
+        if isinstance(alphabet, ByteAlphabet):
+            raise ValueError('NFA regular expressions cannot match bytes; '
+                             'use compile_to_dfa().')
         self.alphabet(alphabet)
         return self.add_rewriter(
                     CompileRegexp(self.__get_alphabet(), force))
@@ -485,6 +514,61 @@ class ConfigBuilder(object):
         self.no_memoize()
         return self.add_rewriter(RightMemoize())
     
+    def record_memoize(self, advisor=None, conservative=False, d=0):
+        '''
+        Instrument the parser to measure which matchers would benefit from 
+        memoization.  Left-recursive loops are handled as for 
+        ``config.auto_memoize()``; other matchers are not memoized, but 
+        record how often they are called repeatedly at the same position in 
+        the input, and how much time that takes.  The results are available
+        as ``config.memo_advisor`` (an instance of `MemoAdvisor`):
+        
+          expr.config.record_memoize()
+          expr.parse(typical_input)
+          print(expr.config.memo_advisor.report())
+          expr.config.advised_memoize()
+          
+        '''
+        from lepl.core.rewriters import AdvisedMemoize
+        from lepl.matchers.memo import MemoAdvisor
+        advisor = MemoAdvisor() if advisor is None else advisor
+        self.no_memoize()
+        self.add_rewriter(AdvisedMemoize(advisor, record=True, 
+                                         conservative=conservative, d=d))
+        self.memo_advisor = advisor
+        return self
+        
+    def advised_memoize(self, advisor=None, conservative=False, d=0,
+                        min_repeats=2, min_ratio=0.1, min_share=0.01):
+        '''
+        Memoize only the matchers recommended by the advisor (by default,
+        ``config.memo_advisor``, as populated after 
+        ``config.record_memoize()``).  This avoids the memory cost of 
+        memoizing every matcher.
+        
+        A matcher is memoized if it was called repeatedly at the same 
+        position at least ``min_repeats`` times, and if the repeated calls 
+        were at least ``min_ratio`` of all calls, and if the time saved is
+        at least ``min_share`` of the total.
+        
+        Note that ``conservative`` defaults to ``False`` here (only left-most
+        loops receive the left memoizer) so that more matchers are 
+        candidates for the advice.
+        '''
+        from lepl.core.rewriters import AdvisedMemoize
+        if advisor is None:
+            advisor = self.memo_advisor
+        if advisor is None:
+            raise ConfigurationError(
+                'No advisor - use config.record_memoize() first.')
+        self.no_memoize()
+        self.add_rewriter(AdvisedMemoize(advisor, conservative=conservative, 
+                                         d=d, min_repeats=min_repeats,
+                                         min_ratio=min_ratio, 
+                                         min_share=min_share))
+        self.memo_advisor = advisor
+        return self
+        
     def no_memoize(self):
         '''
         Remove memoization.  To use the default configuration without
@@ -613,6 +697,45 @@ class ConfigBuilder(object):
         return self.add_monitor(
                 RecordDeepest(n_before, n_results_after, n_done_after))
     
+    def profile(self, profile=None):
+        '''
+        Add a monitor that records call counts and times for each matcher.
+        The data are accumulated in the given `Profile` (or a new instance),
+        which is available afterwards as ``config.profiler``:
+        
+          expr.config.profile()
+          expr.parse(text)
+          print(expr.config.profiler.report())
+        
+        This is not used by default as it has a significant cost at runtime.
+        '''
+        from lepl.core.profile import Profile, ProfileMonitor
+        profile = Profile() if profile is None else profile
+        self.add_monitor(ProfileMonitor(profile))
+        self.profiler = profile
+        return self
+    
+    def sample(self, interval=1000, period=None, samples=None):
+        '''
+        Add a monitor that samples the trampoline stack every `interval`
+        epochs (or every `period` seconds of CPU time, using a timer 
+        signal).  The samples are accumulated in the given `StackSamples`
+        (or a new instance), which is available afterwards as 
+        ``config.sampler``:
+        
+          expr.config.sample(100)
+          expr.parse(text)
+          expr.config.sampler.dump('parse.folded')
+          
+        This has a much lower cost than `profile()`, but is still not used
+        by default.
+        '''
+        from lepl.core.profile import StackSamples, SampleMonitor
+        samples = StackSamples() if samples is None else samples
+        self.add_monitor(SampleMonitor(samples, interval, period))
+        self.sampler = samples
+        return self
+    
     # packages
    
     def clear(self):
@@ -626,6 +749,9 @@ class ConfigBuilder(object):
         self.__monitors = []
         self.__stream_factory = DEFAULT_STREAM_FACTORY
         self.__alphabet = None
+        self.profiler = None
+        self.sampler = None
+        self.memo_advisor = None
         return self
 
     def default(self):
@@ -635,6 +761,12 @@ class ConfigBuilder(object):
         configuration.  It provides a moderately efficient, stable parser.
         '''
         self.clear()
+        return self.__default()
+    
+    def __default(self):
+        '''
+        Add the default rewriters and monitors.
+        '''
         self.flatten()
         self.trace_variables()
         self.compose_transforms()
@@ -653,9 +785,20 @@ class ParserMixin(object):
     
     def __init__(self, *args, **kargs):
         super(ParserMixin, self).__init__(*args, **kargs)
-        self.config = ConfigBuilder(self)
+        self.__config = None
         self.__raw_parser_cache = None
         self.__from = None # needed to check cache is valid
+        self.__scanner_cache = None # (raw parser, scanner)
+        
+    @property
+    def config(self):
+        '''
+        The `ConfigBuilder` for this matcher (created on demand, since most
+        matchers are never configured directly).
+        '''
+        if self.__config is None:
+            self.__config = ConfigBuilder(self)
+        return self.__config
         
     def _raw_parser(self, from_=None):
         '''
@@ -706,6 +849,13 @@ class ParserMixin(object):
         '''
         return self._raw_parser('string')
     
+    def get_match_bytes(self):
+        '''
+        Get a function that will parse bytes (or a bytearray) returning a 
+        sequence of (results, stream) pairs.
+        '''
+        return self._raw_parser('bytes')
+    
     def get_match_sequence(self):
         '''
         Get a function that will parse the contents of a generic sequence
@@ -753,6 +903,13 @@ class ParserMixin(object):
         '''
         return self.get_match_string()(string, **kargs)
     
+    def match_bytes(self, bytes_, **kargs):
+        '''
+        Parse bytes (or a bytearray), returning a sequence of 
+        (results, stream) pairs.
+        '''
+        return self.get_match_bytes()(bytes_, **kargs)
+    
     def match_sequence(self, sequence, **kargs):
         '''
         Parse the contents of a generic sequence (with [] and len()) 
@@ -799,6 +956,13 @@ class ParserMixin(object):
         '''
         return make_single(self.get_match_string())
     
+    def get_parse_bytes(self):
+        '''
+        Get a function that will parse bytes (or a bytearray) returning a 
+        single match.
+        '''
+        return make_single(self.get_match_bytes())
+    
     def get_parse_sequence(self):
         '''
         Get a function that will parse the contents of a generic sequence
@@ -842,6 +1006,12 @@ class ParserMixin(object):
         '''
         return self.get_parse_string()(string, **kargs)
     
+    def parse_bytes(self, bytes_, **kargs):
+        '''
+        Parse bytes (or a bytearray), returning a single match.
+        '''
+        return self.get_parse_bytes()(bytes_, **kargs)
+    
     def parse_sequence(self, sequence, **kargs):
         '''
         Pparse the contents of a generic sequence (with [] and len()) 
@@ -888,6 +1058,13 @@ class ParserMixin(object):
         '''
         return make_multiple(self.get_match_string())
 
+    def get_parse_bytes_all(self):
+        '''
+        Get a function that will parse bytes (or a bytearray), returning a 
+        sequence of matches.
+        '''
+        return make_multiple(self.get_match_bytes())
+
     def get_parse_sequence_all(self):
         '''
         Get a function that will parse the contents of a generic sequence
@@ -932,6 +1109,12 @@ class ParserMixin(object):
         '''
         return self.get_parse_string_all()(string, **kargs)
 
+    def parse_bytes_all(self, bytes_, **kargs):
+        '''
+        Parse bytes (or a bytearray), returning a sequence of matches.
+        '''
+        return self.get_parse_bytes_all()(bytes_, **kargs)
+
     def parse_sequence_all(self, sequence, **kargs):
         '''
         Parse the contents of a generic sequence (with [] and len()) 
@@ -946,3 +1129,114 @@ class ParserMixin(object):
         parser.
         '''
         return self.get_parse_all()(input_, **kargs)
+
+    def parse_session(self, text, **kargs):
+        '''
+        Parse a string, returning a `ParseSession` that contains the result
+        and that can be passed to `reparse()` after the text is edited.
+        '''
+        from lepl.core.incremental import ParseSession
+        return ParseSession(self._raw_parser('incremental'), text, kargs)
+    
+    def reparse(self, session, offset, removed, inserted):
+        '''
+        Parse the text of an earlier `ParseSession` after replacing 
+        `removed` characters at `offset` with the string `inserted`, 
+        returning a new session.  Memoised results that do not depend on 
+        the edited text are re-used, so this does much less work than 
+        parsing the new text.  The session's parser (the one that created 
+        it) is used.
+        '''
+        return session.edit(offset, removed, inserted)
+
+    def push_parser(self, encoding='utf8', **kargs):
+        '''
+        Get a `PushParser`, which parses text as it arrives: text (or 
+        bytes, which are decoded) is given to `feed()` and the end marked 
+        by `close()`; both return the results that are complete.  The 
+        matcher is matched repeatedly, so should match a single message 
+        (with ``config.full_first_match(False)``) to parse a series of 
+        messages.  New text is parsed once the unmatched text has grown by 
+        a factor of `growth`, or a chunk contains `delimiter` (see
+        `PushParser`).
+        '''
+        from lepl.core.push import PushParser
+        return PushParser(self, encoding=encoding, **kargs)
+    
+    def aparse(self, reader, encoding='utf8', size=65536, **kargs):
+        '''
+        Parse the data from an `asyncio.StreamReader` (or an asynchronous
+        iterable), returning an asynchronous iterator over results (see
+        `push_parser()`).  This requires Python 3.6:: 
+        
+            async for result in matcher.aparse(reader):
+                ...
+        '''
+        from lepl.core.aio import aparse
+        return aparse(self.push_parser(encoding=encoding, **kargs), 
+                      reader, size=size)
+
+    def match_many(self, inputs, **kargs):
+        '''
+        Generate the first match, as a (results, stream) pair, or None, 
+        for each of the inputs in turn.  This is faster than calling 
+        `match()` for each input, because the parser and stream are 
+        prepared once, and memory does not grow with the number of inputs, 
+        because memoised results are discarded after each input.
+        '''
+        from lepl.core.batch import Batch
+        batch = Batch(self._raw_parser(), kargs)
+        for input_ in inputs:
+            yield batch.match(input_)
+    
+    def parse_many(self, inputs, processes=None, chunksize=100, 
+                   errors='raise', **kargs):
+        '''
+        Generate the results, or None, for each of the inputs in turn 
+        (like calling `parse()` for each input, but see `match_many()`).
+        
+        By default an error (eg. `FullFirstMatchException`) is raised, 
+        which ends the generator.  With `errors` of ``'none'`` None is
+        generated for an input that raises an error, and with ``'return'``
+        the exception is generated; either way the remaining inputs are
+        parsed.
+        
+        If `processes` is given then the inputs are parsed, in groups of 
+        `chunksize`, by that many worker processes.  This requires results
+        that can be pickled, and an operating system that can fork 
+        processes (otherwise, a warning is logged and the inputs are parsed
+        in this process).  The results are still generated in order, and an
+        error from a worker is raised (or generated) again, with the same 
+        type and message, when its input is reached.
+        '''
+        from lepl.core.batch import parse_many
+        return parse_many(self, inputs, processes=processes, 
+                          chunksize=chunksize, kargs=kargs, errors=errors)
+
+    def get_scan(self):
+        '''
+        Get a function that takes a string and generates the matches within
+        it (see `scan()`).
+        '''
+        from lepl.core.scan import Scanner
+        parser = self._raw_parser()
+        if self.__scanner_cache is None or \
+                self.__scanner_cache[0] is not parser:
+            self.__scanner_cache = (parser, Scanner(self, parser))
+        return self.__scanner_cache[1]
+        
+    def scan(self, text, **kargs):
+        '''
+        Generate (start, end, results) for each match in the string `text`,
+        where `text[start:end]` is the matched text.  Matches do not overlap
+        and matches that consume no text are ignored.  The text does not 
+        need to match as a whole (`full_first_match()` is not used).
+        
+        This is faster than searching with a matcher like 
+        ``SkipTo(matcher)``: the text is searched (with the `re` package) 
+        for the characters, or literal text, that can start a match and the
+        matcher is only called there.  When tokens are used, the end of a 
+        match is the start of the following token, and text that cannot be
+        split into tokens fails to match.
+        '''
+        return self.get_scan()(text, **kargs)
@@ -0,0 +1,141 @@
+
+# The contents of this file are subject to the Mozilla Public License
+# (MPL) Version 1.1 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License
+# at http://www.mozilla.org/MPL/
+#
+# Software distributed under the License is distributed on an "AS IS"
+# basis, WITHOUT WARRANTY OF ANY KIND, either express or implied. See
+# the License for the specific language governing rights and
+# limitations under the License.
+#
+# The Original Code is LEPL (http://www.acooke.org/lepl)
+# The Initial Developer of the Original Code is Andrew Cooke.
+# Portions created by the Initial Developer are Copyright (C) 2009-2010
+# Andrew Cooke (andrew@acooke.org). All Rights Reserved.
+#
+# Alternatively, the contents of this file may be used under the terms
+# of the LGPL license (the GNU Lesser General Public License,
+# http://www.gnu.org/licenses/lgpl.html), in which case the provisions
+# of the LGPL License are applicable instead of those above.
+#
+# If you wish to allow use of your version of this file only under the
+# terms of the LGPL License and not to allow others to use your version
+# of this file under the MPL, indicate your decision by deleting the
+# provisions above and replace them with the notice and other provisions
+# required by the LGPL License.  If you do not delete the provisions
+# above, a recipient may use your version of this file under either the
+# MPL or the LGPL License.
+
+'''
+Incremental parsing: after a small edit to the text, parse it again re-using
+the memoised results that the edit did not affect.
+'''
+
+from lepl.matchers.matcher import Matcher
+from lepl.matchers.memo import _RMemo, _LMemo
+from lepl.support.graph import preorder
+from lepl.support.lib import add_defaults, fmt
+
+
+class ParseSession(object):
+    '''
+    The result of parsing a string, with the memoised results needed to 
+    parse the string again, incrementally, after an edit.  Create with
+    `ParserMixin.parse_session()`; `edit()` (or `ParserMixin.reparse()`) 
+    returns a new session for the edited text.
+    
+    Results are re-used from the `RMemo` tables (the default configuration
+    memoizes all matchers).  A match that read only text before the edit, 
+    or that started after it, is re-used (in the second case at the new 
+    offset); all others are evaluated again.  So the parser repeats work 
+    near the edit and for the matchers that contain it, rather than for 
+    the whole text.  Moving the tables still takes time in proportion to
+    their size, but this is much less than parsing.
+    
+    This assumes that matchers read forwards from where they start (which
+    is true for the matchers in Lepl).  Values are re-used, not copied, 
+    so results that describe their position in the text (eg. error nodes)
+    may refer to the earlier text.  Parsers that use `LMemo` (eg. from
+    `config.auto_memoize()`) are always evaluated in full.
+    
+    The result of the match is `result` (None if it failed).  If the
+    parser raised an exception (eg. a `FullFirstMatchException` for 
+    incomplete text) then it is stored as `error` and the session can 
+    still be edited.  `reused` is the number of memoised entries moved 
+    from the previous session.  `end` is the offset where the match ended
+    (None if it failed, or if the match did not end in the text, eg. when
+    using tokens) and `horizon` the offset just past the text that was 
+    read (one more than the length if the end of the text was found).
+    '''
+    
+    def __init__(self, parser, text, kargs=None, previous=None, 
+                 edit=(0, 0, 0)):
+        '''
+        `parser` is a raw parser (from ``matcher._raw_parser('incremental')``)
+        and `kargs` are passed to its stream.  `previous` and `edit` are 
+        used by `edit()`.
+        '''
+        self.parser = parser
+        self.text = text
+        self.result = None
+        self.error = None
+        self.reused = 0
+        self.end = None
+        self.horizon = 0
+        self.__kargs = {} if kargs is None else kargs
+        if previous:
+            (self.__memos, self.__incremental) = \
+                (previous.__memos, previous.__incremental)
+        else:
+            nodes = list(preorder(parser.matcher, Matcher))
+            self.__memos = [node for node in nodes 
+                            if isinstance(node, _RMemo)]
+            self.__incremental = not any(isinstance(node, _LMemo) 
+                                         for node in nodes)
+        kargs = dict(self.__kargs)
+        # a failed match is repeated to find the error (see FullFirstMatch)
+        add_defaults(kargs, {'deepest': False})
+        stream = parser.make_stream(text, **kargs)
+        self.__helper = helper = stream[1]
+        id_ = helper.id
+        if previous and self.__incremental:
+            for memo in self.__memos:
+                self.reused += memo._move(previous.__helper, helper, *edit)
+        elif previous:
+            for memo in self.__memos:
+                memo._forget(previous.__helper)
+        try:
+            (self.result, stream) = next(parser.match_stream(stream))
+            if stream[1] is helper:
+                self.end = stream[0]
+        except StopIteration:
+            pass
+        except Exception as error: # pylint: disable-msg=W0703
+            self.error = error
+        finally:
+            self.horizon = helper.horizon
+            # the id is changed when repeating a failed match
+            if helper.id != id_:
+                for memo in self.__memos:
+                    memo._forget(helper)
+                helper.id = id_
+                
+    def edit(self, offset, removed, inserted):
+        '''
+        Parse the text after replacing `removed` characters at `offset` with
+        the string `inserted`, returning a new session.  The memoised 
+        results are moved to the new session, so this session should not 
+        be edited again (it would work, but parse the new text in full).
+        '''
+        if not 0 <= offset <= offset + removed <= len(self.text):
+            raise ValueError(
+                fmt('Cannot remove {0} characters at offset {1} from a text '
+                    'of length {2}', removed, offset, len(self.text)))
+        text = self.text[:offset] + inserted + self.text[offset+removed:]
+        return ParseSession(self.parser, text, self.__kargs, self,
+                            (offset, removed, len(inserted)))
+    
+    def __repr__(self):
+        return fmt('<ParseSession({0} chars, {1} reused)>', 
+                   len(self.text), self.reused)
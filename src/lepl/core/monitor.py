@@ -119,6 +119,35 @@ class StackMonitor(object):
         pass
     
     
+class Sampler(object):
+    '''
+    An interface expected by `trampoline()`, called only at the epochs that
+    it requests (so there is no cost for the epochs between samples).  A 
+    parser uses at most one.
+    '''
+    
+    def start(self, epoch, stack):
+        '''
+        Called when the trampoline starts, or continues after returning a 
+        result.  Returns the epoch at which `sample()` is next called.
+        '''
+        return epoch
+    
+    def sample(self, epoch, stack):
+        '''
+        Called at the requested epoch.  Returns the next epoch at which it
+        is called.
+        '''
+        return epoch + 1
+    
+    def stop(self):
+        '''
+        Called when the trampoline returns a result or raises an exception
+        (and when it is closed).
+        '''
+        pass
+    
+    
 class ActiveMonitor(StackMonitor):
     '''
     A `StackMonitor` implementation that allows matchers that implement the
@@ -274,9 +303,10 @@ class MultipleStackMonitors(StackMonitor):
 def prepare_monitors(monitor_factories):
     '''
     Take a list of monitor factories and return an active and a passive
-    monitor (or None, if none given).
+    monitor, and a `Sampler` (or None, if none given).
     '''
     stack, value = MultipleStackMonitors(), MultipleValueMonitors()
+    sampler = None
     monitor_factories = [] if monitor_factories is None else monitor_factories
     for monitor_factory in monitor_factories:
         monitor = monitor_factory()
@@ -284,4 +314,8 @@ def prepare_monitors(monitor_factories):
             stack.append(monitor)
         if isinstance(monitor, ValueMonitor):
             value.append(monitor)
-    return (stack if stack else None, value if value else None)
+        if isinstance(monitor, Sampler):
+            if sampler is not None:
+                raise ValueError('A parser can have only one sampler')
+            sampler = monitor
+    return (stack if stack else None, value if value else None, sampler)
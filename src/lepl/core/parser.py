@@ -111,10 +111,13 @@ class GeneratorWrapper(object):
         return self.__repr__()
         
 
-def trampoline(main, m_stack=None, m_value=None):
+def trampoline(main, m_stack=None, m_value=None, m_sample=None):
     '''
     The main parser loop.  Evaluates matchers as coroutines.
     
+    `m_sample` (a `Sampler`) is only called at the epochs it requests; 
+    between those the cost is a comparison.
+    
     A dedicated version for when monitor not present increased the speed of
     the nat_lang performance test by only around 1% (close to noise). 
     
@@ -130,8 +133,11 @@ def trampoline(main, m_stack=None, m_value=None):
         exception_being_raised = False
         epoch = 0
         log = getLogger('lepl.parser.trampoline')
+        if m_sample: sample = m_sample.start(epoch, stack)
         while True:
             epoch += 1
+            if m_sample and epoch >= sample:
+                sample = m_sample.sample(epoch, stack)
             try:
                 if m_value: m_value.next_iteration(epoch, value,
                                                    exception_being_raised, stack)
@@ -169,12 +175,14 @@ def trampoline(main, m_stack=None, m_value=None):
                     # otherwise, the stack is completely unwound so return
                     # to main caller 
                     else:
+                        if m_sample: m_sample.stop()
                         if exception_being_raised:
                             if m_value: m_value.raise_(value)
                             raise value
                         else:
                             if m_value: m_value.yield_(value)
                             yield value
+                        if m_sample: sample = m_sample.start(epoch, stack)
                         # this allows us to restart with a new evaluation
                         # (backtracking) if called again.
                         value = main
@@ -203,6 +211,7 @@ def trampoline(main, m_stack=None, m_value=None):
                         log.debug(fmt('Stack: {0}', generator))
                 raise
     finally:
+        if m_sample: m_sample.stop()
         # record the remaining stack
         while m_stack and stack:
             m_stack.pop(pop())
@@ -213,22 +222,39 @@ def make_raw_parser(matcher, stream_factory, config):
     Make a parser.  Rewrite the matcher and prepare the input for a parser.
     This constructs a function that returns a generator that provides a 
     sequence of matches (ie (results, stream) pairs).
+    
+    The time taken by each rewriter is logged (at debug level) and 
+    available as `rewrite_times` on the parser.  The parser also has
+    `make_stream()` and `match_stream()` attributes, which separate the 
+    creation of the stream from matching it, and `stream_factory` and
+    `stream_kargs`, which `make_stream()` uses.
     '''
-    for rewriter in config.rewriters:
-        #print(rewriter)
-        #print(matcher.tree())
-        matcher = rewriter(matcher)
-    (m_stack, m_value) = prepare_monitors(config.monitors)
+    from lepl.core.rewriters import rewrite
+    times = []
+    matcher = rewrite(matcher, config.rewriters, times)
+    log = getLogger('lepl.core.parser.make_raw_parser')
+    for (name, seconds) in times:
+        log.debug(fmt('{0}: {1:.3f}s', name, seconds))
+    (m_stack, m_value, m_sample) = prepare_monitors(config.monitors)
     # pylint bug here? (E0601)
     # pylint: disable-msg=W0212, E0601
     # (_match is meant to be hidden)
     # pylint: disable-msg=W0142
-    def parser(arg, **kargs):
+    def make_stream(arg, **kargs):
         stream_kargs = dict(config.stream_kargs)
         stream_kargs.update(kargs)
-        return trampoline(matcher._match(stream_factory(arg, **stream_kargs)), 
-                          m_stack=m_stack, m_value=m_value)
+        return stream_factory(arg, **stream_kargs)
+    def match_stream(stream):
+        return trampoline(matcher._match(stream), 
+                          m_stack=m_stack, m_value=m_value, m_sample=m_sample)
+    def parser(arg, **kargs):
+        return match_stream(make_stream(arg, **kargs))
     parser.matcher = matcher
+    parser.make_stream = make_stream
+    parser.match_stream = match_stream
+    parser.stream_factory = stream_factory
+    parser.stream_kargs = config.stream_kargs
+    parser.rewrite_times = times
     return parser
 
 
@@ -242,6 +268,7 @@ def make_multiple(raw):
         '''
         return imap(lambda x: x[0], raw(arg, **kargs))
     multiple.matcher = raw.matcher
+    multiple.rewrite_times = raw.rewrite_times
     return multiple
 
 
@@ -258,4 +285,5 @@ def make_single(raw):
         except StopIteration:
             return None
     single.matcher = raw.matcher
+    single.rewrite_times = raw.rewrite_times
     return single
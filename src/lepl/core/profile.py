@@ -0,0 +1,433 @@
+
+# The contents of this file are subject to the Mozilla Public License
+# (MPL) Version 1.1 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License
+# at http://www.mozilla.org/MPL/
+#
+# Software distributed under the License is distributed on an "AS IS"
+# basis, WITHOUT WARRANTY OF ANY KIND, either express or implied. See
+# the License for the specific language governing rights and
+# limitations under the License.
+#
+# The Original Code is LEPL (http://www.acooke.org/lepl)
+# The Initial Developer of the Original Code is Andrew Cooke.
+# Portions created by the Initial Developer are Copyright (C) 2009-2010
+# Andrew Cooke (andrew@acooke.org). All Rights Reserved.
+#
+# Alternatively, the contents of this file may be used under the terms
+# of the LGPL license (the GNU Lesser General Public License,
+# http://www.gnu.org/licenses/lgpl.html), in which case the provisions
+# of the LGPL License are applicable instead of those above.
+#
+# If you wish to allow use of your version of this file only under the
+# terms of the LGPL License and not to allow others to use your version
+# of this file under the MPL, indicate your decision by deleting the
+# provisions above and replace them with the notice and other provisions
+# required by the LGPL License.  If you do not delete the provisions
+# above, a recipient may use your version of this file under either the
+# MPL or the LGPL License.
+
+'''
+Profile the matchers in a parser.
+
+`Profile` accumulates, for each matcher in the (rewritten) graph, the number
+of times it was called, how often it was re-entered to find another match
+(backtracking), how many results and failures it returned, and the time 
+spent evaluating it.  The data are collected by a monitor (see 
+`ProfileMonitor()` and `ConfigBuilder.profile()`) and can be displayed as 
+a table or passed to the standard ``pstats`` module.
+
+Recording every step is expensive, so for large inputs `StackSamples` 
+provides a cheaper alternative: the trampoline stack is sampled every N 
+epochs (or when a timer signal arrives) and the matcher call paths are 
+counted.  The result is written in the "folded stack" format used by 
+flame graph tools (see `SampleMonitor()` and `ConfigBuilder.sample()`).
+
+Only matchers that are evaluated via the trampoline are visible - matchers
+that are called directly (see `ConfigBuilder.direct_eval()`) are included in 
+the time of their parent.
+'''
+
+from marshal import dump
+try:
+    from signal import signal, setitimer, SIGPROF, ITIMER_PROF
+except ImportError:
+    setitimer = None
+from weakref import WeakKeyDictionary
+try:
+    from time import perf_counter as timer
+except ImportError:
+    from time import time as timer
+
+from lepl.core.monitor import StackMonitor, ValueMonitor, Sampler
+from lepl.support.lib import LogMixin, fmt, str
+
+
+SORT_KEYS = ('exclusive', 'inclusive', 'calls', 'entries', 'backtracks', 
+             'results', 'failures', 'index')
+'''The values that can be used to sort a report.'''
+
+
+class MatcherProfile(object):
+    '''
+    The data recorded for a single matcher.
+    
+    `calls` counts the number of times the matcher was invoked (ie the number 
+    of generators created); `entries` the number of times those generators
+    were evaluated; `backtracks` the number of re-entries (requests for an 
+    additional match).  `inclusive` is the time during which the matcher was
+    on the stack (counted once for recursive calls) and `exclusive` is the 
+    time when it was at the top of the stack.
+    '''
+    
+    __slots__ = ['matcher', 'index', 'calls', 'entries', 'backtracks',
+                 'results', 'failures', 'inclusive', 'exclusive', 'callers',
+                 'active']
+    
+    def __init__(self, matcher, index):
+        self.matcher = matcher
+        self.index = index
+        self.calls = 0
+        self.entries = 0
+        self.backtracks = 0
+        self.results = 0
+        self.failures = 0
+        self.inclusive = 0.0
+        self.exclusive = 0.0
+        self.callers = {}
+        self.active = 0
+        
+    def key(self):
+        '''
+        A key in the format used by ``pstats`` (file, line, function).  The
+        line is the index of the matcher, which makes the key unique.
+        '''
+        return ('lepl', self.index, str(self.matcher))
+    
+    def __str__(self):
+        return fmt('{0:7d} {1:7d} {2:7d} {3:7d} {4:9.4f} {5:9.4f}  {6:d}:{7!s}',
+                   self.calls, self.backtracks, self.results, self.failures,
+                   self.inclusive, self.exclusive, self.index, self.matcher)
+
+
+class Profile(object):
+    '''
+    Accumulate profile data across one or more parses.
+    
+    The report (`report()` or ``str()``) lists matchers sorted by exclusive
+    time.  An instance can also be given directly to ``pstats.Stats`` or 
+    saved with `dump_stats()` for later analysis.
+    '''
+    
+    def __init__(self):
+        self.__profiles = {}
+        self.stats = {}
+        
+    def get(self, matcher):
+        '''
+        The `MatcherProfile` for the matcher (created if necessary).
+        '''
+        # use the id because matchers may define equality
+        try:
+            return self.__profiles[id(matcher)]
+        except KeyError:
+            profile = MatcherProfile(matcher, len(self.__profiles))
+            self.__profiles[id(matcher)] = profile
+            return profile
+        
+    def profiles(self, sort='exclusive'):
+        '''
+        A list of `MatcherProfile` instances, sorted by the given attribute
+        (index is ascending, all others are descending).
+        '''
+        if sort not in SORT_KEYS:
+            raise ValueError(fmt('Cannot sort by {0!r} (expected one of {1})',
+                                 sort, ', '.join(SORT_KEYS)))
+        return sorted(self.__profiles.values(),
+                      key=lambda profile: getattr(profile, sort),
+                      reverse=sort != 'index')
+    
+    def clear(self):
+        '''
+        Discard all data.
+        '''
+        self.__profiles = {}
+        self.stats = {}
+        
+    def report(self, sort='exclusive', limit=None):
+        '''
+        A table of the data, with the most expensive matchers first.
+        '''
+        profiles = self.profiles(sort)
+        if limit is not None:
+            profiles = profiles[:limit]
+        lines = ['  calls backtrk results failure inclusive exclusive  '
+                 'matcher']
+        lines.extend(str(profile) for profile in profiles)
+        return '\n'.join(lines)
+    
+    def __str__(self):
+        return self.report()
+    
+    def create_stats(self):
+        '''
+        Generate ``self.stats`` in the format expected by ``pstats.Stats``.
+        The number of entries is used as the total call count and the number 
+        of calls as the "primitive" count.
+        '''
+        self.stats = {}
+        for profile in self.__profiles.values():
+            callers = dict((self.get(caller).key(), count)
+                           for (caller, count) in profile.callers.items())
+            self.stats[profile.key()] = (profile.calls, profile.entries,
+                                         profile.exclusive, profile.inclusive,
+                                         callers)
+        
+    def dump_stats(self, filename):
+        '''
+        Write the data to a file that can be read by ``pstats.Stats``.
+        '''
+        self.create_stats()
+        with open(filename, 'wb') as output:
+            dump(self.stats, output)
+    
+    
+# pylint: disable-msg=C0103
+def ProfileMonitor(profile):
+    '''
+    A monitor (implements `MonitorInterface`, can be supplied to
+    `Configuration`) that records data in the given `Profile`.
+
+    This is a helper function that "escapes" the main class via a function
+    to simplify configuration.
+    '''
+    return lambda: _ProfileMonitor(profile)
+
+
+class _ProfileMonitor(StackMonitor, ValueMonitor, LogMixin):
+    '''
+    Record the data for `Profile`.
+    
+    Times are measured between push and pop on the trampoline stack; the
+    time spent by children is accumulated in the parent's frame so that it 
+    can be subtracted to give exclusive time.
+    '''
+    
+    def __init__(self, profile):
+        super(_ProfileMonitor, self).__init__()
+        self.profile = profile
+        self.__stack = []
+        self.__frames = []
+        self.__known = WeakKeyDictionary()
+        
+    def next_iteration(self, epoch, value, exception, stack):
+        '''
+        Keep a reference to the trampoline stack.
+        '''
+        self.__stack = stack
+        
+    def push(self, generator):
+        '''
+        Start timing the generator.
+        '''
+        profile = self.profile.get(generator.matcher)
+        profile.entries += 1
+        if generator in self.__known:
+            profile.backtracks += 1
+        else:
+            self.__known[generator] = True
+            profile.calls += 1
+            if self.__frames:
+                caller = self.__frames[-1][0].matcher
+                profile.callers[caller] = profile.callers.get(caller, 0) + 1
+        profile.active += 1
+        self.__frames.append([profile, timer(), 0.0])
+        
+    def pop(self, generator):
+        '''
+        Stop timing the generator and credit the parent.
+        '''
+        (profile, start, children) = self.__frames.pop()
+        elapsed = timer() - start
+        profile.exclusive += elapsed - children
+        profile.active -= 1
+        if not profile.active:
+            profile.inclusive += elapsed
+        if self.__frames:
+            self.__frames[-1][2] += elapsed
+            
+    def after_next(self, value):
+        '''
+        Count results.
+        '''
+        self.__result(value)
+        
+    def after_send(self, value):
+        '''
+        Count results.
+        '''
+        self.__result(value)
+        
+    def after_throw(self, value):
+        '''
+        Count results.
+        '''
+        self.__result(value)
+        
+    def __result(self, value):
+        '''
+        A tuple is a result from the generator at the top of the stack.
+        '''
+        if type(value) is tuple and self.__stack:
+            self.profile.get(self.__stack[-1].matcher).results += 1
+            
+    def exception(self, value):
+        '''
+        Count failures (the generator at the top of the stack is exhausted).
+        '''
+        if type(value) is StopIteration and self.__stack:
+            self.profile.get(self.__stack[-1].matcher).failures += 1
+
+
+class StackSamples(object):
+    '''
+    Accumulate samples of the trampoline stack across one or more parses.
+    
+    Each sample is the list of matchers on the stack (outermost first).
+    `folded()` gives one line per distinct path, with the number of times 
+    it was seen, which is the input expected by flame graph tools.
+    '''
+    
+    def __init__(self):
+        self.__counts = {}
+        self.__matchers = {}
+        self.total = 0
+        
+    def add(self, stack):
+        '''
+        Record a sample of the stack (a sequence of `GeneratorWrapper`).
+        '''
+        key = []
+        for generator in stack:
+            # use the id because matchers may define equality
+            matcher = generator.matcher
+            self.__matchers[id(matcher)] = matcher
+            key.append(id(matcher))
+        key = tuple(key)
+        self.__counts[key] = self.__counts.get(key, 0) + 1
+        self.total += 1
+        
+    def counts(self):
+        '''
+        A map from call paths (tuples of matchers) to sample counts.
+        '''
+        return dict((tuple(self.__matchers[ident] for ident in key), count)
+                    for (key, count) in self.__counts.items())
+    
+    def clear(self):
+        '''
+        Discard all data.
+        '''
+        self.__counts = {}
+        self.__matchers = {}
+        self.total = 0
+        
+    @staticmethod
+    def name(matcher):
+        '''
+        The name of a matcher in a folded stack (the separators used by
+        the format are removed).
+        '''
+        return ' '.join(str(matcher).replace(';', ',').split())
+        
+    def folded(self):
+        '''
+        The samples in folded stack format (one path per line, frames
+        separated by semicolons, followed by a count).
+        '''
+        lines = [fmt('{0} {1:d}', ';'.join(map(self.name, path)), count)
+                 for (path, count) in self.counts().items()]
+        return '\n'.join(sorted(lines))
+    
+    def __str__(self):
+        return self.folded()
+    
+    def dump(self, filename):
+        '''
+        Write the samples to a file in folded stack format.
+        '''
+        with open(filename, 'w') as output:
+            output.write(self.folded())
+            output.write('\n')
+            
+            
+# pylint: disable-msg=C0103
+def SampleMonitor(samples, interval=1000, period=None):
+    '''
+    A monitor (implements `MonitorInterface`, can be supplied to
+    `Configuration`) that records the stack in the given `StackSamples` 
+    every `interval` epochs or, if `period` is given, every `period` 
+    seconds of CPU time (using ``SIGPROF``, so only on Unix and from the 
+    main thread).
+
+    This is a helper function that "escapes" the main class via a function
+    to simplify configuration.
+    '''
+    if period is not None and setitimer is None:
+        raise ValueError('Timer sampling is not supported on this platform')
+    return lambda: _SampleMonitor(samples, interval, period)
+
+
+class _SampleMonitor(Sampler, LogMixin):
+    '''
+    Record samples for `StackSamples`.
+    
+    This is a `Sampler`, so the trampoline only calls it when a sample is 
+    due.  In timer mode it is not called at all while parsing: the signal
+    handler records the stack directly.
+    '''
+    
+    def __init__(self, samples, interval=1000, period=None):
+        super(_SampleMonitor, self).__init__()
+        self.samples = samples
+        self.interval = interval
+        self.period = period
+        self.__stack = None
+        self.__previous = None
+        
+    def start(self, epoch, stack):
+        '''
+        Sample at the first epoch or, in timer mode, start the timer.
+        '''
+        if self.period is None:
+            return epoch
+        else:
+            self.__stack = stack
+            self.__previous = signal(SIGPROF, self.__alarm)
+            setitimer(ITIMER_PROF, self.period, self.period)
+            return float('inf')
+        
+    def sample(self, epoch, stack):
+        '''
+        Sample the stack (counter mode).
+        '''
+        if stack:
+            self.samples.add(stack)
+        return epoch + self.interval
+    
+    def __alarm(self, _signum, _frame):
+        '''
+        Sample the stack (timer mode).
+        '''
+        if self.__stack:
+            self.samples.add(self.__stack)
+        
+    def stop(self):
+        '''
+        Stop the timer while the caller has control (it is restarted if 
+        the parser continues).
+        '''
+        if self.__stack is not None:
+            self.__stack = None
+            setitimer(ITIMER_PROF, 0)
+            signal(SIGPROF, self.__previous)
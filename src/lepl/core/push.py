@@ -0,0 +1,202 @@
+
+# The contents of this file are subject to the Mozilla Public License
+# (MPL) Version 1.1 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License
+# at http://www.mozilla.org/MPL/
+#
+# Software distributed under the License is distributed on an "AS IS"
+# basis, WITHOUT WARRANTY OF ANY KIND, either express or implied. See
+# the License for the specific language governing rights and
+# limitations under the License.
+#
+# The Original Code is LEPL (http://www.acooke.org/lepl)
+# The Initial Developer of the Original Code is Andrew Cooke.
+# Portions created by the Initial Developer are Copyright (C) 2009-2010
+# Andrew Cooke (andrew@acooke.org). All Rights Reserved.
+#
+# Alternatively, the contents of this file may be used under the terms
+# of the LGPL license (the GNU Lesser General Public License,
+# http://www.gnu.org/licenses/lgpl.html), in which case the provisions
+# of the LGPL License are applicable instead of those above.
+#
+# If you wish to allow use of your version of this file only under the
+# terms of the LGPL License and not to allow others to use your version
+# of this file under the MPL, indicate your decision by deleting the
+# provisions above and replace them with the notice and other provisions
+# required by the LGPL License.  If you do not delete the provisions
+# above, a recipient may use your version of this file under either the
+# MPL or the LGPL License.
+
+'''
+Parse text that arrives in pieces (eg. from a network connection), returning
+results as soon as they are complete.
+'''
+
+from codecs import getincrementaldecoder
+
+from lepl.support.lib import fmt, add_defaults
+
+
+class PushParserException(Exception):
+    '''
+    Raised when the text given to a `PushParser` cannot be matched.
+    '''
+
+
+class PushParser(object):
+    '''
+    Text is added with `feed()` and the end of the input is marked with 
+    `close()`.  The matcher is matched against the text repeatedly, each 
+    match starting where the last ended, and both methods return a list 
+    of the results (as from `parse()`) that are complete.  A result is 
+    complete when it was found without reading the end of the text, or 
+    after `close()`: until then, more text could change the match (or
+    allow a failed match to succeed), so the parser waits.
+    
+    So to parse a series of messages, match a single message (with
+    ``config.full_first_match(False)``, or with no full first match).  With
+    the default configuration the whole text is matched and the result is
+    returned by `close()`.
+    
+    Nothing blocks: the text is parsed again when more arrives, but this
+    re-uses the memoised work that did not depend on the end of the text
+    (see `ParseSession`), and text that has been matched is discarded.
+    Bytes are decoded (using `encoding`); strings are used directly.
+    
+    Even so, each parse repeats the work that reached the end of the text,
+    which for a single large match is most of it, so parsing after every
+    chunk costs time quadratic in the length of the match.  Instead, new
+    text is buffered until the unmatched text has grown by a factor of
+    `growth` since the last incomplete parse (so the cost stays linear, at
+    about ``growth / (growth - 1)`` full parses), until a chunk contains
+    `delimiter` (eg. a newline, for messages that end with one), or until
+    `close()`.  Results (and errors) can be returned a few chunks later 
+    than the text that completes them; with `growth` of 1 the text is
+    parsed after every chunk.
+    
+    Parser errors (eg. `FullFirstMatchException`) are raised by `feed()` 
+    or `close()`, as is a `PushParserException` if a match fails without 
+    an error, or matches no text.  If earlier results were completed by
+    the same call they are returned first, and the error is raised by the
+    next call (and every call after).  Locations in errors are relative 
+    to the end of the last match.
+    '''
+    
+    def __init__(self, matcher, encoding='utf8', growth=2, delimiter=None,
+                 **kargs):
+        # most matches fail at the end of the text, so avoid repeating them
+        # to find the deepest match (see __error())
+        add_defaults(kargs, {'deepest': True})
+        self.__matcher = matcher
+        self.__kargs = kargs
+        self.__session = matcher.parse_session('', **kargs)
+        self.__decoder = getincrementaldecoder(encoding)()
+        self.__closed = False
+        if growth < 1:
+            raise ValueError(fmt('growth must be at least 1, not {0!r}.',
+                                 growth))
+        self.__growth = growth
+        self.__delimiter = delimiter
+        # text not yet given to the session
+        self.__buffer = []
+        self.__buffered = 0
+        # the length of the text at the last parse that needed more
+        self.__checked = 0
+        # an error found after results that were returned
+        self.__failure = None
+        
+    def feed(self, data):
+        '''
+        Add text (or bytes) to the input, returning any results that are 
+        now complete.
+        '''
+        if self.__failure is not None:
+            raise self.__failure
+        if self.__closed:
+            raise PushParserException('The parser is closed.')
+        return self.__add(data)
+    
+    def close(self):
+        '''
+        Mark the end of the input, returning the remaining results.
+        '''
+        if self.__failure is not None:
+            raise self.__failure
+        if self.__closed:
+            return []
+        data = self.__decoder.decode(b'', True)
+        self.__closed = True
+        return self.__add(data)
+    
+    @property
+    def closed(self):
+        '''
+        Has `close()` been called?
+        '''
+        return self.__closed
+    
+    def __add(self, data):
+        '''
+        Add data at the end of the text and collect complete results.
+        '''
+        if isinstance(data, (bytes, bytearray)):
+            data = self.__decoder.decode(data)
+        if data:
+            self.__buffer.append(data)
+            self.__buffered += len(data)
+        session = self.__session
+        if not (self.__closed 
+                or len(session.text) + self.__buffered 
+                    >= self.__growth * self.__checked
+                or (self.__delimiter is not None and data
+                    and self.__delimiter in data)):
+            return []
+        if self.__buffer:
+            self.__session = session.edit(len(session.text), 0, 
+                                          ''.join(self.__buffer))
+            self.__buffer = []
+            self.__buffered = 0
+        results = []
+        while True:
+            session = self.__session
+            if not self.__closed and session.horizon > len(session.text):
+                self.__checked = len(session.text)
+                return results
+            if self.__closed and not session.text:
+                return results
+            if session.error is not None:
+                return self.__fail(results, self.__error(session))
+            if session.result is None:
+                return self.__fail(results, PushParserException(
+                    fmt('No match for {0!r}.', session.text[:60])))
+            if session.end is None:
+                return self.__fail(results, PushParserException(
+                    fmt('The end of the match for {0!r} is unknown (the '
+                        'result is not a stream over the text).', 
+                        session.text[:60])))
+            if not session.end:
+                return self.__fail(results, PushParserException(
+                    fmt('The match for {0!r} did not consume any text.',
+                        session.text[:60])))
+            results.append(session.result)
+            self.__session = session.edit(0, session.end, '')
+            
+    def __fail(self, results, error):
+        '''
+        Raise the error, unless there are results to return first (then 
+        the error is raised by the next call to `feed()` or `close()`).
+        '''
+        if not results:
+            raise error
+        self.__failure = error
+        return results
+            
+    def __error(self, session):
+        '''
+        The error for a failed match.  The deepest match is not recorded
+        for re-used results, so the text is parsed again, in full, to find
+        the location.
+        '''
+        return self.__matcher.parse_session(session.text, 
+                                            **self.__kargs).error \
+            or session.error
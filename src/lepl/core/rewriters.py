@@ -31,6 +31,8 @@ Rewriters modify the graph of matchers before it is used to generate a
 parser.
 '''
 
+from time import time
+
 from lepl.matchers.memo import LMemo, RMemo
 from lepl.support.graph import preorder, loops, order, NON_TREE, dfs_edges, LEAF
 from lepl.matchers.combine import DepthFirst, DepthNoTrampoline, \
@@ -40,7 +42,8 @@ from lepl.matchers.core import Delayed, Lookahead
 from lepl.matchers.derived import add
 from lepl.matchers.matcher import Matcher, is_child, FactoryMatcher, \
     matcher_type, MatcherTypeException, canonical_matcher_type
-from lepl.matchers.support import NoTrampoline, Transformable
+from lepl.matchers.support import NoTrampoline, Transformable, \
+    BaseFactoryMatcher
 from lepl.support.lib import lmap, fmt, LogMixin, empty, count
 
 
@@ -65,6 +68,11 @@ class Rewriter(LogMixin):
      MEMOIZE,
      TRACE_VARIABLES,
      FULL_FIRST_MATCH) = range(10, 110, 10)
+    
+    # true if the clone function (see `cloner()`) looks at the (already
+    # rewritten) children of a node, which must then not be rewritten 
+    # again in the same traversal (see `rewrite()`).
+    inspects_children = False
        
     def __init__(self, order_, name=None, exclusive=True):
         super(Rewriter, self).__init__()
@@ -111,6 +119,14 @@ class Rewriter(LogMixin):
     def __call__(self, matcher):
         return matcher
     
+    def cloner(self):
+        '''
+        Rewriters that work node by node (via `clone_matcher()`, without
+        looking at the graph as a whole) return their clone function here, 
+        so that they can be combined with others (see `rewrite()`).
+        '''
+        return None
+    
     def __str__(self):
         return self.name
     
@@ -132,7 +148,10 @@ def copy_standard_attributes(node, copy):
     if isinstance(node, Transformable):
         copy.wrapper = node.wrapper
     if isinstance(node, FactoryMatcher):
-        copy.factory = node.factory
+        if isinstance(copy, BaseFactoryMatcher):
+            copy._copy_factory(node)
+        else:
+            copy.factory = node.factory
     if hasattr(node, 'trace_variables'):
         copy.trace_variables = node.trace_variables
 
@@ -182,7 +201,61 @@ def linearise_matcher(node):
     return linear
 
 
-def clone_tree(i, head, reversed, mapping, delayed, clone, duplicate=False):
+def order_trees(trees):
+    '''
+    Re-order the trees returned by `linearise_matcher()` so that the target 
+    of every non-recursive `Delayed()` instance is processed before the tree
+    that contains it.
+    
+    Returns `[(i, head, reversed), ...]`, where `i` is the original index,
+    and the set of `Delayed()` instances that are part of a loop.
+    '''
+    targets = {}
+    for (head, reversed) in trees:
+        targets[head] = [node.matcher for node in reversed 
+                         if isinstance(node, Delayed)]
+    def reachable(start):
+        found = set()
+        pending = [start]
+        while pending:
+            for target in targets[pending.pop()]:
+                if target not in found:
+                    found.add(target)
+                    pending.append(target)
+        return found
+    recursive = set()
+    edges = {}
+    for (head, reversed) in trees:
+        edges[head] = []
+        for node in reversed:
+            if isinstance(node, Delayed):
+                if head in reachable(node.matcher):
+                    recursive.add(node)
+                else:
+                    edges[head].append(node.matcher)
+    index = dict((head, i) for (i, (head, _)) in enumerate(trees))
+    ordered = []
+    done = set()
+    for (head, _) in trees:
+        stack = [(head, iter(edges[head]))]
+        while stack:
+            (node, children) = stack[-1]
+            if node in done:
+                stack.pop()
+                continue
+            try:
+                child = next(children)
+                if child not in done:
+                    stack.append((child, iter(edges[child])))
+            except StopIteration:
+                stack.pop()
+                done.add(node)
+                ordered.append((index[node], node, trees[index[node]][1]))
+    return (ordered, recursive)
+
+
+def clone_tree(i, head, reversed, mapping, delayed, clone, duplicate=False,
+               inline=None):
     '''
     Clone a tree of matchers.  This clones all the matchers in a linearised
     set, except for the `Delayed()` instances, which are re-created without
@@ -205,6 +278,9 @@ def clone_tree(i, head, reversed, mapping, delayed, clone, duplicate=False):
     `duplicate` controls how `Delayed()` instances are handled.  If true then
     a new instance is created for each one.  This does not preserve the 
     graph, but is used by memoisation.
+    
+    `inline`, if given, is the set of `Delayed()` instances that can be 
+    replaced by the (already cloned) matcher they refer to.
     '''
     def rewrite(value):
         try:
@@ -216,7 +292,9 @@ def clone_tree(i, head, reversed, mapping, delayed, clone, duplicate=False):
     n = len(reversed)
     for (j, node) in zip(count(n, -1), reversed):
         if isinstance(node, Delayed):
-            if duplicate or node not in mapping:
+            if inline and node in inline:
+                mapping[node] = mapping[node.matcher]
+            elif duplicate or node not in mapping:
                 mapping[node] = clone(i, -j, node, (), {})
                 delayed.append((node, mapping[node]))
         else:
@@ -228,7 +306,7 @@ def clone_tree(i, head, reversed, mapping, delayed, clone, duplicate=False):
                 mapping[node] = copy
 
 
-def clone_matcher(node, clone=clone, duplicate=False):
+def clone_matcher(node, clone=clone, duplicate=False, inline=None):
     '''
     This used to be implemented using the graph support classes 
     (`ConstructorWalker()` etc).  But the left-recursive handling was
@@ -245,14 +323,31 @@ def clone_matcher(node, clone=clone, duplicate=False):
     `duplicate` controls how `Delayed()` instances are handled.  If true then
     a new instance is created for each one.  This does not preserve the 
     graph, but is used by memoisation.
+    
+    `inline` is an optional predicate.  If given, it is called with the 
+    clone of the target of each `Delayed()` that is not part of a loop and,
+    if it returns true, the `Delayed()` is removed (the clone is used 
+    directly).
     '''
     from lepl.regexp.rewriters import RegexpContainer
     trees = linearise_matcher(node)
     all_nodes = {}
     all_delayed = []
-    for (i, (head, reversed)) in enumerate(trees):
-        clone_tree(i, head, reversed, all_nodes, all_delayed, clone, 
-                   duplicate=duplicate)
+    if inline:
+        (ordered, recursive) = order_trees(trees)
+        inlined = set()
+        for (i, head, reversed) in ordered:
+            for delayed in reversed:
+                if isinstance(delayed, Delayed) \
+                        and delayed not in recursive \
+                        and inline(all_nodes[delayed.matcher]):
+                    inlined.add(delayed)
+            clone_tree(i, head, reversed, all_nodes, all_delayed, clone, 
+                       duplicate=duplicate, inline=inlined)
+    else:
+        for (i, (head, reversed)) in enumerate(trees):
+            clone_tree(i, head, reversed, all_nodes, all_delayed, clone, 
+                       duplicate=duplicate)
     for (delayed, clone) in all_delayed:
         # this lets us delay forcing to matcher until last moment
         # we had bugs where this ended up being delegated to +
@@ -280,15 +375,89 @@ def post_clone(function):
     return new_clone
 
 
+def fuse_clones(clones):
+    '''
+    Combine clone functions so that several rewriters can be applied in a
+    single call to `clone_matcher()`.
+    
+    Each function after the first is applied to the copy made by the 
+    previous function.  Any matchers in that copy that are not among the
+    (already rewritten) children are rewritten first, so that a function 
+    sees the same nodes as it would if applied to the graph separately 
+    (for example, the matcher wrapped by a memoizer).
+    '''
+    def fused(i, j, node, args, kargs):
+        '''
+        Apply each clone function in turn.
+        '''
+        done = set(map(id, args))
+        done.update(map(id, kargs.values()))
+        def reclone(clone_, node):
+            '''
+            Apply a clone function to a node and any new children.
+            '''
+            if id(node) in done or not isinstance(node, Matcher):
+                return node
+            elif isinstance(node, Delayed):
+                return clone_(i, j, node, (), {})
+            (args, kargs) = node._constructor_args()
+            args = [reclone(clone_, arg) for arg in args]
+            kargs = dict((name, reclone(clone_, value))
+                         for (name, value) in kargs.items())
+            return clone_(i, j, node, args, kargs)
+        copy = clones[0](i, j, node, args, kargs)
+        for clone_ in clones[1:]:
+            copy = reclone(clone_, copy)
+        return copy
+    return fused
+
+
+def rewrite(matcher, rewriters, times=None):
+    '''
+    Apply the rewriters, in order, to the matcher graph.
+    
+    Consecutive rewriters that work node by node (see `Rewriter.cloner()`)
+    are applied together, in a single traversal of the graph, unless one
+    looks at the children of the node (in which case it must be the last
+    of the group).
+    
+    If `times` is given, `(name, seconds)` is appended for each traversal 
+    (names of rewriters applied together are joined with "+").
+    '''
+    groups = []
+    for rewriter in rewriters:
+        cloner = rewriter.cloner()
+        if cloner and groups and groups[-1][1] \
+                and not groups[-1][0][-1].inspects_children:
+            groups[-1][0].append(rewriter)
+            groups[-1][1].append(cloner)
+        else:
+            groups.append(([rewriter], [cloner] if cloner else None))
+    for (group, cloners) in groups:
+        start = time()
+        if len(group) == 1:
+            matcher = group[0](matcher)
+        else:
+            matcher = clone_matcher(matcher, fuse_clones(cloners))
+        if times is not None:
+            times.append(('+'.join(map(str, group)), time() - start))
+    return matcher
+
+
 class Flatten(Rewriter):
     '''
     A rewriter that flattens `And` and `Or` lists.
     '''
     
+    inspects_children = True
+    
     def __init__(self):
         super(Flatten, self).__init__(Rewriter.FLATTEN)
     
     def __call__(self, graph):
+        return clone_matcher(graph, self.cloner())
+    
+    def cloner(self):
         def new_clone(i, j, node, old_args, kargs):
             '''
             The flattening cloner.
@@ -308,7 +477,7 @@ class Flatten(Rewriter):
             if not new_args:
                 new_args = old_args
             return clone(i, j, node, new_args, kargs)
-        return clone_matcher(graph, new_clone)
+        return new_clone
    
 
 class ComposeTransforms(Rewriter):
@@ -317,10 +486,15 @@ class ComposeTransforms(Rewriter):
     operation, avoiding trampolining in some cases.
     '''
 
+    inspects_children = True
+
     def __init__(self):
         super(ComposeTransforms, self).__init__(Rewriter.COMPOSE_TRANSFORMS)
         
     def __call__(self, graph):
+        return clone_matcher(graph, self.cloner())
+    
+    def cloner(self):
         from lepl.matchers.transform import Transform, Transformable
         def new_clone(i, j, node, args, kargs):
             '''
@@ -334,7 +508,7 @@ class ComposeTransforms(Rewriter):
                 return copy.matcher.compose(copy.wrapper)
             else:
                 return copy
-        return clone_matcher(graph, new_clone)
+        return new_clone
 
 
 class TraceVariables(Rewriter):
@@ -347,6 +521,9 @@ class TraceVariables(Rewriter):
         super(TraceVariables, self).__init__(Rewriter.TRACE_VARIABLES)
         
     def __call__(self, graph):
+        return clone_matcher(graph, self.cloner())
+    
+    def cloner(self):
         from lepl.matchers.transform import Transform
         def new_clone(i, j, node, args, kargs):
             '''
@@ -359,7 +536,7 @@ class TraceVariables(Rewriter):
                 return Transform(copy, node.trace_variables)
             else:
                 return copy
-        return clone_matcher(graph, new_clone)
+        return new_clone
 
 
 class RightMemoize(Rewriter):
@@ -371,7 +548,10 @@ class RightMemoize(Rewriter):
         super(RightMemoize, self).__init__(Rewriter.MEMOIZE, 'Right memoize')
         
     def __call__(self, graph):
-        return clone_matcher(graph, post_clone(RMemo))
+        return clone_matcher(graph, self.cloner())
+    
+    def cloner(self):
+        return post_clone(RMemo)
 
     
 class LeftMemoize(Rewriter):
@@ -448,11 +628,65 @@ class AutoMemoize(Rewriter):
                 else:
                     return copy
             else:
-                if self.right:
-                    return self.right(copy)
-                else:
-                    return copy
+                return self.memoize_right(i, j, copy)
         return clone_matcher(graph, new_clone, duplicate=True)
+    
+    def memoize_right(self, i, j, copy):
+        '''
+        Apply the right memoizer (if any) to a node that is not part of a
+        left-recursive loop.  `i` and `j` identify the node (see 
+        `clone_tree()`).
+        '''
+        if self.right:
+            return self.right(copy)
+        else:
+            return copy
+
+
+class AdvisedMemoize(AutoMemoize):
+    '''
+    Like `AutoMemoize`, but the right memoizer is used only where a 
+    `MemoAdvisor` recommends it.
+    
+    If `record` is true then the candidates are wrapped in `MemoProbe()` 
+    instead, which collects the statistics used by the advisor.  Since the
+    candidates are identified by their position in the graph, the same
+    configuration (apart from memoisation) should be used when recording and 
+    applying the advice.
+    '''
+    
+    def __init__(self, advisor, record=False, conservative=False, d=0,
+                 min_repeats=2, min_ratio=0.1, min_share=0.01):
+        from lepl.matchers.memo import LMemo
+        super(AdvisedMemoize, self).__init__(conservative=conservative, 
+                                             left=LMemo, d=d)
+        self.name = fmt('AdvisedMemoize({0}, {1})', conservative, record)
+        self.advisor = advisor
+        self.record = record
+        self.min_repeats = min_repeats
+        self.min_ratio = min_ratio
+        self.min_share = min_share
+        
+    def __call__(self, graph):
+        if not self.record:
+            self.advice = self.advisor.advice(self.min_repeats, self.min_ratio,
+                                              self.min_share)
+        return super(AdvisedMemoize, self).__call__(graph)
+    
+    def memoize_right(self, i, j, copy):
+        '''
+        Add a probe, or memoize if advised.  Matchers without children are
+        not candidates, since repeating them repeats no other work.
+        '''
+        from lepl.matchers.memo import MemoProbe, RMemo
+        if not any(isinstance(child, Matcher) for child in copy):
+            return copy
+        elif self.record:
+            return MemoProbe(copy, self.advisor, (i, j))
+        elif (i, j) in self.advice:
+            return RMemo(copy)
+        else:
+            return copy
 
 
 def left_loops(node):
@@ -562,6 +796,9 @@ class SetArguments(Rewriter):
         self.extra_kargs = extra_kargs
         
     def __call__(self, graph):
+        return clone_matcher(graph, self.cloner())
+    
+    def cloner(self):
         def new_clone(i, j, node, args, kargs):
             '''
             As clone, but add in any extra kargs if the node is an instance
@@ -571,7 +808,7 @@ class SetArguments(Rewriter):
                 for key in self.extra_kargs:
                     kargs[key] = self.extra_kargs[key]
             return clone(i, j, node, args, kargs)
-        return clone_matcher(graph, new_clone)
+        return new_clone
 
 
 class DirectEvaluation(Rewriter):
@@ -582,6 +819,8 @@ class DirectEvaluation(Rewriter):
     `spec` is a map from original matcher type to the replacement.
     '''
     
+    inspects_children = True
+    
     def __init__(self, spec=None):
         super(DirectEvaluation, self).__init__(Rewriter.DIRECT_EVALUATION,
             fmt('DirectEvaluation({0})', spec))
@@ -593,6 +832,9 @@ class DirectEvaluation(Rewriter):
         self.spec = spec
 
     def __call__(self, graph):
+        return clone_matcher(graph, self.cloner())
+    
+    def cloner(self):
         def new_clone(i, j, node, args, kargs):
             type_, ok = None, False
             for parent in self.spec:
@@ -618,7 +860,7 @@ class DirectEvaluation(Rewriter):
             except TypeError as err:
                 raise TypeError(fmt('Error cloning {0} with ({1}, {2}): {3}',
                                        type_, args, kargs, err))
-        return clone_matcher(graph, new_clone)
+        return new_clone
     
     
 class FullFirstMatch(Rewriter):
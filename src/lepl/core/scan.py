@@ -0,0 +1,333 @@
+
+# The contents of this file are subject to the Mozilla Public License
+# (MPL) Version 1.1 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License
+# at http://www.mozilla.org/MPL/
+#
+# Software distributed under the License is distributed on an "AS IS"
+# basis, WITHOUT WARRANTY OF ANY KIND, either express or implied. See
+# the License for the specific language governing rights and
+# limitations under the License.
+#
+# The Original Code is LEPL (http://www.acooke.org/lepl)
+# The Initial Developer of the Original Code is Andrew Cooke.
+# Portions created by the Initial Developer are Copyright (C) 2009-2010
+# Andrew Cooke (andrew@acooke.org). All Rights Reserved.
+#
+# Alternatively, the contents of this file may be used under the terms
+# of the LGPL license (the GNU Lesser General Public License,
+# http://www.gnu.org/licenses/lgpl.html), in which case the provisions
+# of the LGPL License are applicable instead of those above.
+#
+# If you wish to allow use of your version of this file only under the
+# terms of the LGPL License and not to allow others to use your version
+# of this file under the MPL, indicate your decision by deleting the
+# provisions above and replace them with the notice and other provisions
+# required by the LGPL License.  If you do not delete the provisions
+# above, a recipient may use your version of this file under either the
+# MPL or the LGPL License.
+
+'''
+Find the matches of a matcher within a larger text.
+
+The start of any match that consumes text is described by a regular 
+expression (from the `re` package), built from the first characters (or 
+literal prefixes) of the matcher graph.  The text is searched for that 
+expression and the matcher is only called where it could succeed.
+'''
+
+from re import compile as compile_, escape, DOTALL
+
+from lepl.core.parser import make_raw_parser
+from lepl.core.rewriters import FullFirstMatch
+from lepl.lexer.lexer import Lexer
+from lepl.lexer.support import RuntimeLexerError
+from lepl.matchers.combine import And, AndNoTrampoline, Or, OrNoTrampoline, \
+    First, DepthFirst, DepthNoTrampoline, BreadthFirst
+from lepl.matchers.core import Any, Literal, Lookahead, Delayed, Empty, Eof
+from lepl.matchers.matcher import Matcher, matcher_type, matcher_map
+from lepl.matchers.memo import _RMemo, _LMemo
+from lepl.matchers.transform import Transform
+from lepl.regexp.core import Compiler, NfaGraph, RegexpError
+from lepl.regexp.matchers import NfaRegexp, DfaRegexp
+from lepl.stream.core import s_next, s_delta, s_max, OFFSET
+from lepl.stream.simple import SequenceHelper
+from lepl.support.graph import preorder
+from lepl.support.lib import basestring
+
+
+class _Unknown(Exception):
+    '''
+    Raised when the start of a match cannot be described.
+    '''
+
+
+def _chars(chars):
+    '''
+    A character class for the given characters.
+    '''
+    return '[' + ''.join(escape(char) for char in chars) + ']'
+
+
+def _regexp(regexp, alphabet):
+    '''
+    The character class for the first character of a lepl regular 
+    expression, found from the transitions out of the start of the NFA.
+    '''
+    try:
+        expression = Compiler.single(alphabet, regexp).expression
+    except RegexpError:
+        raise _Unknown()
+    graph = NfaGraph(alphabet)
+    expression.build(graph, graph.new_node(), graph.new_node())
+    (nodes, terminals) = graph.connected([0])
+    ranges = []
+    for node in nodes:
+        for (_, edge) in graph.transitions(node):
+            for (a, b) in edge:
+                if not isinstance(a, basestring):
+                    raise _Unknown()
+                ranges.append(escape(a) if a == b 
+                              else escape(a) + '-' + escape(b))
+    return (set(['[' + ''.join(ranges) + ']']) if ranges else set(), 
+            bool(list(terminals)))
+
+
+def _first(node, active):
+    '''
+    Return (fragments, empty) where `fragments` is a set of regular 
+    expressions, one of which matches the start of any match that consumes 
+    text, and `empty` is true if the node can match without consuming text.
+    
+    `active` contains the ids of the nodes being described (a loop back to 
+    one of these cannot be described).
+    '''
+    if id(node) in active:
+        raise _Unknown()
+    try:
+        describe = _DESCRIBE[matcher_type(node, fail=False)]
+    except (KeyError, TypeError):
+        raise _Unknown()
+    active.add(id(node))
+    try:
+        return describe(node, active)
+    finally:
+        active.remove(id(node))
+
+
+def _sequence(node, active):
+    '''
+    Alternatives from the start of a sequence, until one cannot be empty.
+    '''
+    fragments = set()
+    for matcher in node.matchers:
+        (more, empty) = _first(matcher, active)
+        fragments.update(more)
+        if not empty:
+            return (fragments, False)
+    return (fragments, True)
+
+
+def _choice(node, active):
+    '''
+    All the alternatives of a choice.
+    '''
+    (fragments, empty) = (set(), False)
+    for matcher in node.matchers:
+        (more, more_empty) = _first(matcher, active)
+        fragments.update(more)
+        empty = empty or more_empty
+    return (fragments, empty)
+
+
+def _repeat(node, active):
+    '''
+    The repeated matcher, which may be empty if there can be no repeats.
+    '''
+    (fragments, empty) = _first(node.first, active)
+    return (fragments, empty or not node.start)
+
+
+def _any(node, _active):
+    '''
+    The allowed characters, or any character.
+    '''
+    if node.restrict is None:
+        return (set(['.']), False)
+    elif isinstance(node.restrict, basestring):
+        return (set([_chars(node.restrict)]) if node.restrict else set(), 
+                False)
+    else:
+        raise _Unknown()
+
+
+def _literal(node, _active):
+    '''
+    The literal text as a prefix.
+    '''
+    if isinstance(node.text, basestring):
+        return (set([escape(node.text)]) if node.text else set(), 
+                not node.text)
+    else:
+        raise _Unknown()
+
+
+def _nfa_regexp(node, _active):
+    '''
+    The first character of the regular expression.
+    '''
+    return _regexp(node.regexp, node.alphabet)
+
+
+def _lexer(node, _active):
+    '''
+    The first character of any token (the lexer discards text before the 
+    first token, so the match can also be empty).
+    '''
+    fragments = set()
+    for token in node.tokens:
+        fragments.update(_regexp(token.regexp, node.alphabet)[0])
+    return (fragments, True)
+
+
+def _delegate(node, active):
+    '''
+    Matchers that wrap another, without changing where it starts.
+    '''
+    return _first(node.matcher, active)
+
+
+def _zero_width(_node, _active):
+    '''
+    Matchers that do not consume text.
+    '''
+    return (set(), True)
+
+
+_DESCRIBE = matcher_map({Literal: _literal,
+                         Any: _any,
+                         And: _sequence,
+                         AndNoTrampoline: _sequence,
+                         Or: _choice,
+                         OrNoTrampoline: _choice,
+                         First: _choice,
+                         DepthFirst: _repeat,
+                         DepthNoTrampoline: _repeat,
+                         BreadthFirst: _repeat,
+                         NfaRegexp: _nfa_regexp,
+                         DfaRegexp: _nfa_regexp,
+                         Lexer: _lexer,
+                         Transform: _delegate,
+                         Delayed: _delegate,
+                         _RMemo: _delegate,
+                         _LMemo: _delegate,
+                         Lookahead: _zero_width,
+                         Empty: _zero_width,
+                         Eof: _zero_width})
+
+
+def first_pattern(matcher):
+    '''
+    A compiled regular expression (from the `re` package) that matches the
+    start of any match of the (rewritten) matcher that consumes text, or 
+    None if that is unknown (the matcher may then start anywhere).
+    '''
+    try:
+        (fragments, _) = _first(matcher, set())
+    except _Unknown:
+        return None
+    # (?!) never matches, for matchers that only match empty text
+    return compile_('|'.join(sorted(fragments)) or '(?!)', DOTALL)
+
+
+class Scanner(object):
+    '''
+    Find the matches of a matcher in a text (see `ParserMixin.scan()`).
+    
+    The parser is made once, without the check that the match is complete
+    (or consumes all the text), and is called at each place in the text 
+    where `first_pattern()` allows a match.  Memoised results are shared 
+    between these calls and discarded after each text.
+    '''
+    
+    def __init__(self, matcher, parser):
+        '''
+        `parser` is the matcher's raw parser (from ``matcher._raw_parser()``).
+        '''
+        config = matcher.config.configuration
+        rewriters = [rewriter for rewriter in config.rewriters
+                     if not isinstance(rewriter, FullFirstMatch)]
+        self.__parser = make_raw_parser(matcher, parser.stream_factory,
+                                        config._replace(rewriters=rewriters))
+        self.pattern = first_pattern(self.__parser.matcher)
+        self.__memos = [node for node in preorder(self.__parser.matcher, 
+                                                  Matcher)
+                        if isinstance(node, (_RMemo, _LMemo))]
+        self.__lexers = [node for node in preorder(self.__parser.matcher,
+                                                   Matcher)
+                         if isinstance(node, Lexer)]
+        
+    def __call__(self, text, **kargs):
+        '''
+        Generate (start, end, results) for each match in the text that 
+        consumes text.  Matches do not overlap: after a match the search 
+        continues from its end.
+        '''
+        (match_stream, pattern) = (self.__parser.match_stream, self.pattern)
+        stream = self.__parser.make_stream(text, **kargs)
+        (offset, length) = (0, len(text))
+        try:
+            while offset < length:
+                if pattern is not None:
+                    found = pattern.search(text, offset)
+                    if found is None:
+                        break
+                    if found.start() > offset:
+                        (_, stream) = s_next(stream, 
+                                             count=found.start() - offset)
+                        offset = found.start()
+                try:
+                    (results, end) = next(match_stream(stream))
+                    end = _offset(end, stream, length)
+                except (StopIteration, RuntimeLexerError):
+                    end = offset
+                if end > offset:
+                    start = offset
+                    if pattern is None and self.__lexers:
+                        start = _token_start(self.__lexers[0], stream)
+                    yield (start, end, results)
+                    (_, stream) = s_next(stream, count=end - offset)
+                    offset = end
+                else:
+                    (_, stream) = s_next(stream)
+                    offset += 1
+        finally:
+            for memo in self.__memos:
+                memo._clear()
+                
+
+def _token_start(lexer, stream):
+    '''
+    The offset in the text of the first token in the stream (the lexer 
+    discards any spaces before it).
+    '''
+    (_, token) = next(lexer._tokens(stream, s_max(stream)))
+    return s_delta(token)[OFFSET]
+
+
+def _offset(end, start, length):
+    '''
+    The offset in the text of the stream `end` (which, when tokens are used,
+    is at the start of the next token).
+    '''
+    if end[1] is start[1] and isinstance(end[1], SequenceHelper):
+        return end[0]
+    try:
+        return s_delta(end)[OFFSET]
+    except StopIteration:
+        return length
+    except RuntimeLexerError as error:
+        # the text after the match is not a token
+        if error.stream is None:
+            raise
+        return s_delta(error.stream)[OFFSET]
@@ -27,12 +27,15 @@
 # above, a recipient may use your version of this file under either the
 # MPL or the LGPL License.
 
+from logging import DEBUG
+
 from lepl.support.lib import fmt
 from lepl.support.context import NamespaceMixin
 from lepl.matchers.support import BaseMatcher
 from lepl.lexer.operators import TOKENS, TokenNamespace
 from lepl.core.parser import tagged
 from lepl.stream.core import s_empty, s_debug, s_stream, s_fmt, s_factory, \
+    s_line, s_next, \
     s_max, s_new_max, s_id, s_global_kargs, s_delta, s_len, \
     s_cache_level
 from lepl.lexer.support import RuntimeLexerError
@@ -102,28 +105,46 @@ class Lexer(NamespaceMixin, BaseMatcher):
     def _tokens(self, stream, max):
         '''
         Generate tokens, on demand.
+        
+        Each line is read once and the tokens are matched directly against
+        its text (matching against the rest of the line for each token 
+        made lexing long lines quadratic).
         '''
+        # formatting messages for every token is expensive
+        debug = self._log.isEnabledFor(DEBUG)
         try:
             id_ = s_id(stream)
             while not s_empty(stream):
-                # avoid conflicts between tokens
-                id_ += 1
-                try:
-                    (terminals, match, next_stream) = \
-                                        self.t_regexp.match(stream)
-                    self._debug(fmt('Token: {0!r} {1!r} {2!s}',
-                                    terminals, match, s_debug(stream)))
-                    yield (terminals, s_stream(stream, match, max=max, id_=id_))
-                except TypeError:
-                    (terminals, _size, next_stream) = \
-                                        self.s_regexp.size_match(stream)
-                    self._debug(fmt('Space: {0!r} {1!s}',
-                                    terminals, s_debug(stream)))
-                stream = next_stream
+                (line, _) = s_line(stream, False)
+                length = len(line)
+                column = 0
+                while column < length:
+                    # avoid conflicts between tokens
+                    id_ += 1
+                    match = self.t_regexp.size_match_text(line, column)
+                    if match:
+                        (terminals, size) = match
+                        value = line[column:column+size]
+                        if debug:
+                            self._debug(fmt('Token: {0!r} {1!r} {2!s}',
+                                            terminals, value, s_debug(stream)))
+                        yield (terminals, 
+                               s_stream(stream, value, max=max, id_=id_))
+                    else:
+                        if self.s_regexp is not None:
+                            match = self.s_regexp.size_match_text(line, column)
+                        # raises TypeError if no match
+                        (terminals, size) = match
+                        if debug:
+                            self._debug(fmt('Space: {0!r} {1!s}',
+                                            terminals, s_debug(stream)))
+                    (_, stream) = s_next(stream, count=size)
+                    column += size
         except TypeError:
             raise RuntimeLexerError(
                 s_fmt(stream, 
-                      'No token for {rest} at {location} of {text}.'))
+                      'No token for {rest} at {location} of {text}.'),
+                stream)
         
     @tagged
     def _match(self, in_stream):
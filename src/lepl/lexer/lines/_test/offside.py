@@ -39,6 +39,8 @@ from lepl.matchers.combine import Or
 from lepl.matchers.core import Delayed
 from lepl.matchers.derived import Letter, Digit
 from lepl.matchers.monitor import Trace
+from lepl.matchers.support import function_matcher
+from lepl.stream.core import s_delta
 from lepl.lexer.lines.matchers import Block, Line, explicit, \
     ContinuedLineFactory
 
@@ -180,3 +182,23 @@ a
                                 ['b', ['4'], 
                                       ['5']], 
                                 ['6']]], result
+                                
+    def test_location(self):
+        '''
+        The lexer tracks locations itself (rather than creating a stream
+        for each line), so check that values are in the right place.
+        '''
+        
+        @function_matcher
+        def Location(support, stream):
+            return ([s_delta(stream)], stream)
+        
+        word = Token('[a-z]+')(Location(), complete=False)
+        block = Delayed()
+        line = Or(Line(word), Line(word & Token(':')) & block)
+        block += Block(line[1:])
+        program = line[1:]
+        program.config.lines(block_policy=explicit)
+        result = program.parse('ab\ncd:\n  ef\n  gh\n  ij:\n   kl\nmn')
+        assert result == [(0, 1, 1), (3, 2, 1), ':', (9, 3, 3), (14, 4, 3), 
+                          (19, 5, 3), ':', (26, 6, 4), (29, 7, 1)], result
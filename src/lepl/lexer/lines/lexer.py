@@ -33,7 +33,8 @@ leading spaces, depending on the configuration.
 '''
 
 from lepl.lexer.lexer import Lexer
-from lepl.stream.core import s_empty, s_line, s_stream, s_fmt, s_next, s_id
+from lepl.stream.core import s_empty, s_line, s_fmt, s_id, s_factory, \
+    s_global_kargs, s_delta
 from lepl.lexer.support import RuntimeLexerError
 
 
@@ -87,44 +88,71 @@ class _OffsideLexer(Lexer):
     def _tokens(self, stream, max):
         '''
         Generate tokens, on demand.
+        
+        Each line is read once and the tokens are matched directly against
+        its text, with the location (offset, line number and character) 
+        tracked here.  Streams are only constructed for the values that are
+        passed to the parser (and without recalculating their location from
+        the start of the input, which made lexing large inputs quadratic).
         '''
         id_ = s_id(stream)
+        factory = s_factory(stream)
+        kargs = s_global_kargs(stream)
+        (offset, line_no, char) = s_delta(stream)
+        
+        def value_stream(value, id_, column, delta=None):
+            '''
+            A stream for a value at the given column of the current line.
+            '''
+            if delta is None:
+                delta = (offset + column, line_no, char + column)
+            return factory(value, id=id_, factory=factory, max=max, 
+                           global_kargs=kargs, delta=delta)
+        
         try:
             while not s_empty(stream):
                 
                 # caches for different tokens with same contents differ
                 id_ += 1
                 (line, next_stream) = s_line(stream, False)
-                line_stream = s_stream(stream, line)
-                size = 0
+                length = len(line)
+                column = 0
                 # if we use blocks, match leading space
-                if self.blocks:
-                    try:
-                        (_, size, _) = self.s_regexp.size_match(line_stream)
-                    except TypeError:
-                        pass
-                # this will be empty (size=0) if blocks unused 
-                (indent, next_line_stream) = s_next(line_stream, count=size)
-                indent = indent.replace('\t', self._tab)
-                yield ((START,), 
-                       s_stream(line_stream, indent, id_=id_, max=max))
-                line_stream = next_line_stream
+                if self.blocks and self.s_regexp is not None:
+                    match = self.s_regexp.size_match_text(line)
+                    if match:
+                        column = match[1]
+                # this will be empty (column=0) if blocks unused 
+                indent = line[:column]
+                if indent[-1:] == '\n':
+                    indent = indent[:-1]
+                if '\t' in indent:
+                    indent = indent.replace('\t', self._tab)
+                yield ((START,), value_stream(indent, id_, 0))
                 
-                while not s_empty(line_stream):
+                while column < length:
                     id_ += 1
-                    try:
-                        (terminals, match, next_line_stream) = \
-                                        self.t_regexp.match(line_stream)
-                        yield (terminals, s_stream(line_stream, match, 
-                                                   max=max, id_=id_))
-                    except TypeError:
-                        (terminals, _size, next_line_stream) = \
-                                    self.s_regexp.size_match(line_stream)
-                    line_stream = next_line_stream
+                    match = self.t_regexp.size_match_text(line, column)
+                    if match:
+                        (terminals, size) = match
+                        yield (terminals, 
+                               value_stream(line[column:column+size], 
+                                            id_, column))
+                    else:
+                        if self.s_regexp is not None:
+                            match = self.s_regexp.size_match_text(line, column)
+                        # raises TypeError if no match
+                        (terminals, size) = match
+                    column += size
                     
                 id_ += 1
-                yield ((END,), 
-                       s_stream(line_stream, '', max=max, id_=id_))
+                offset += length
+                if line[-1:] == '\n':
+                    end = (offset, line_no + 1, 1)
+                else:
+                    end = (offset, line_no, char + length)
+                yield ((END,), value_stream('', id_, length, end))
+                (_, line_no, char) = end
                 stream = next_stream
                 
         except TypeError:
@@ -79,13 +79,13 @@ class LineStart(Token):
             while True:
                 (indent, stream) = yield generator
                 self._debug(fmt('SOL {0!r}', indent))
-                if indent and indent[0] and indent[0][-1] == '\n': 
-                    indent[0] = indent[0][:-1]
                 # if we're not doing indents, this is empty
                 if not self.indent:
                     yield ([], stream)
                 # if we are doing indents, we need a match or NO_BLOCKS
-                elif self._current_indent == NO_BLOCKS or \
+                # (the lexer has already expanded tabs and dropped any 
+                # newline, so the width is simply the length)
+                elif self._current_indent is NO_BLOCKS or \
                         len(indent[0]) == self._current_indent:
                     yield (indent, stream)
                 else:
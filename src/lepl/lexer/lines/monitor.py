@@ -37,10 +37,22 @@ from lepl.support.state import State
 from lepl.support.lib import LogMixin, fmt
 
 
+_ABSENT = object()
+'''
+Marks the absence of a saved value in the state.
+'''
+
+
 class BlockMonitor(ActiveMonitor, LogMixin):
     '''
     This tracks the current indent level (in number of spaces).  It is
     read by `Line` and updated by `Block`.
+    
+    The indent is also stored in the (per thread) `State`, so that it is
+    included in memoisation keys.  The previous value is saved on each push
+    and restored on the matching pop, so the state is scoped to the parse
+    (a parse run inside another, from an action say, does not change the 
+    state seen by the outer parse) and each change takes constant time.
     '''
     
     def __init__(self, start=0):
@@ -49,6 +61,7 @@ class BlockMonitor(ActiveMonitor, LogMixin):
         '''
         super(BlockMonitor, self).__init__()
         self.__stack = [start]
+        self.__saved = []
         self.__state = State.singleton()
         
     def push_level(self, level):
@@ -56,6 +69,7 @@ class BlockMonitor(ActiveMonitor, LogMixin):
         Add a new indent level.
         '''
         self.__stack.append(level)
+        self.__saved.append(self.__state.get(BlockMonitor, _ABSENT))
         self.__state[BlockMonitor] = level
         self._debug(fmt('Indent -> {0:d}', level))
         
@@ -66,7 +80,11 @@ class BlockMonitor(ActiveMonitor, LogMixin):
         self.__stack.pop()
         if not self.__stack:
             raise OffsideError('Closed an unopened indent.') 
-        self.__state[BlockMonitor] = self.indent
+        saved = self.__saved.pop()
+        if saved is _ABSENT:
+            del self.__state[BlockMonitor]
+        else:
+            self.__state[BlockMonitor] = saved
         self._debug(fmt('Indent <- {0:d}', self.indent))
        
     @property
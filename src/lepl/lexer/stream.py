@@ -73,7 +73,8 @@ class TokenHelper(base_iterable_factory(lambda cons: cons.head[1], '<token>')):
 
     def next(self, cons, count=1):
         assert count == 1
-        s_next(cons.head[1], count=0) # ping max
+        if self.max.track:
+            s_next(cons.head[1], count=0) # ping max
         return (cons.head, (cons.tail, self))
     
     def line(self, cons, empty_ok):
@@ -40,7 +40,12 @@ class LexerError(Exception):
 
 class RuntimeLexerError(LexerError):
     '''
-    Error raised for problems with lexing.
+    Error raised for problems with lexing.  `stream` is the stream where 
+    no token matched, if known.
     '''
+    
+    def __init__(self, message, stream=None):
+        super(RuntimeLexerError, self).__init__(message)
+        self.stream = stream
 
 
@@ -36,7 +36,11 @@ from logging import basicConfig, DEBUG
 from time import time
 from unittest import TestCase
 
-from lepl import Delayed, Any, Optional, Node, Literals, Eos, Or, Token
+from lepl import Delayed, Any, Optional, Node, Literals, Eos, Or, Token, \
+    Literal
+from lepl.core.config import ConfigurationError
+from lepl.matchers.memo import MemoAdvisor
+from lepl.stream.factory import DEFAULT_STREAM_FACTORY
 
 
 # pylint: disable-msg=C0103, C0111, C0301, W0702, C0324, C0102, C0321
@@ -386,4 +390,80 @@ class RecursionTest(TestCase):
 #            return matcher
 #        memo = self.best_of(n, count, memo_factory)
 #        assert default > 10 * memo, (default, memo)
-        
\ No newline at end of file
+        
+
+class AdvisorTest(TestCase):
+    
+    def matcher(self):
+        expr = Delayed()
+        expr += Literal('x') & expr & Literal('y') \
+                | Literal('x') & expr & Literal('z') \
+                | Literal('x')
+        return expr & Eos()
+    
+    def test_advice(self):
+        #basicConfig(level=DEBUG)
+        matcher = self.matcher()
+        matcher.config.no_full_first_match().record_memoize()
+        text = 'x' * 6 + 'z' * 5
+        assert len(matcher.parse(text)) == 11
+        advisor = matcher.config.memo_advisor
+        statistics = advisor.statistics()
+        # literals and delayed are not candidates
+        assert len(statistics) == 4, advisor
+        assert statistics[0][1].startswith('Or('), advisor
+        assert statistics[0][3] > statistics[0][2] / 2, advisor
+        advice = advisor.advice()
+        assert len(advice) == 3, advisor
+        assert '*' in advisor.report()
+        matcher.config.advised_memoize()
+        parser = matcher.get_parse()
+        assert parser(text) == list(text)
+        assert str(parser.matcher.tree()).count('_RMemo') == 5, \
+            parser.matcher.tree()
+        
+    def test_error(self):
+        '''
+        An error thrown into a probe does not stop later timings.
+        '''
+        def fail(_):
+            raise ValueError('bad')
+        expr = Delayed()
+        expr += Literal('x') & (expr | Literal('y') | (Literal('z') >> fail))
+        matcher = expr & Eos()
+        matcher.config.no_full_first_match().record_memoize()
+        advisor = matcher.config.memo_advisor
+        self.assertRaises(ValueError, matcher.parse, 'xxz')
+        total = advisor.total
+        assert matcher.parse('xxy') == ['x', 'x', 'y']
+        assert advisor.total > total, advisor.total
+        
+    def test_clear(self):
+        '''
+        Clearing the advisor while a probe is open does not stop later 
+        timings.
+        '''
+        advisor = MemoAdvisor()
+        advisor.start()
+        advisor.clear()
+        advisor.start()
+        stream = DEFAULT_STREAM_FACTORY.from_string('abc')
+        advisor.work(advisor.call(0, 'matcher', stream), 1.0)
+        assert advisor.total == 1.0, advisor.total
+        
+    def test_no_trampoline(self):
+        '''
+        Probes can be called by matchers that do not trampoline.
+        '''
+        matcher = ((Literal('x') & Literal('y')) 
+                   | (Literal('x') & Literal('z')))[:] & Eos()
+        matcher.config.no_full_first_match().record_memoize()
+        assert matcher.parse('xzxy') == ['x', 'z', 'x', 'y']
+        statistics = matcher.config.memo_advisor.statistics()
+        assert statistics and all(stats[2] for stats in statistics), \
+            statistics
+        
+    def test_no_advisor(self):
+        matcher = self.matcher()
+        self.assertRaises(ConfigurationError, 
+                          matcher.config.advised_memoize)
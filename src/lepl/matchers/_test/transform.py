@@ -33,8 +33,11 @@ Tests for the lepl.matchers.transform module
 
 
 from lepl._test.base import BaseTest
-from lepl.matchers.core import Any
-from lepl.matchers.transform import PostCondition
+from lepl.matchers.core import Any, Literal
+from lepl.matchers.derived import Add, Drop, add
+from lepl.matchers.transform import PostCondition, Transform, \
+    TransformationWrapper, ResultsTransformation
+from lepl.support.lib import str
 
 
 class PostConditionTest(BaseTest):
@@ -44,3 +47,38 @@ class PostConditionTest(BaseTest):
         self.assert_fail('abc', PostCondition(Any()[3, ...], lambda x: len(x[0]) == 2))
         self.assert_literal('abc', PostCondition(Any()[3, ...], lambda x: True))
         self.assert_literal('abc', PostCondition(Any()[3, ...], lambda x: len(x[0]) == 3))
+
+
+class ResultsTransformationTest(BaseTest):
+    
+    def test_mapping(self):
+        wrapper = TransformationWrapper([add, ResultsTransformation(
+                                            lambda r: [len(r[0])])])
+        assert wrapper.mapping(['a', 'bc']) == [3], wrapper.mapping(['a', 'bc'])
+        assert str(wrapper) == '<add,<lambda>>', str(wrapper)
+        
+    def test_no_mapping(self):
+        wrapper = TransformationWrapper([add, lambda s, m: m()])
+        assert wrapper.mapping is None
+        assert not TransformationWrapper().mapping
+        
+    def test_general_protocol(self):
+        (results, stream) = add(None, lambda: (['a', 'b'], None))
+        assert results == ['ab'], results
+        
+    def test_transforms(self):
+        self.assert_direct('abc', Add(Any()[3]) > list, [[['abc']]])
+        self.assert_direct('abc', 
+                           Drop(Any()) & Any()[2] >> (lambda s: s.upper()), 
+                           [['B', 'C']])
+        self.assert_direct('abc', Any()[:, ...] >> len, 
+                           [[3], [2], [1], []])
+        
+    def test_veto(self):
+        def veto(results):
+            if len(results[0]) == 2:
+                raise StopIteration
+            return results
+        matcher = Transform(Literal('ab') | 'a' | 'abc', 
+                            ResultsTransformation(veto))
+        self.assert_direct('abc', matcher, [['a'], ['abc']])
@@ -42,7 +42,7 @@ from lepl.matchers.operators import BREADTH_FIRST, DEPTH_FIRST, GREEDY, \
     NON_GREEDY
 from lepl.matchers.support import coerce_
 from lepl.matchers.transform import TransformationWrapper, Transform, \
-    ApplyArgs, ApplyRaw
+    ApplyArgs, ApplyRaw, ResultsTransformation, results_transformation
 from lepl.regexp.matchers import NfaRegexp, DfaRegexp
 from lepl.support.lib import assert_type, lmap, fmt, basestring, reduce
 from lepl.support.warn import warn_on_use
@@ -200,9 +200,7 @@ def Apply(matcher, function, raw=False, args=False):
         else:
             if not raw:
                 function = lambda results, f=function: [f(results)]
-        def apply(stream_in, matcher):
-            (results, stream_out) = matcher()
-            return (function(results), stream_out)
+        apply = ResultsTransformation(function, 'apply')
     return Transform(matcher, apply)
 
 
@@ -332,18 +330,20 @@ def Reduce(matcher, zero, join=__add__):
     Combine the results from the matcher using `reduce(join, results, zero)`.
     Unlike `Add` this will return a value (`zero`) when there are no matches.
     '''
-    def reduce_(_stream, matcher):
-        (results, stream_out) = matcher()
-        return ([reduce(join, results, zero)], stream_out)
+    def reduce_(results):
+        return [reduce(join, results, zero)]
+    reduce_ = ResultsTransformation(reduce_)
+    # exposed so that rewriters can identify text joins
+    reduce_.reduce = (zero, join)
     return Apply(matcher, TransformationWrapper(reduce_))
 
 
-def add(_stream, matcher):
+@results_transformation
+def add(results):
     '''
     The transformation used in `Add` - we carefully use "+" in as generic
     a manner as possible.
     '''
-    (results, stream_out) = matcher()
     if results:
         result = results[0]
         for extra in results[1:]:
@@ -357,7 +357,7 @@ def add(_stream, matcher):
         result = [result]
     else:
         result = []
-    return (result, stream_out)
+    return result
 
 
 def Add(matcher):
@@ -377,11 +377,19 @@ def Join(*matchers):
     return Add(And(*matchers))
 
 
+@results_transformation
+def drop(results):
+    '''
+    The transformation used in `Drop` - discard all results.
+    '''
+    return []
+
+
 def Drop(matcher):
     '''
     Do the match, but return nothing (**~**).  The ~ prefix is equivalent.
     '''
-    return Apply(matcher, lambda l: [], raw=True)
+    return Apply(matcher, TransformationWrapper(drop))
 
 
 def Substitute(matcher, value):
@@ -574,7 +582,7 @@ This will not match integers - see `Real` for that.
 '''
 
 
-def Word(chars=NfaRegexp('[^%s]' % whitespace), body=None):
+def Word(chars=None, body=None):
     '''
     Match a sequence of non-space characters, joining them together. 
      
@@ -588,6 +596,9 @@ def Word(chars=NfaRegexp('[^%s]' % whitespace), body=None):
     case letter, for example, while ``Word(AnyBut(Space()))`` (the default)
     matches any sequence of non-space characters. 
     '''
+    if chars is None:
+        # created here (not as a default) so that importing is cheap
+        chars = NfaRegexp('[^%s]' % whitespace)
     chars = coerce_(chars, Any)
     body = chars if body is None else coerce_(body, Any)
     return Add(And(chars, Star(body)))
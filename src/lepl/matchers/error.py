@@ -90,7 +90,9 @@ class Error(Node, SyntaxError):
             SyntaxError.__init__(self, msg, 
                                  (kargs.get('in_filename', ''),
                                   int(kargs.get('in_line_no', 0)),
-                                  int(kargs.get('in_char', 0)),
+                                  # the position in the (truncated) line
+                                  int(kargs.get('in_all_char', 
+                                                kargs.get('in_char', 0))),
                                   kargs.get('in_all')))
         else:
             SyntaxError.__init__(self, msg, 
@@ -37,12 +37,17 @@ generators implemented here.
 '''
 
 from itertools import count
+try:
+    from time import perf_counter as timer
+except ImportError:
+    from time import time as timer
 
 from lepl.matchers.core import OperatorMatcher
 from lepl.matchers.matcher import is_child
 from lepl.matchers.support import NoMemo
 from lepl.core.parser import tagged
 from lepl.stream.core import s_key, s_len
+from lepl.support.lib import fmt
 from lepl.support.state import State
 
 
@@ -71,6 +76,11 @@ class _RMemo(OperatorMatcher):
     
     Making this class Transformable did not improve performance (it's better
     to place the transformation on critical classes like Or and And). 
+    
+    For streams that record how far they are read (see `IncrementalHelper`)
+    the results are stored by helper id and offset, together with the 
+    offset just past the data read to find them, so that results not 
+    affected by an edit can be moved to the edited text (see `_move()`).
     '''
     
     # pylint: disable-msg=E1101
@@ -80,6 +90,9 @@ class _RMemo(OperatorMatcher):
         super(_RMemo, self).__init__()
         self._arg(matcher=matcher)
         self.__table = {} # s_key(stream) -> [lock, table, generator] 
+        # helper id -> (offset, state hash) -> 
+        #     [lock, table, generator, horizon, complete]
+        self.__tracked = {}
         self.__state = State.singleton()
     
     @tagged
@@ -87,7 +100,36 @@ class _RMemo(OperatorMatcher):
         '''
         Attempt to match the stream.
         '''
-        key = s_key(stream, self.__state)
+        helper = stream[1]
+        if helper.horizon is not None:
+            descriptor = self.__tracked_descriptor(stream)
+            for i in count():
+                if i == len(descriptor[1]) and not descriptor[4]:
+                    outer = helper.horizon
+                    helper.horizon = 0
+                    try:
+                        descriptor[0] = True
+                        if descriptor[2] is None:
+                            # repeat any results moved from an earlier text
+                            descriptor[2] = self.matcher._match(stream)
+                            for _ in range(i):
+                                yield descriptor[2]
+                        result = yield descriptor[2]
+                    except StopIteration:
+                        descriptor[4] = True
+                        raise
+                    finally:
+                        descriptor[0] = False
+                        descriptor[3] = max(descriptor[3], helper.horizon)
+                        helper.horizon = max(outer, descriptor[3])
+                    descriptor[1].append(result)
+                else:
+                    if descriptor[3] > helper.horizon:
+                        helper.horizon = descriptor[3]
+                    if i == len(descriptor[1]):
+                        return
+                yield descriptor[1][i]
+        key = s_key(stream, self.__state.hash)
         if key not in self.__table:
             self.__table[key] = [False, [], self.matcher._match(stream)]
         descriptor = self.__table[key]
@@ -110,7 +152,33 @@ the parser to remove left-recursive definitions.''')
         '''
         Match the stream without trampolining.
         '''
-        key = s_key(stream, self.__state)
+        helper = stream[1]
+        if helper.horizon is not None:
+            descriptor = self.__tracked_descriptor(stream)
+            for i in count():
+                if i == len(descriptor[1]) and not descriptor[4]:
+                    outer = helper.horizon
+                    helper.horizon = 0
+                    try:
+                        if descriptor[2] is None:
+                            descriptor[2] = self.matcher._match(stream)
+                            for _ in range(i):
+                                next(descriptor[2].generator)
+                        result = next(descriptor[2].generator)
+                    except StopIteration:
+                        descriptor[4] = True
+                        raise
+                    finally:
+                        descriptor[3] = max(descriptor[3], helper.horizon)
+                        helper.horizon = max(outer, descriptor[3])
+                    descriptor[1].append(result)
+                else:
+                    if descriptor[3] > helper.horizon:
+                        helper.horizon = descriptor[3]
+                    if i == len(descriptor[1]):
+                        return
+                yield descriptor[1][i]
+        key = s_key(stream, self.__state.hash)
         if key not in self.__table:
             self.__table[key] = [False, [], self.matcher._match(stream)]
         descriptor = self.__table[key]
@@ -125,6 +193,75 @@ the parser to remove left-recursive definitions.''')
                 descriptor[1].append(result)
             yield descriptor[1][i]
             
+    def __tracked_descriptor(self, stream):
+        '''
+        The entry for a stream that records how far it is read.  The 
+        horizon starts at the offset (nothing has been read yet) and the 
+        generator is created when a result is first needed.
+        '''
+        (offset, helper) = stream
+        try:
+            table = self.__tracked[helper.id]
+        except KeyError:
+            table = self.__tracked[helper.id] = {}
+        key = (offset, self.__state.hash)
+        if key not in table:
+            table[key] = [False, [], None, offset, False]
+        descriptor = table[key]
+        if descriptor[0]:
+            raise MemoException('''Left recursion was detected.
+You can try .config.auto_memoize() or similar, but it is better to re-write 
+the parser to remove left-recursive definitions.''')
+        return descriptor
+    
+    def _move(self, old, new, offset, removed, added):
+        '''
+        Move the results for the `old` helper to the `new` one, whose text 
+        is the same except that `removed` characters at `offset` were 
+        replaced by `added` others.  Results found without reading the 
+        edited text are kept; those found after it are moved by 
+        ``added - removed``.  The rest (and any for matches that did not 
+        finish) are discarded.  Results that are moved will be repeated
+        (so that later results can be found) only if more are needed.
+        
+        Returns the number of entries moved.
+        '''
+        table = self.__tracked.pop(old.id, {})
+        moved = {}
+        after = offset + removed
+        for ((start, hash_), descriptor) in table.items():
+            (lock, results, _, horizon, complete) = descriptor
+            if lock:
+                continue
+            if horizon <= offset:
+                delta = 0
+            elif start >= after:
+                delta = added - removed
+            else:
+                continue
+            if any(stream[1] is not old for (_, stream) in results):
+                continue
+            moved[(start + delta, hash_)] = \
+                [False, [(values, (stream[0] + delta, new)) 
+                         for (values, stream) in results],
+                 None, horizon + delta, complete]
+        if moved:
+            self.__tracked[new.id] = moved
+        return len(moved)
+    
+    def _forget(self, helper):
+        '''
+        Discard the results for the helper.
+        '''
+        self.__tracked.pop(helper.id, None)
+        
+    def _clear(self):
+        '''
+        Discard all results.
+        '''
+        self.__table = {}
+        self.__tracked = {}
+    
     def __iadd__(self, other):
         '''
         Allow memos to wrap Delayed in rewriting.
@@ -160,7 +297,7 @@ class _LMemo(OperatorMatcher):
         '''
         Attempt to match the stream.
         '''
-        key = s_key(stream, self.__state)
+        key = s_key(stream, self.__state.hash)
         if key not in self.__depth:
             self.__depth[key] = 0
         depth = self.__depth[key]
@@ -184,7 +321,7 @@ class _LMemo(OperatorMatcher):
         '''
         Match the stream without trampolining.
         '''
-        key = s_key(stream, self.__state)
+        key = s_key(stream, self.__state.hash)
         if key not in self.__depth:
             self.__depth[key] = 0
         depth = self.__depth[key]
@@ -200,9 +337,196 @@ class _LMemo(OperatorMatcher):
                 descriptor[0].append(result)
             yield descriptor[0][i]
 
+    def _clear(self):
+        '''
+        Discard all results (keeping the depth of any matches in progress).
+        '''
+        self.__depth = dict((key, depth) 
+                            for (key, depth) in self.__depth.items() if depth)
+        self.__table = {}
+        
     def __iadd__(self, other):
         '''
         Allow memos to wrap Delayed in rewriting.
         '''
         self.matcher += other
         return self
+
+
+class MemoAdvisor(object):
+    '''
+    Accumulate statistics from `MemoProbe()` instances, which are placed
+    where `RMemo()` would be (see `AdvisedMemoize`), and use them to 
+    recommend which matchers are worth memoizing.
+    
+    For each candidate (identified by its position in the matcher graph) 
+    this records the number of calls, the number of calls that repeat an 
+    earlier call at the same stream position, the time spent and the time 
+    spent in repeated calls (an estimate of what memoisation would save).
+    '''
+    
+    def __init__(self):
+        self.__data = {} # key -> [calls, repeats, time, saved, name, keys]
+        self.__state = State.singleton()
+        self.__active = 0
+        self.total = 0.0
+        
+    def call(self, index, matcher, stream):
+        '''
+        Record a call and return the entry used to record work (or None if
+        the call is not a repeat).
+        '''
+        if index not in self.__data:
+            self.__data[index] = [0, 0, 0.0, 0.0, str(matcher), set()]
+        entry = self.__data[index]
+        entry[0] += 1
+        key = s_key(stream, self.__state.hash)
+        repeat = key in entry[5]
+        if repeat:
+            entry[1] += 1
+        else:
+            entry[5].add(key)
+        return (entry, repeat)
+        
+    def start(self):
+        '''
+        Called before the wrapped matcher is evaluated.
+        '''
+        self.__active += 1
+            
+    def work(self, call, elapsed):
+        '''
+        Record the time spent by a call (the value returned by `call()`).
+        The total time counts only the outermost evaluations.
+        '''
+        (entry, repeat) = call
+        entry[2] += elapsed
+        if repeat:
+            entry[3] += elapsed
+        self.__active -= 1
+        if not self.__active:
+            self.total += elapsed
+            
+    def statistics(self):
+        '''
+        A list of ``(index, name, calls, repeats, time, saved)``, with the
+        largest saving first.
+        '''
+        return sorted(((index, entry[4]) + tuple(entry[0:4])
+                       for (index, entry) in self.__data.items()),
+                      key=lambda stats: (-stats[5], stats[0]))
+        
+    def advice(self, min_repeats=2, min_ratio=0.1, min_share=0.01):
+        '''
+        The set of candidates that should be memoized: those with at least 
+        `min_repeats` repeated calls, where the repeats are at least 
+        `min_ratio` of all calls, and where the time saved is at least
+        `min_share` of the total time.  The last condition excludes simple 
+        matchers that cost less to repeat than to memoize.
+        '''
+        return set(index for (index, _, calls, repeats, _, saved) 
+                   in self.statistics()
+                   if repeats >= min_repeats and repeats >= min_ratio * calls
+                   and saved >= min_share * self.total)
+        
+    def report(self, min_repeats=2, min_ratio=0.1, min_share=0.01):
+        '''
+        A table of the statistics, with recommended candidates marked by 
+        ``*``.
+        '''
+        advice = self.advice(min_repeats, min_ratio, min_share)
+        lines = ['  calls repeats      time     saved   matcher']
+        for (index, name, calls, repeats, time, saved) in self.statistics():
+            lines.append(fmt('{0:7d} {1:7d} {2:9.4f} {3:9.4f} {4} {5}',
+                             calls, repeats, time, saved,
+                             '*' if index in advice else ' ', name))
+        return '\n'.join(lines)
+    
+    def clear(self):
+        '''
+        Discard all data (including the count of open probes, so that a
+        parse abandoned while a probe was open does not affect the next).
+        '''
+        self.__data = {}
+        self.__active = 0
+        self.total = 0.0
+        
+    def __str__(self):
+        return self.report()
+    
+    def __repr__(self):
+        return '<MemoAdvisor>'
+        
+
+def MemoProbe(matcher, advisor, index):
+    '''
+    Wrap in the _MemoProbe instrumentation if required.
+    '''
+    if is_child(matcher, NoMemo, fail=False):
+        return matcher
+    else:
+        return _MemoProbe(matcher, advisor, index)
+
+
+class _MemoProbe(OperatorMatcher):
+    '''
+    Record statistics for a candidate for memoisation (see `MemoAdvisor`).
+    The time spent by the wrapped matcher is measured between requesting 
+    and receiving each result.
+    '''
+    
+    def __init__(self, matcher, advisor, index):
+        super(_MemoProbe, self).__init__()
+        self._arg(matcher=matcher)
+        self._karg(advisor=advisor)
+        self._karg(index=index)
+        
+    @tagged
+    def _match(self, stream):
+        '''
+        Attempt to match the stream.
+        '''
+        call = self.advisor.call(self.index, self.matcher, stream)
+        generator = self.matcher._match(stream)
+        while True:
+            self.advisor.start()
+            start = timer()
+            abandoned = False
+            try:
+                result = yield generator
+            except StopIteration:
+                return
+            except GeneratorExit:
+                # no longer needed, so the time since the request is not
+                # (all) work for this call
+                abandoned = True
+                raise
+            finally:
+                # always balance start(), even if an error is thrown in
+                self.advisor.work(call, 0 if abandoned else timer() - start)
+            yield result
+            
+    def _untagged_match(self, stream):
+        '''
+        Match the stream without trampolining (called by a parent that does
+        not trampoline, as for `_RMemo`).
+        '''
+        call = self.advisor.call(self.index, self.matcher, stream)
+        generator = self.matcher._match(stream).generator
+        while True:
+            self.advisor.start()
+            start = timer()
+            try:
+                result = next(generator)
+            except StopIteration:
+                return
+            finally:
+                self.advisor.work(call, timer() - start)
+            yield result
+
+    def __iadd__(self, other):
+        '''
+        Allow probes to wrap Delayed in rewriting.
+        '''
+        self.matcher += other
+        return self
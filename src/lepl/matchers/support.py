@@ -33,6 +33,7 @@ Support classes for matchers.
 
 from abc import ABCMeta
 from inspect import getargspec
+from weakref import WeakKeyDictionary
 
 from lepl.core.config import ParserMixin
 from lepl.core.parser import GeneratorWrapper, tagged
@@ -212,6 +213,38 @@ class Transformable(OperatorMatcher):
                       self.wrapper)
         
 
+_ARGSPECS = WeakKeyDictionary()
+'''
+The argument spec for each factory (reading the spec is slow and the same
+factories are used for many matchers).
+'''
+
+
+def factory_argspec(factory):
+    '''
+    The argument spec for the function wrapped by a factory.
+    '''
+    try:
+        return _ARGSPECS[factory]
+    except (KeyError, TypeError):
+        pass
+    try:
+        # function wrapper, so we have two levels, and we must construct
+        # a new, empty function (ie this is a fake function that helps
+        # us use the code below, even though there's no arguments because
+        # factory is a dummy generated in make_factory below)
+        def empty(): return
+        document(empty, factory.factory)
+        spec = getargspec(empty)
+    except:
+        spec = getargspec(factory)
+    try:
+        _ARGSPECS[factory] = spec
+    except TypeError:
+        pass
+    return spec
+
+
 class BaseFactoryMatcher(FactoryMatcher):
     '''
     This must be used as a mixin with something that inherits from 
@@ -234,16 +267,7 @@ class BaseFactoryMatcher(FactoryMatcher):
         effect we also associated arguments with names and expand defaults
         so that attributes are more predictable.
         '''
-        try:
-            # function wrapper, so we have two levels, and we must construct
-            # a new, empty function (ie this is a fake function that helps
-            # us use the code below, even though there's no arguments because
-            # factory is a dummy generated in make_factory below)
-            def empty(): return
-            document(empty, self.factory.factory)
-            spec = getargspec(empty)
-        except:
-            spec = getargspec(self.factory)
+        spec = factory_argspec(self.factory)
         names = list(spec.args)
         defaults = dict(zip(names[::-1], spec.defaults[::-1] if spec.defaults else []))
         for name in names:
@@ -289,6 +313,23 @@ class BaseFactoryMatcher(FactoryMatcher):
                                                else factory.__name__
             self.__args_as_attributes()
 
+    def _copy_factory(self, other):
+        '''
+        Set the factory from another matcher whose arguments were used to
+        construct this one (eg when cloning).  If the arguments still have 
+        the same names then they are set directly, without checking them 
+        against the factory's signature again.
+        '''
+        if not self.__factory and isinstance(other, BaseFactoryMatcher) \
+                and self._arguments_like(other, self.__args, self.__kargs):
+            self.__factory = other.factory
+            self._small_str = self.__small_str if self.__small_str \
+                                               else other.factory.__name__
+            self.__args = ()
+            self.__kargs = {}
+        else:
+            self.factory = other.factory
+
     def tree_repr(self):
         return fmt('{0}<{1}>',
                       self.__class__.__name__,
@@ -310,7 +351,7 @@ class TransformableWrapper(BaseFactoryMatcher, Transformable):
     def compose(self, wrapper):
         (args, kargs) = self._constructor_args()
         copy = type(self)(*args, **kargs)
-        copy.factory = self.factory
+        copy._copy_factory(self)
         copy.wrapper = self.wrapper.compose(wrapper)
         return copy
     
@@ -412,6 +453,11 @@ class SequenceWrapper(NoTrampolineWrapper):
     @tagged
     def _match(self, stream_in):
         from lepl.matchers.transform import raise_
+        mapping = self.wrapper.mapping
+        if mapping:
+            for (results, stream_out) in self._cached_matcher(self, stream_in):
+                yield (mapping(results), stream_out)
+            return
         function = self.wrapper.function
         for results in self._cached_matcher(self, stream_in):
             yield function(stream_in, lambda: results) if function else results
@@ -420,6 +466,11 @@ class SequenceWrapper(NoTrampolineWrapper):
  
     def _untagged_match(self, stream_in):
         from lepl.matchers.transform import raise_
+        mapping = self.wrapper.mapping
+        if mapping:
+            for (results, stream_out) in self._cached_matcher(self, stream_in):
+                yield (mapping(results), stream_out)
+            return
         function = self.wrapper.function
         for results in self._cached_matcher(self, stream_in):
             yield function(stream_in, lambda: results) if function else results
@@ -436,8 +487,13 @@ class FunctionWrapper(NoTrampolineWrapper):
     @tagged
     def _match(self, stream_in):
         from lepl.matchers.transform import raise_
-        function = self.wrapper.function
+        mapping = self.wrapper.mapping
         results = self._cached_matcher(self, stream_in)
+        if mapping:
+            if results is not None:
+                yield (mapping(results[0]), results[1])
+            return
+        function = self.wrapper.function
         if results is not None:
             yield function(stream_in, lambda: results) \
                 if function else results
@@ -446,8 +502,13 @@ class FunctionWrapper(NoTrampolineWrapper):
         
     def _untagged_match(self, stream_in):
         from lepl.matchers.transform import raise_
-        function = self.wrapper.function
+        mapping = self.wrapper.mapping
         results = self._cached_matcher(self, stream_in)
+        if mapping:
+            if results is not None:
+                yield (mapping(results[0]), results[1])
+            return
+        function = self.wrapper.function
         if results is not None:
             yield function(stream_in, lambda: results) \
                 if function else results
@@ -43,6 +43,13 @@ either return a (result, stream_out) pair, or raise a StopIteration.
 A null transformation, therefore, would simply evaluate the matcher it 
 receives:
     null_transform = lambda stream, matcher: matcher()
+
+Most transformations (those used by `Apply`, `Map`, `Drop`, `Add` etc) only 
+modify the list of results.  These are marked by `ResultsTransformation` and,
+when every transformation in a `TransformationWrapper` is of that kind, 
+matchers can use the composed `TransformationWrapper.mapping` to modify 
+results directly, without constructing the thunks required by the general
+protocol above.
 '''
 
 
@@ -94,10 +101,46 @@ class NullTransformation(object):
         return self.__bool__()
     
 
+class ResultsTransformation(object):
+    '''
+    A transformation that only modifies the list of results.  It does not 
+    depend on the stream, does not veto results (except by raising 
+    StopIteration), and does not add results after the matcher is exhausted.
+    
+    Instances can be used with the general protocol (they are called with 
+    the stream and matcher), but also expose the underlying function, 
+    which takes and returns a list of results.
+    '''
+    
+    def __init__(self, function, name=None):
+        self.function = function
+        self.__name__ = function.__name__ if name is None else name
+        self.__doc__ = function.__doc__
+        
+    def __call__(self, _stream_in, matcher):
+        (results, stream_out) = matcher()
+        return (self.function(results), stream_out)
+    
+    def __repr__(self):
+        return fmt('ResultsTransformation({0})', self.__name__)
+    
+    
+def results_transformation(function):
+    '''
+    Decorator that converts a function from a list of results to a list of 
+    results into a `ResultsTransformation`.
+    '''
+    return ResultsTransformation(function)
+
+
 class TransformationWrapper(object):
     '''
     Helper object that composes transformations and also keeps a list of
     the separate transformations for introspection.
+    
+    If all the transformations are `ResultsTransformation` instances then
+    `mapping` is the composition of their functions (and can be applied 
+    directly to a list of results); otherwise it is None.
     '''
     
     def __init__(self, functions=None):
@@ -109,6 +152,7 @@ class TransformationWrapper(object):
             functions = [functions]
         self.functions = []
         self.function = NullTransformation()
+        self.mapping = None
         self.extend(functions)
         
     def extend(self, functions):
@@ -120,8 +164,16 @@ class TransformationWrapper(object):
             self.function = \
                 lambda stream, matcher, f=self.function: \
                     function(stream, lambda: f(stream, matcher))
+            if self.mapping and isinstance(function, ResultsTransformation):
+                self.mapping = \
+                    lambda results, f=self.mapping, g=function.function: \
+                        g(f(results))
+            else:
+                self.mapping = None
         else:
             self.function = function
+            if isinstance(function, ResultsTransformation):
+                self.mapping = function.function
         self.functions.append(function)
         
     def compose(self, wrapper):
@@ -194,9 +246,24 @@ class Transform(Transformable, NoMemo):
         The protocol here allows functions to "veto" individual entries and
         also to "append" more results, but doesn't support insertion of 
         additional results.
+        
+        When the wrapper contains only `ResultsTransformation` instances
+        the results are modified directly via `TransformationWrapper.mapping`.
         '''
-        function = self.wrapper.function
         generator = self.matcher._match(stream_in)
+        mapping = self.wrapper.mapping
+        if mapping:
+            while True:
+                try:
+                    (results, stream_out) = yield generator
+                except StopIteration:
+                    return
+                try:
+                    results = mapping(results)
+                except StopIteration:
+                    continue
+                yield (results, stream_out)
+        function = self.wrapper.function
         while True:
             try:
                 results = yield generator
@@ -0,0 +1,153 @@
+
+# The contents of this file are subject to the Mozilla Public License
+# (MPL) Version 1.1 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License
+# at http://www.mozilla.org/MPL/
+#
+# Software distributed under the License is distributed on an "AS IS"
+# basis, WITHOUT WARRANTY OF ANY KIND, either express or implied. See
+# the License for the specific language governing rights and
+# limitations under the License.
+#
+# The Original Code is LEPL (http://www.acooke.org/lepl)
+# The Initial Developer of the Original Code is Andrew Cooke.
+# Portions created by the Initial Developer are Copyright (C) 2009-2010
+# Andrew Cooke (andrew@acooke.org). All Rights Reserved.
+#
+# Alternatively, the contents of this file may be used under the terms
+# of the LGPL license (the GNU Lesser General Public License,
+# http://www.gnu.org/licenses/lgpl.html), in which case the provisions
+# of the LGPL License are applicable instead of those above.
+#
+# If you wish to allow use of your version of this file only under the
+# terms of the LGPL License and not to allow others to use your version
+# of this file under the MPL, indicate your decision by deleting the
+# provisions above and replace them with the notice and other provisions
+# required by the LGPL License.  If you do not delete the provisions
+# above, a recipient may use your version of this file under either the
+# MPL or the LGPL License.
+
+'''
+Tests for the lepl.regexp.byte module.
+'''
+
+if bytes is str:
+    print('Byte streams unsupported in this Python version')
+else:
+
+    from unittest import TestCase
+
+    from lepl import Token, Literal, Any, Drop, Eos
+    from lepl.regexp.core import Compiler, RegexpError
+    from lepl.regexp.matchers import NfaRegexp
+    from lepl.regexp.byte import ByteAlphabet
+    from lepl.stream.maxdepth import FullFirstMatchException
+    from lepl.support.lib import fmt
+
+    # pylint: disable-msg=C0103, C0111, C0301, R0201, R0904
+    # (dude this is just a test)
+
+
+    BYTE = ByteAlphabet.instance()
+
+
+    def _test_parser(regexp):
+        return Compiler.single(BYTE, regexp)
+
+    def label(text):
+        return fmt('(?P<label>{0!s})', text)
+
+
+    class CharactersTest(TestCase):
+    
+        def test_format(self):
+            c = _test_parser('.')
+            assert label('.') == str(c), str(c)
+            c = _test_parser('[a-c]x')
+            assert label('[a-c]x') == str(c), str(c)
+            c = _test_parser('[^a-z]')
+            assert label('[\\x00-`\\{-\\xff]') == str(c), str(c)
+            c = _test_parser('\\x00\\x41')
+            assert label('\\x00A') == str(c), str(c)
+        
+        def test_reparse(self):
+            for regexp in ('[^a-z]', '[\\x00-\\x1f]+', '(?:GET|POST) '):
+                text = BYTE.fmt_sequence(BYTE.parse(regexp))
+                assert BYTE.fmt_sequence(BYTE.parse(text)) == text, text
+            
+        def test_range(self):
+            try:
+                _test_parser('\u0100')
+                assert False, 'expected error'
+            except ValueError:
+                pass
+        
+
+    class DfaTest(TestCase):
+    
+        def test_table(self):
+            dfa = Compiler.multiple(BYTE, [(1, '[a-z]+'), (2, '[\\x80-\\xff]')]).dfa()
+            for data in (b'abc\x80', bytearray(b'abc\x80'), 
+                         memoryview(b'abc\x80')):
+                assert dfa.size_match_text(data) == ((1,), 3), \
+                    dfa.size_match_text(data)
+                assert dfa.size_match_text(data, 3) == ((2,), 1), \
+                    dfa.size_match_text(data, 3)
+            assert dfa.size_match_text(b'\x00') is None
+
+        
+    class StreamTest(TestCase):
+    
+        def test_dfa(self):
+            matcher = Literal(b'GET') & Drop(Literal(b' ')) & Any(b'abc/')[1:, ...] & Eos()
+            matcher.config.compile_to_dfa(alphabet=BYTE)
+            result = matcher.parse(b'GET /abc/')
+            assert result == [b'GET', b'/abc/'], result
+            result = matcher.parse_bytes(bytearray(b'GET /a'))
+            assert result == [bytearray(b'GET'), bytearray(b'/a')], result
+        
+        def test_error(self):
+            '''
+            The error is located where the match failed, not at the end.
+            '''
+            matcher = Literal(b'GET') & Drop(Literal(b' ')) & Any(b'abc/')[1:, ...] & Eos()
+            matcher.config.compile_to_dfa(alphabet=BYTE)
+            try:
+                matcher.parse(b'GET /abd/')
+                assert False, 'expected error'
+            except FullFirstMatchException as e:
+                assert 'offset 7' in str(e), str(e)
+        
+        def test_nfa(self):
+            '''
+            The NFA cannot match bytes, so is rejected.
+            '''
+            matcher = Literal(b'GET') & Any(b'abc/')[1:, ...] & Eos()
+            self.assertRaises(ValueError, matcher.config.compile_to_nfa, 
+                              alphabet=BYTE)
+            self.assertRaises(RegexpError, NfaRegexp, 'GET', alphabet=BYTE)
+        
+        def test_tokens(self):
+            word = Token('[a-z]+')
+            number = Token('[0-9]+') >> int
+            line = (word | number)[:] & Eos()
+            line.config.lexer(alphabet=BYTE)
+            result = line.parse(b'abc 12\nde 3')
+            assert result == [b'abc', 12, b'de', 3], result
+        
+        def test_error(self):
+            matcher = Literal(b'ab') & Eos()
+            matcher.config.no_compile_to_regexp()
+            try:
+                matcher.parse(b'ac')
+                assert False, 'expected error'
+            except Exception as e:
+                assert "in <bytes> at b'' (offset 2" in str(e), str(e)
+            
+        def test_memo_bytearray(self):
+            # each bytearray needs its own id, or memoised results are shared
+            matcher = Any()[:, ...] & Eos()
+            matcher.config.no_compile_to_regexp().auto_memoize(full=True)
+            assert matcher.parse(bytearray(b'ab')) == [bytearray(b'ab')]
+            result = matcher.parse(bytearray(b'cd'))
+            assert result == [bytearray(b'cd')], result
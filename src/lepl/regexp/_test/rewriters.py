@@ -35,8 +35,12 @@ from string import ascii_letters
 from unittest import TestCase
 
 from lepl import *
+from lepl.matchers.combine import AndNoTrampoline
+from lepl.matchers.derived import add
+from lepl.matchers.transform import TransformationWrapper
 from lepl.regexp.rewriters import CompileRegexp
 from lepl.stream.core import DUMMY_HELPER
+from lepl.support.lib import PYTHON3
 
 # pylint: disable-msg=C0103, C0111, C0301, C0324
 # (dude this is just a test)
@@ -366,6 +370,149 @@ class CompileTest(TestCase):
         self.assert_regexp((Any('ab') + Literal('q')) | Literal('z'), '(?:[a-b]q|z)')
         self.assert_regexp((Any('ab') + 'q') | 'z', '(?:[a-b]q|z)')
         
+    def test_large_any(self):
+        self.assert_regexp(Any(ascii_letters), '[A-Za-z]')
+        
+    def test_any_but(self):
+        if PYTHON3: # not combined in Python 2 (input may be bytes)
+            self.assert_regexp(AnyBut('b'), r'[\x00-ac-\U0010ffff]')
+            self.assert_regexp(AnyBut(Any('ab'))[:, ...], 
+                               r'(?:[\x00-`c-\U0010ffff])*')
+        
+    def test_any_but_bytes(self):
+        '''
+        In Python 2 the input may be a byte string that is not ASCII.
+        '''
+        matcher = AnyBut('\n')[:, ...]
+        matcher.config.clear().compile_to_dfa()
+        assert matcher.parse('a\xc3\xa9') == ['a\xc3\xa9']
+        matcher.config.clear().compile_to_nfa()
+        assert matcher.parse('a\xc3\xa9') == ['a\xc3\xa9']
+        
+    def test_delayed(self):
+        digits = Delayed()
+        digits += Any('0123456789')[1:, ...]
+        self.assert_regexp(Add(digits & '.' & digits), '[0-9](?:[0-9])*\\.[0-9](?:[0-9])*')
+        
+        
+class FuseTest(TestCase):
+    '''
+    Test compilation of larger expressions, including transformations.
+    '''
+    
+    def assert_fused(self, matcher, text, target, regexp=DfaRegexp):
+        '''
+        Check that the matcher is compiled to a single expression when
+        flattened, when not flattened, and in the default configuration
+        (where transformations are composed before compilation).
+        '''
+        for configure in (lambda config: config.clear().flatten(),
+                          lambda config: config.clear(),
+                          lambda config: config.default()):
+            compiler = CompileRegexp(matcher=regexp)
+            configure(matcher.config).add_rewriter(compiler)
+            parser = matcher.get_parse()
+            # skip full first match and memoisation
+            fused = parser.matcher
+            while not isinstance(fused, regexp) and hasattr(fused, 'matcher'):
+                fused = fused.matcher
+            assert isinstance(fused, regexp), parser.matcher.tree()
+            assert not compiler.report, compiler.format_report()
+            result = parser(text)
+            assert result == target, result
+        matcher.config.clear()
+        result = matcher.parse(text)
+        assert result == target, result
+        
+    def test_string(self):
+        if PYTHON3: # AnyBut() is not combined in Python 2
+            self.assert_fused(String(escape=None), '"abc"', ['abc'])
+            self.assert_fused(String(escape=None), '""', [''])
+        
+    def test_nfa_string(self):
+        '''
+        The opening and closing quotes are the same matcher, so must be
+        separate parts of the expression (otherwise the NFA accepts a 
+        single quote).
+        '''
+        if PYTHON3: # AnyBut() is not combined in Python 2
+            self.assert_fused(String(escape=None), '"abc"', ['abc'], 
+                              NfaRegexp)
+            self.assert_fused(String(escape=None), '""', [''], NfaRegexp)
+        matcher = String(escape=None)
+        matcher.config.clear().compile_to_nfa()
+        assert list(matcher.parse_all('"ab"')) == [['ab']]
+        assert matcher.parse('"') is None
+        
+    def test_strip(self):
+        self.assert_fused(Drop('(') & Any('abc')[:, ...] & Drop(')'), '(abc)', 
+                          ['abc'])
+        self.assert_fused(Drop('(') & Any('abc')[:, ...] & Drop(')'), '()', 
+                          [])
+        if PYTHON3: # AnyBut() is not combined in Python 2
+            self.assert_fused(Drop('<<') & AnyBut('>')[1:, ...] & Drop('>>'),
+                              '<<abc>>', ['abc'])
+        
+    def test_strip_contiguous(self):
+        '''
+        If the text between dropped text cannot be compiled, contiguous
+        parts are still combined.
+        '''
+        compiler = CompileRegexp(matcher=DfaRegexp)
+        matcher = AndNoTrampoline(Drop('('), Any('ab')[:, ...], Any('c'), 
+                                  Any('d') >> str.upper, Drop(')'))
+        matcher = matcher.compose(TransformationWrapper(add))
+        matcher.config.clear().add_rewriter(compiler)
+        parser = matcher.get_parse()
+        regexps = [str(child.regexp) for child in parser.matcher.matcher
+                   if isinstance(child, DfaRegexp)]
+        assert '(?:[a-b])*c' in regexps, parser.matcher.tree()
+        result = parser('(abcd)')
+        assert result == ['abcD'], result
+        
+    def test_dropped(self):
+        self.assert_fused(~Literal('a') & ~Any('bc')[:], 'abc', [])
+        
+    def test_report(self):
+        compiler = CompileRegexp(matcher=DfaRegexp)
+        matcher = Any('a')[:, ...] & Lookahead('b') & Any('b')
+        matcher.config.clear().flatten().add_rewriter(compiler)
+        matcher.get_parse()
+        (lookahead, reason) = compiler.report[0]
+        assert isinstance(lookahead, Lookahead), compiler.format_report()
+        assert 'Lookahead()' in reason, reason
+        assert matcher.parse('aab') == ['aa', 'b']
+
+        
+    def test_separator(self):
+        self.assert_fused(Word(Letter())[1:, ',', ...], 'ab,c', ['ab,c'])
+        
+    def assert_report(self, matcher, text, target, reason):
+        compiler = CompileRegexp(matcher=DfaRegexp)
+        matcher.config.clear().flatten().add_rewriter(compiler)
+        parser = matcher.get_parse()
+        assert not isinstance(parser.matcher, DfaRegexp), \
+            parser.matcher.tree()
+        assert any(reason in found for (_, found) in compiler.report), \
+            compiler.format_report()
+        result = parser(text)
+        assert result == target, result
+        
+    def test_separator_report(self):
+        '''
+        Separate results cannot come from a single expression.
+        '''
+        self.assert_report(Word(Letter())[1:, ','], 'ab,c', ['ab', ',', 'c'],
+                           'Several results')
+        self.assert_report(Word(Letter())[1:, Drop(',')], 'ab,c', ['ab', 'c'],
+                           'Blocked by rest=And(')
+        self.assert_report(Word(Letter())[1:, Drop(','), ...], 'ab,c', ['abc'],
+                           'Dropped text cannot be removed')
+        
+    def test_string_report(self):
+        self.assert_report(String(), r'"a\"b"', ['a"b'], 
+                           'Blocked by And(Transform, Literal)')
+
         
 class RepeatBugTest(TestCase):
     
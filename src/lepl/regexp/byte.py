@@ -0,0 +1,151 @@
+
+# The contents of this file are subject to the Mozilla Public License
+# (MPL) Version 1.1 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License
+# at http://www.mozilla.org/MPL/
+#
+# Software distributed under the License is distributed on an "AS IS"
+# basis, WITHOUT WARRANTY OF ANY KIND, either express or implied. See
+# the License for the specific language governing rights and
+# limitations under the License.
+#
+# The Original Code is LEPL (http://www.acooke.org/lepl)
+# The Initial Developer of the Original Code is Andrew Cooke.
+# Portions created by the Initial Developer are Copyright (C) 2009-2010
+# Andrew Cooke (andrew@acooke.org). All Rights Reserved.
+#
+# Alternatively, the contents of this file may be used under the terms
+# of the LGPL license (the GNU Lesser General Public License,
+# http://www.gnu.org/licenses/lgpl.html), in which case the provisions
+# of the LGPL License are applicable instead of those above.
+#
+# If you wish to allow use of your version of this file only under the
+# terms of the LGPL License and not to allow others to use your version
+# of this file under the MPL, indicate your decision by deleting the
+# provisions above and replace them with the notice and other provisions
+# required by the LGPL License.  If you do not delete the provisions
+# above, a recipient may use your version of this file under either the
+# MPL or the LGPL License.
+
+'''
+A regexp implementation for bytes (8-bit data, eg network protocols).
+
+Characters are the integer values 0-255 (what indexing `bytes` returns), so
+a DFA compiled with this alphabet can scan byte input directly.  Transition
+tables are dense lists of 256 entries (indexed by byte value) rather than 
+interval maps.
+
+Patterns are written as text, as usual.  Each character is converted by
+its ordinal (so must be below 256) and `\\xNN` can be used for arbitrary
+values.
+'''
+
+from lepl.regexp.str import StrAlphabet, ILLEGAL
+from lepl.support.lib import fmt, chr
+
+_WHITESPACE = b'\t\n\x0b\x0c\r '
+'''ASCII whitespace.'''
+
+
+class ByteAlphabet(StrAlphabet):
+    '''
+    An alphabet for bytes.
+    '''
+    
+    __cached_instance = None
+    
+    # pylint: disable-msg=E1002
+    # (pylint bug?  this chains back to a new style abc)
+    def __init__(self):
+        from lepl.matchers.core import Any
+        def mkhex(char, n):
+            from lepl.matchers.derived import Drop
+            return Drop(Any(char)) + Any('0123456789abcdefABCDEF')[n,...] >> \
+                        (lambda x: chr(int(x, 16)))
+        def mkchr(char, invert=False):
+            from lepl.matchers.core import Literal
+            from lepl.matchers.derived import Map
+            from lepl.regexp.core import Character
+            intervals = [(c, c) for c in bytearray(_WHITESPACE)]
+            if invert:
+                # this delays call to invert until after creation of self
+                func = lambda _: Character(self.invert(intervals), self)
+            else:
+                func = lambda _: Character(intervals, self)
+            return Map(Literal(char), func)
+        range = mkchr('s') | mkchr('S', invert=True)
+        escaped = Any(ILLEGAL) | mkhex('x', 2)
+        super(ByteAlphabet, self).__init__(0, 255, escaped=escaped,
+                                           range=range)
+        
+    def before(self, char):
+        '''
+        Must return the character before char in the alphabet.  Never called 
+        with min (assuming input data are in range).
+        ''' 
+        return char-1
+    
+    def after(self, char): 
+        '''
+        Must return the character after c in the alphabet.  Never called with
+        max (assuming input data are in range).
+        ''' 
+        return char+1
+    
+    def from_char(self, char):
+        '''
+        Convert a character in the regexp to a byte value.
+        '''
+        if not isinstance(char, int):
+            char = ord(char)
+        if not 0 <= char < 256:
+            raise ValueError(fmt('Not a byte value: {0!r}', char))
+        return char
+    
+    def _escape_char(self, char):
+        '''
+        Escape a byte value if necessary, using `\\xNN` for anything that
+        is not printable ASCII.
+        '''
+        if 32 <= char < 127:
+            return super(ByteAlphabet, self)._escape_char(chr(char))
+        else:
+            return fmt('\\x{0:02x}', char)
+        
+    def fmt_intervals(self, intervals):
+        '''
+        The text for a character set (re-parsed when Tokens are combined, 
+        so must be valid regexp syntax).
+        '''
+        if len(intervals) == 1:
+            (a, b) = intervals[0]
+            if a == b:
+                return self._escape_char(a)
+            elif a == self.min and b == self.max:
+                return '.'
+        ranges = []
+        for (a, b) in intervals:
+            if a == b:
+                ranges.append(self._escape_char(a))
+            else:
+                ranges.append(fmt('{0!s}-{1!s}', 
+                                  self._escape_char(a), self._escape_char(b)))
+        return fmt('[{0}]', self.join(ranges))
+    
+    def lookup(self, row):
+        '''
+        A dense table, indexed by byte value.
+        '''
+        return [row[char] for char in range(256)]
+    
+    @classmethod
+    def instance(cls):
+        '''
+        Get an instance of this alphabet (avoids creating new objects).
+        '''
+        if cls.__cached_instance is None:
+            cls.__cached_instance = ByteAlphabet()
+        return cls.__cached_instance
+
+    def __repr__(self):
+        return '<Byte>'
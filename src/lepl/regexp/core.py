@@ -162,6 +162,16 @@ class Alphabet(LogMixin, _Alphabet):
         self._debug(fmt('invert {0} -> {1}', intervals, inverted))
         return inverted
     
+    def lookup(self, row):
+        '''
+        Return the table used by a DFA to find the transition for a 
+        character, given an `IntervalMap` of the transitions.  By default 
+        this is the map itself; small alphabets can return something 
+        faster (anything that can be indexed by character, returning None
+        for no transition).
+        '''
+        return row
+    
     def extension(self, text):
         '''
         This is called for extensions for the form (*NAME) where NAME is any
@@ -928,7 +938,7 @@ class DfaPattern(LogMixin):
                 labels = tuple(self.__graph.terminals(dest))
                 for interval in char:
                     row[interval] = (dest, labels)
-            self.__table[src] = row
+            self.__table[src] = self.__alphabet.lookup(row)
             
     def match(self, stream_in):
         '''
@@ -946,26 +956,37 @@ class DfaPattern(LogMixin):
         '''
         Match against the stream, but return the length of the match.
         '''
-        state = 0
-        size = 0
-        longest = (self.__empty_labels, 0, stream) \
-                    if self.__empty_labels else None
         (line, _) = s_line(stream, True)
-        while size < len(line):
-            future = self.__table[state][line[size]]
+        match = self.size_match_text(line)
+        if match:
+            (terminals, size) = match
+            if size:
+                (_, stream) = s_next(stream, count=size)
+            return (terminals, size, stream)
+        
+    def size_match_text(self, text, start=0):
+        '''
+        Match against the text (a string or other sequence), starting at
+        index `start`, returning `(terminals, size)` for the longest match, 
+        or None.  This avoids constructing streams, so is useful when the
+        caller already has the data (eg a lexer working line by line).
+        '''
+        table = self.__table
+        state = 0
+        index = start
+        end = len(text)
+        longest = (self.__empty_labels, 0) if self.__empty_labels else None
+        while index < end:
+            future = table[state][text[index]]
             if future is None:
                 break
             # update state
             (state, terminals) = future
-            size += 1
+            index += 1
             # match is strictly increasing, so storing the length is enough
             # (no need to make an expensive copy)
             if terminals:
-                try:
-                    (_, next_stream) = s_next(stream, count=size)
-                    longest = (terminals, size, next_stream)
-                except StopIteration:
-                    pass
+                longest = (terminals, index - start)
         return longest
     
     def __repr__(self):
@@ -37,7 +37,8 @@ calls the standard Python regular expression library (and so is faster).
 from lepl.matchers.support import Transformable, NoTrampoline
 from lepl.matchers.transform import raise_
 from lepl.core.parser import tagged
-from lepl.regexp.core import Compiler
+from lepl.regexp.byte import ByteAlphabet
+from lepl.regexp.core import Compiler, RegexpError
 from lepl.regexp.unicode import UnicodeAlphabet
 
 
@@ -85,6 +86,11 @@ class NfaRegexp(BaseRegexp):
     
     def __init__(self, regexp, alphabet=None):
         alphabet = UnicodeAlphabet.instance() if alphabet is None else alphabet
+        if isinstance(alphabet, ByteAlphabet):
+            # the NFA reads values from the stream, which are bytes, not
+            # the integers in the alphabet
+            raise RegexpError('NFA regular expressions cannot match bytes; '
+                              'use a DFA (eg. config.compile_to_dfa()).')
         super(NfaRegexp, self).__init__(regexp, alphabet)
         self.__cached_matcher = None
         
@@ -101,12 +107,17 @@ class NfaRegexp(BaseRegexp):
         '''
         Actually do the work of matching.
         '''
-        function = self.wrapper.function
+        mapping = self.wrapper.mapping
         matches = self._compile()(stream_in)
+        if mapping:
+            for (_terminal, match, stream_out) in matches:
+                yield (mapping([match]), stream_out)
+            return
+        function = self.wrapper.function
         for (_terminal, match, stream_out) in matches:
             yield function(stream_in, lambda: ([match], stream_out)) \
                 if function else ([match], stream_out)
-        while True:
+        while function:
             yield function(stream_in, lambda: raise_(StopIteration))
         
 
@@ -136,12 +147,18 @@ class DfaRegexp(BaseRegexp):
         '''
         Actually do the work of matching.
         '''
-        function = self.wrapper.function
+        mapping = self.wrapper.mapping
         match = self._compile()(stream_in)
+        if mapping:
+            if match is not None:
+                (_terminals, match, stream_out) = match
+                yield (mapping([match]), stream_out)
+            return
+        function = self.wrapper.function
         if match is not None:
             (_terminals, match, stream_out) = match
             yield function(stream_in, lambda: ([match], stream_out)) \
                 if function else ([match], stream_out)
-        while True:
+        while function:
             yield function(stream_in, lambda: raise_(StopIteration))
 
@@ -47,6 +47,12 @@ for handling odd dependencies is more difficult to implement in a general
 way, because it is not clear what all cases may be.  For now, therefore,
 we use a simple state machine approach using a tag (which is almost always
 None).  
+
+Containers may also carry text that is dropped (from `Drop()`) or the 
+characters excluded by a negated lookahead (from `AnyBut()`).  These cannot
+be used directly, but an enclosing `And()` can use them to construct a 
+character set, or to strip fixed-width text from the start and end of a 
+match.
 '''
 
 from logging import getLogger
@@ -56,12 +62,14 @@ from lepl.matchers.core import Regexp
 from lepl.matchers.matcher import matcher_map
 from lepl.matchers.support import FunctionWrapper, SequenceWrapper, \
     TrampolineWrapper, TransformableTrampolineWrapper
-from lepl.regexp.core import Choice, Sequence, Repeat, Empty, Option
+from lepl.matchers.transform import results_transformation
+from lepl.regexp.core import Choice, Sequence, Repeat, Empty, Option, \
+    _Choice
 from lepl.regexp.matchers import NfaRegexp, DfaRegexp
-from lepl.regexp.interval import Character
+from lepl.regexp.interval import Character, _Character
 from lepl.regexp.unicode import UnicodeAlphabet
 from lepl.core.rewriters import clone, Rewriter, clone_matcher
-from lepl.support.lib import fmt, str, basestring
+from lepl.support.lib import fmt, str, basestring, PYTHON3
 from lepl.matchers.combine import DepthNoTrampoline, AndNoTrampoline
 from lepl.matchers.error import Error
 
@@ -74,15 +82,24 @@ class RegexpContainer(object):
     
     log = getLogger('lepl.regexp.rewriters.RegexpContainer')
 
-    def __init__(self, matcher, regexp, use, add_reqd=False):
+    def __init__(self, matcher, regexp, use, add_reqd=False, joined=False,
+                 drop=False, exclude=None, stripped=False):
         self.matcher = matcher   # current best matcher (regexp or not)
         self.regexp = regexp     # the current regexp
         self.use = use           # is the regexp a win?
         self.add_reqd = add_reqd # we need "add" to combine values (from And)?
+        self.joined = joined     # does an empty match give '' (not nothing)?
+        self.drop = drop         # is the matched text discarded (Drop)?
+        self.exclude = exclude   # intervals rejected by a negated lookahead
+        # is dropped text removed from the match?  (if nothing else is done
+        # to the match this is the (prefix, suffix) widths removed)
+        self.stripped = stripped
         
     def __str__(self):
         return ','.join([str(self.matcher.__class__), str(self.regexp), 
-                         str(self.use), str(self.add_reqd)])
+                         str(self.use), str(self.add_reqd), str(self.joined),
+                         str(self.drop), str(self.exclude), 
+                         str(self.stripped)])
 
     @classmethod
     def to_regexps(cls, use, possibles, have_add=False):
@@ -98,18 +115,38 @@ class RegexpContainer(object):
         for possible in possibles:
             if isinstance(possible, RegexpContainer):
                 cls.log.debug(fmt('unpacking: {0!s}', possible))
-                if have_add is None or possible.add_reqd == have_add:
+                if possible.exclude is not None:
+                    raise Unsuitable('Negated lookahead not followed by '
+                                     'a single character.', possible)
+                elif possible.drop:
+                    raise Unsuitable('Dropped text not at the start or end '
+                                     'of a fixed sequence.', possible)
+                elif possible.stripped:
+                    raise Unsuitable('Dropped text cannot be removed from '
+                                     'inside a larger expression.', possible)
+                elif have_add is None or possible.add_reqd == have_add:
                     regexps.append(possible.regexp)
                     # this flag indicates that it's "worth" using the regexp
                     # so we "inherit"
                     use = use or possible.use
                 else:
-                    raise Unsuitable('Add inconsistent.')
+                    raise Unsuitable('Add inconsistent.', possible)
             else:
                 cls.log.debug(fmt('cannot unpack: {0!s}', 
                                      possible.__class__))
-                raise Unsuitable('Not a container.')
+                raise Unsuitable(fmt('Cannot extend {0}.', 
+                                     getattr(possible, '_small_str', 
+                                             possible.__class__.__name__)),
+                                 possible)
         return use, regexps
+    
+    @staticmethod
+    def any_joined(possibles):
+        '''
+        Do any of the containers give '' for an empty match?
+        '''
+        return any(isinstance(possible, RegexpContainer) and possible.joined
+                   for possible in possibles)
         
     @staticmethod
     def to_matcher(possible):
@@ -123,15 +160,24 @@ class RegexpContainer(object):
         
     @classmethod
     def build(cls, node, regexp, alphabet, regexp_type, use, 
-               add_reqd=False, wrapper=None):
+               add_reqd=False, wrapper=None, joined=False):
         '''
         Construct a container or matcher.
+        
+        A node whose only transformation is `drop` (composed with it, by 
+        `ComposeTransforms`) gives a container for dropped text.
         '''
+        if wrapper is None and dropped(node):
+            if use:
+                node = single(alphabet, node, regexp, regexp_type)
+            return RegexpContainer(node, regexp, use, drop=True)
         if use and not add_reqd:
-            matcher = single(alphabet, node, regexp, regexp_type, wrapper)
+            matcher = single(alphabet, node, regexp, regexp_type, wrapper,
+                             joined)
             # if matcher is a Transformable with a Transformation other than
             # the standard empty_adapter then we must stop
-            if len(matcher.wrapper.functions) > 1:
+            if [function for function in matcher.wrapper.functions
+                if function is not empty_adapter]:
                 cls.log.debug(fmt('Force matcher: {0}', matcher.wrapper))
                 return matcher
         else:
@@ -141,17 +187,33 @@ class RegexpContainer(object):
             matcher = node
             if hasattr(matcher, 'wrapper') and matcher.wrapper:
                 return matcher
-        return RegexpContainer(matcher, regexp, use, add_reqd)
+        return RegexpContainer(matcher, regexp, use, add_reqd, joined)
         
 
-def single(alphabet, node, regexp, regexp_type, wrapper=None):
+def dropped(node):
+    '''
+    Is the only transformation of the node `drop`?
+    '''
+    # avoid dependency loops
+    from lepl.matchers.derived import drop
+    wrapper = getattr(node, 'wrapper', None)
+    return bool(wrapper) and \
+        [function for function in wrapper.functions 
+         if function is not empty_adapter] == [drop]
+
+
+def single(alphabet, node, regexp, regexp_type, wrapper=None, joined=False):
     '''
     Create a matcher for the given regular expression.
+    
+    If `joined` is true then an empty match returns '' (otherwise it 
+    returns no results).
     '''
     # avoid dependency loops
     from lepl.matchers.transform import TransformationWrapper
     matcher = regexp_type(regexp, alphabet)
-    matcher = matcher.compose(TransformationWrapper(empty_adapter))
+    if not joined:
+        matcher = matcher.compose(TransformationWrapper(empty_adapter))
     if wrapper is None and hasattr(node, 'wrapper'):
         wrapper = node.wrapper
     elif wrapper and not isinstance(wrapper, TransformationWrapper):
@@ -162,30 +224,131 @@ def single(alphabet, node, regexp, regexp_type, wrapper=None):
         matcher = matcher.compose(wrapper)
     return matcher
 
-def empty_adapter(_stream, matcher):
+@results_transformation
+def empty_adapter(results):
     '''
     There is a fundamental mismatch between regular expressions and the 
     recursive descent parser on how empty matchers are handled.  The main 
     parser uses empty lists; regexp uses an empty string.  This is a hack
     that converts from one to the other.  I do not see a better solution.
     '''
-    (results, stream_out) = matcher()
     if results == ['']:
         results = []
-    return results, stream_out
+    return results
+
+
+def make_strip(prefix, suffix, joined=False):
+    '''
+    A transformation that removes the text matched by dropped, fixed-width
+    expressions at the start (`prefix` characters) and end (`suffix` 
+    characters) of a match.  If `joined` is true an empty result is kept.
+    '''
+    @results_transformation
+    def strip(results):
+        '''
+        Remove the dropped text.
+        '''
+        if results:
+            text = results[0][prefix:len(results[0])-suffix]
+            if text or joined:
+                return [text]
+        return []
+    return strip
+
+
+def regexp_width(regexp):
+    '''
+    The number of characters matched by the regular expression, if fixed, 
+    otherwise None.
+    '''
+    if isinstance(regexp, _Character):
+        return 1
+    elif type(regexp) is Sequence:
+        width = 0
+        for child in regexp:
+            child_width = regexp_width(child)
+            if child_width is None:
+                return None
+            width += child_width
+        return width
+    else:
+        return None
+    
+    
+def character_intervals(alphabet, regexp):
+    '''
+    The (normalized) intervals matched by the regular expression, if it 
+    matches a single character, otherwise None.
+    '''
+    if type(regexp) is Sequence and len(regexp) == 1:
+        child = regexp[0]
+        if isinstance(child, _Character):
+            return list(child)
+        elif type(child) is _Choice:
+            intervals = []
+            for option in child:
+                option = character_intervals(alphabet, option)
+                if option is None:
+                    return None
+                intervals.extend(option)
+            return list(Character(intervals, alphabet))
+    return None
+
+
+def character_ranges(alphabet, chars):
+    '''
+    Merge a collection of characters into ordered intervals.  This avoids
+    the cost of adding large sets character by character.
+    '''
+    intervals = []
+    for char in sorted(set(chars)):
+        if intervals and alphabet.after(intervals[-1][1]) == char:
+            intervals[-1] = (intervals[-1][0], char)
+        else:
+            intervals.append((char, char))
+    return intervals
+
+
+def intersect_intervals(intervals1, intervals2):
+    '''
+    The intersection of two ordered lists of intervals.
+    '''
+    (intersection, i, j) = ([], 0, 0)
+    while i < len(intervals1) and j < len(intervals2):
+        (a1, b1) = intervals1[i]
+        (a2, b2) = intervals2[j]
+        (a, b) = (max(a1, a2), min(b1, b2))
+        if a <= b:
+            intersection.append((a, b))
+        if b1 < b2:
+            i += 1
+        else:
+            j += 1
+    return intersection
 
         
 class Unsuitable(Exception):
     '''
     Exception thrown when a sub-node does not contain a suitable matcher.
+    
+    `matcher`, if given, is the (cloned) sub-node that was unsuitable.
     '''
-    pass
+    
+    def __init__(self, message, matcher=None):
+        super(Unsuitable, self).__init__(message)
+        self.matcher = matcher
 
 
-def make_clone(alphabet_, old_clone, regexp_type, use_from_start):
+def make_clone(alphabet_, old_clone, regexp_type, use_from_start, 
+               report=None):
     '''
     Factory that generates a clone suitable for rewriting recursive descent
     to regular expressions.
+    
+    If `report` is a list then `(matcher, reason)` pairs are appended for 
+    matchers that could not be converted, even though some of their 
+    children were.  Where a single child was unsuitable, the reason names
+    it.
     '''
     
     # clone functions below take the "standard" clone and the node, and then
@@ -193,9 +356,9 @@ def make_clone(alphabet_, old_clone, regexp_type, use_from_start):
     # they should return either a container or a matcher.
     
     # Avoid dependency loops
-    from lepl.matchers.derived import add
+    from lepl.matchers.derived import add, drop
     from lepl.matchers.combine import And, Or, DepthFirst
-    from lepl.matchers.core import Any, Literal
+    from lepl.matchers.core import Any, Literal, Lookahead
     from lepl.matchers.transform import Transform
 
     log = getLogger('lepl.regexp.rewriters.make_clone')
@@ -208,7 +371,11 @@ def make_clone(alphabet_, old_clone, regexp_type, use_from_start):
         if restrict is None:
             char = Character([(alphabet_.min, alphabet_.max)], alphabet_)
         else:
-            char = Character(((char, char) for char in restrict), alphabet_)
+            try:
+                char = Character(character_ranges(alphabet_, restrict), 
+                                 alphabet_)
+            except TypeError:
+                raise Unsuitable('Any() restricted to unsortable values.')
         log.debug(fmt('Any: cloned {0}', char))
         regexp = Sequence(alphabet_, char)
         return RegexpContainer.build(original, regexp, alphabet_, 
@@ -221,10 +388,13 @@ def make_clone(alphabet_, old_clone, regexp_type, use_from_start):
         '''
         (use, regexps) = \
             RegexpContainer.to_regexps(use, matchers, have_add=False)
+        joined = RegexpContainer.any_joined(matchers)
+        if joined and not all(matcher.joined for matcher in matchers):
+            raise Unsuitable('Alternatives differ on empty matches.')
         regexp = Choice(alphabet_, *regexps)
         log.debug(fmt('Or: cloned {0}', regexp))
         return RegexpContainer.build(original, regexp, alphabet_, 
-                                     regexp_type, use)
+                                     regexp_type, use, joined=joined)
 
     def clone_and(use, original, *matchers):
         '''
@@ -242,7 +412,26 @@ def make_clone(alphabet_, old_clone, regexp_type, use_from_start):
                 wrapper = wrapper[1:]
                 add_reqd = False
             else:
-                raise Unsuitable
+                raise Unsuitable('And() with a transformation.')
+        matchers = merge_excludes(matchers)
+        if not wrapper and matchers and \
+                all(isinstance(matcher, RegexpContainer) and matcher.drop 
+                    for matcher in matchers):
+            return clone_dropped(use, original, *matchers)
+        (prefix, middle, suffix) = split_dropped(matchers)
+        if prefix or suffix:
+            try:
+                return clone_stripped(use, original, prefix, middle, suffix,
+                                      add_reqd, wrapper)
+            except Unsuitable:
+                # combine contiguous matchers below, if possible
+                if add_reqd:
+                    raise
+        if add_reqd and len(matchers) == 1 and \
+                isinstance(matchers[0], RegexpContainer) and \
+                not matchers[0].add_reqd:
+            # a single result, so no need for add
+            add_reqd = False
         try:
             # combine all
             (use, regexps) = \
@@ -252,7 +441,8 @@ def make_clone(alphabet_, old_clone, regexp_type, use_from_start):
             log.debug(fmt('And: cloning {0}', regexp))
             return RegexpContainer.build(original, regexp, alphabet_, 
                                          regexp_type, use, add_reqd=add_reqd,
-                                         wrapper=wrapper)
+                                         wrapper=wrapper, 
+                                     joined=RegexpContainer.any_joined(matchers))
         except Unsuitable:
             # combine contiguous matchers where possible
             if add_reqd:
@@ -286,30 +476,140 @@ def make_clone(alphabet_, old_clone, regexp_type, use_from_start):
                     regexp_type(Sequence(alphabet_, *regexps), alphabet_))
             else:
                 output.extend(originals)
-            merged = And(*output)
-            return merged.compose(original.wrapper)
+            return Transform(And(*output), original.wrapper)
+        
+    def merge_excludes(matchers):
+        '''
+        Combine a negated lookahead with a following single character (as
+        generated by `AnyBut()`) to give a single character set.
+        '''
+        merged = []
+        for matcher in matchers:
+            if merged and isinstance(merged[-1], RegexpContainer) \
+                    and merged[-1].exclude is not None \
+                    and isinstance(matcher, RegexpContainer) \
+                    and not matcher.drop and not matcher.stripped \
+                    and matcher.exclude is None:
+                intervals = character_intervals(alphabet_, matcher.regexp)
+                try:
+                    if intervals is not None:
+                        intervals = intersect_intervals(
+                                    alphabet_.invert(merged[-1].exclude), 
+                                    intervals)
+                except TypeError: # not characters from the alphabet
+                    intervals = None
+                if intervals is not None:
+                    exclude = merged.pop()
+                    regexp = Sequence(alphabet_, 
+                                      Character(intervals, alphabet_))
+                    log.debug(fmt('AnyBut: cloned {0}', regexp))
+                    merged.append(RegexpContainer.build(
+                                And(exclude.matcher, matcher.matcher), 
+                                regexp, alphabet_, regexp_type, 
+                                exclude.use or matcher.use))
+                    continue
+            merged.append(matcher)
+        return merged
+    
+    def split_dropped(matchers):
+        '''
+        Separate dropped, fixed-width containers from the start and end of 
+        the sequence.
+        '''
+        def width(matcher):
+            if isinstance(matcher, RegexpContainer) and matcher.drop:
+                return regexp_width(matcher.regexp)
+        (prefix, suffix) = ([], [])
+        matchers = list(matchers)
+        while matchers and width(matchers[0]) is not None:
+            prefix.append(matchers.pop(0))
+        while matchers and width(matchers[-1]) is not None:
+            suffix.insert(0, matchers.pop())
+        return (prefix, matchers, suffix)
+        
+    def clone_dropped(use, original, *matchers):
+        '''
+        A sequence of dropped text is itself dropped.
+        '''
+        (use, regexps) = (use or any(matcher.use for matcher in matchers),
+                          [matcher.regexp for matcher in matchers])
+        regexp = Sequence(alphabet_, *regexps)
+        log.debug(fmt('And: cloning dropped {0}', regexp))
+        if use:
+            original = single(alphabet_, original, regexp, regexp_type, [drop])
+        return RegexpContainer(original, regexp, use, drop=True)
+        
+    def clone_stripped(use, original, prefix, middle, suffix, add_reqd, 
+                       wrapper):
+        '''
+        Match the entire sequence, but strip the fixed-width dropped text
+        from the start and end.  The regular expression includes the 
+        dropped text, so cannot be extended, except by more dropped text
+        (when nested sequences are not flattened).
+        '''
+        if len(middle) == 1 and isinstance(middle[0], RegexpContainer) \
+                and isinstance(middle[0].stripped, tuple):
+            (before, after) = middle[0].stripped
+            (use, regexps) = (use or middle[0].use, [middle[0].regexp.clone()])
+            joined = middle[0].joined
+        else:
+            (use, regexps) = \
+                RegexpContainer.to_regexps(use, middle, have_add=None)
+            (before, after) = (0, 0)
+            joined = RegexpContainer.any_joined(middle)
+        if add_reqd and (len(middle) != 1 or middle[0].add_reqd):
+            raise Unsuitable('Several results between dropped text.')
+        if not use:
+            return original
+        regexps = [matcher.regexp.clone() for matcher in prefix] + regexps + \
+                  [matcher.regexp.clone() for matcher in suffix]
+        regexp = Sequence(alphabet_, *regexps)
+        log.debug(fmt('And: cloning stripped {0}', regexp))
+        before += sum(regexp_width(matcher.regexp) for matcher in prefix)
+        after += sum(regexp_width(matcher.regexp) for matcher in suffix)
+        strip = make_strip(before, after, joined)
+        return RegexpContainer(single(alphabet_, original, regexp, 
+                                      regexp_type, 
+                                      [strip] + list(wrapper or [])),
+                               regexp, use, joined=joined,
+                               stripped=True if wrapper else (before, after))
         
     def clone_transform(use, original, matcher, wrapper):
         '''
         We can assume that wrapper is a transformation.  Add joins into
         a sequence.
         '''
+        joined = RegexpContainer.any_joined([matcher])
         if original.wrapper:
             if original.wrapper.functions[0] is add:
                 have_add = True
                 wrapper = original.wrapper.functions[1:]
+            elif joins_text(original.wrapper.functions[0]):
+                # a reduction gives '' when there is no match
+                have_add = True
+                wrapper = original.wrapper.functions[1:]
+                joined = True
             else:
                 have_add = False
                 wrapper = original.wrapper.functions
         else:
             # punt to next level
             return matcher
+        if wrapper == [drop]:
+            # any number of results is fine if they are discarded
+            have_add = None
         (use, [regexp]) = \
             RegexpContainer.to_regexps(use, [matcher], have_add=have_add)
         log.debug(fmt('Transform: cloning {0}', regexp))
+        if wrapper == [drop]:
+            if use:
+                original = single(alphabet_, original, regexp, regexp_type, 
+                                  wrapper)
+            return RegexpContainer(original, regexp, use, drop=True)
         return RegexpContainer.build(original, regexp, alphabet_, 
                                      regexp_type, use,
-                                     add_reqd=False, wrapper=wrapper)
+                                     add_reqd=False, wrapper=wrapper,
+                                     joined=joined)
         
     def clone_literal(use, original, text):
         '''
@@ -329,9 +629,9 @@ def make_clone(alphabet_, old_clone, regexp_type, use_from_start):
             if isinstance(pattern, basestring):
                 pattern = Sequence(alphabet_, *alphabet_.parse(pattern))
         except TypeError:
-            raise Unsuitable
+            raise Unsuitable('Regexp() pattern cannot be parsed.')
         except Error: # cannot parse regexp
-            raise Unsuitable
+            raise Unsuitable('Regexp() pattern cannot be parsed.')
         return RegexpContainer.build(original, pattern, alphabet_, 
                                      regexp_type, use)
     
@@ -341,15 +641,15 @@ def make_clone(alphabet_, old_clone, regexp_type, use_from_start):
         This forces use=True as it is likely that a regexp is a gain.
         '''
         if stop is not None and start > stop:
-            raise Unsuitable
+            raise Unsuitable('Repetition with start after stop.')
         if reduce and not (isinstance(reduce, tuple) 
                            and len(reduce) == 2
                            and reduce[0] == [] 
                            and reduce[1] == __add__):
-            raise Unsuitable
+            raise Unsuitable('Repetition with a reduction.')
         if generator_manager_queue_len:
             # this should only be set when running
-            raise Unsuitable
+            raise Unsuitable('Repetition with a managed queue.')
         add_reqd = stop is None or stop > 1
         wrapper = False
         if hasattr(original, 'wrapper') and original.wrapper:
@@ -357,8 +657,11 @@ def make_clone(alphabet_, old_clone, regexp_type, use_from_start):
                 add_reqd = False
                 wrapper = original.wrapper.functions[1:]
             else:
-                raise Unsuitable
+                raise Unsuitable('Repetition with a transformation.')
         rest = first if rest is None else rest
+        joined = RegexpContainer.any_joined([first, rest])
+        if joined and not start:
+            raise Unsuitable('Repetition of joined text may be empty.')
         (use, [first, rest]) = \
                 RegexpContainer.to_regexps(True, [first, rest], have_add=None)
         seq = []
@@ -383,7 +686,29 @@ def make_clone(alphabet_, old_clone, regexp_type, use_from_start):
         log.debug(fmt('DFS: cloned {0}', regexp))
         return RegexpContainer.build(original, regexp, alphabet_, 
                                      regexp_type, use, add_reqd=add_reqd,
-                                     wrapper=wrapper)
+                                     wrapper=wrapper, joined=joined)
+        
+    def clone_lookahead(use, original, matcher, negated=False):
+        '''
+        A negated lookahead for a single character is carried upwards in 
+        the hope that it can be combined with the character that follows.
+        
+        This is not done for the unicode alphabet in Python 2, because the
+        input may be a byte string, and the combined character set cannot
+        compare bytes with unicode (the lookahead can).
+        '''
+        if not PYTHON3 and isinstance(alphabet_, UnicodeAlphabet):
+            raise Unsuitable('Lookahead() is not combined with the '
+                             'following character in Python 2.')
+        if negated and isinstance(matcher, RegexpContainer) \
+                and not matcher.drop and not matcher.stripped \
+                and matcher.exclude is None:
+            intervals = character_intervals(alphabet_, matcher.regexp)
+            if intervals is not None:
+                log.debug(fmt('Lookahead: cloned {0}', intervals))
+                return RegexpContainer(original, None, matcher.use, 
+                                       exclude=intervals)
+        raise Unsuitable('Lookahead() other than a negated single character.')
         
     def clone_wrapper(use, original, *args, **kargs):
         factory = original.factory
@@ -392,13 +717,15 @@ def make_clone(alphabet_, old_clone, regexp_type, use_from_start):
             return map_[factory](use, original, *args, **kargs)
         else:
             log.debug(fmt('No clone for {0}, {1}', factory, map_.keys()))
-            return original
+            raise Unsuitable(fmt('No regular expression for {0}().', 
+                                 factory.__name__))
         
     map_ = matcher_map({Any: clone_any, 
                         Or: clone_or, 
                         And: clone_and,
                         AndNoTrampoline: clone_and,
                         Transform: clone_transform,
+                        Lookahead: clone_lookahead,
                         Literal: clone_literal,
                         Regexp: clone_regexp,
                         NfaRegexp: clone_regexp,
@@ -423,13 +750,46 @@ def make_clone(alphabet_, old_clone, regexp_type, use_from_start):
             # pylint: disable-msg=W0142
             try:
                 return map_[type_](use_from_start, original, *args, **kargs)
-            except Unsuitable:
-                pass
+            except Unsuitable as e:
+                reason = str(e)
+                child = unsuitable_child(node, args, kargs, e.matcher)
+                if child:
+                    reason = fmt('{0} Blocked by {1}.', reason, child)
+        else:
+            reason = fmt('No regular expression for {0}.', type_.__name__)
+        if report is not None and \
+                any(isinstance(arg, RegexpContainer) 
+                    for arg in list(args) + list(kargs.values())):
+            report.append((node, reason))
         return original
 
     return clone_
 
 
+def unsuitable_child(node, args, kargs, matcher):
+    '''
+    Describe the argument of the original node whose clone is `matcher`
+    (or return None).
+    '''
+    if matcher is None:
+        return None
+    (node_args, node_kargs) = node._constructor_args()
+    for (arg, child) in zip(args, node_args):
+        if arg is matcher:
+            return str(child)
+    for name in kargs:
+        if kargs[name] is matcher:
+            return fmt('{0}={1!s}', name, node_kargs[name])
+
+
+def joins_text(function):
+    '''
+    Is the transformation a `Reduce()` that joins text?
+    '''
+    reduce = getattr(function, 'reduce', None)
+    return reduce is not None and reduce[0] == '' and reduce[1] is __add__
+
+
 class CompileRegexp(Rewriter):
     '''
     A rewriter that uses the given alphabet and matcher to compile simple
@@ -440,6 +800,21 @@ class CompileRegexp(Rewriter):
     are part of a tree that includes repetition.  The latter case generally
     gives more efficient parsers because it avoids converting already
     efficient literal matchers to regular expressions.
+    
+    `Delayed()` matchers that are not part of a loop are removed when they
+    refer to something that can be compiled.
+    
+    After rewriting, `report` contains `(matcher, reason)` pairs for the 
+    matchers (from the original graph) that stopped compilation of a larger
+    expression.
+    
+    A regular expression gives a single result, so a sequence or 
+    repetition is compiled only if its results are joined (eg. 
+    ``Any()[1:, ',', ...]``).  Otherwise (eg. ``Word()[1:, ',']``) the 
+    parts are compiled separately and the matcher is reported.  Similarly, 
+    text can be dropped from the start and end of a compiled sequence, but
+    not from the middle, so ``Word()[1:, Drop(',')]`` and a `String()` 
+    with escapes are only compiled in parts.
     '''
     
     def __init__(self, alphabet=None, use=True, matcher=NfaRegexp):
@@ -450,9 +825,33 @@ class CompileRegexp(Rewriter):
         self.alphabet = alphabet
         self.use = use
         self.matcher = matcher
+        self.report = []
         
     def __call__(self, graph):
-        new_clone = make_clone(self.alphabet, clone, self.matcher, self.use)
-        graph = clone_matcher(graph, new_clone)
-        graph = RegexpContainer.to_matcher(graph)
-        return graph 
+        self.report = []
+        make_copy = make_clone(self.alphabet, clone, self.matcher, self.use,
+                               self.report)
+        root = []
+        def new_clone(i, j, node, args, kargs):
+            copy = make_copy(i, j, node, args, kargs)
+            if node is graph:
+                root.append(copy)
+            return copy
+        new_graph = clone_matcher(graph, new_clone, 
+                                  inline=lambda copy: 
+                                        isinstance(copy, RegexpContainer))
+        if root and isinstance(root[0], RegexpContainer) \
+                and root[0].add_reqd:
+            self.report.append((graph, 'Several results (join them, eg. '
+                                       'with Add(), to compile).'))
+        graph = new_graph
+        for (matcher, reason) in self.report:
+            self._info(fmt('Could not compile {0}: {1}', matcher, reason))
+        return graph
+    
+    def format_report(self):
+        '''
+        A description of the matchers that could not be compiled.
+        '''
+        return '\n'.join(fmt('{0}: {1}', matcher, reason)
+                         for (matcher, reason) in self.report) 
@@ -1,5 +1,7 @@
 #LICENCE
 
+from __future__ import print_function
+
 from math import log, log10
 from os.path import join
 from time import time
@@ -13,23 +15,23 @@ from lepl.rxpy.engine.simple.re import _re as R_S
 
 def execute(engines, benchmarks, trace=False, repeat=3):
     for benchmark in benchmarks:
-        if trace: print benchmark
+        if trace: print(benchmark)
         def results():
             for engine in engines:
-                if trace: print '.',
+                if trace: print('.', end=' ')
                 secs = [benchmark(engine) for _i in range(repeat)]
                 secs.sort()
-                secs = secs[repeat/2]
+                secs = secs[repeat//2]
                 yield (engine, secs)
-            if trace: print
+            if trace: print()
         yield (benchmark, results())
     
         
 def write(engines, benchmarks, directory='./'):
     for (benchmark, data) in execute(engines, benchmarks):
-        with file(join(directory, str(benchmark) + '.dat'), 'w') as out:
+        with open(join(directory, str(benchmark) + '.dat'), 'w') as out:
             for (engine, secs) in data:
-                print >> out, secs, ';', str(engine)
+                print(secs, ';', str(engine), file=out)
                 
                 
 def text_histogram(engines, benchmarks):
@@ -69,13 +71,13 @@ def text_histogram(engines, benchmarks):
         return ''.join(line + [' '] * (l-max(lg,ln)))
         
     for (benchmark, data) in execute(engines, benchmarks):
-        print
-        print benchmark
+        print()
+        print(benchmark)
         (engines, secs) = zip(*list(data))
         for (engine, sec) in zip(engines[1:], secs[1:]):
-            print '{0} {1}{2:7.0f} [{3:3.1f}]'.format(
+            print('{0} {1}{2:7.0f} [{3:3.1f}]'.format(
                 right(engine, 25), bar(sec, secs, 40), 
-                sec/secs[0], log10(sec/secs[0]))
+                sec/secs[0], log10(sec/secs[0])))
             
 
 class BaseBenchmark(object):
@@ -184,7 +186,7 @@ if __name__ == '__main__':
         MatchBenchmark('Match (.*) (.*) (.*)  against abc abc abc', 
                        '(.*) (.*) (.*)', 10, 'abc abc abc'),
         ])
-    print
+    print()
     text_histogram([R_PYTHON, R_B, R_C, R_H, R_S], [
         MatchBenchmark('Search .*?a*b against a^10b', 
                        '.*?a*b', 1, 10*'a' + 'b', search=True),
@@ -197,14 +199,14 @@ if __name__ == '__main__':
         MatchBenchmark('Search .*?a*b against a^1000b', 
                        '.*?a*b', 1, 1000*'a' + 'b', search=True),
         ])
-    print
+    print()
     text_histogram([R_PYTHON, R_C, R_H], [
         exponential5(4),
         ])
     text_histogram([R_PYTHON, R_C, R_H], [
         exponential5(6),
         ])
-    print
+    print()
     text_histogram([R_PYTHON, R_C, R_H, R_S], [
         exponential4(4),
         ])
@@ -215,7 +217,7 @@ if __name__ == '__main__':
         exponential4(8),
         exponential(8),
         ])
-    print
+    print()
     text_histogram([R_PYTHON, R_C, R_H], [
         prime(32),
         prime(37, False),
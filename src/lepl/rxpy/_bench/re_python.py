@@ -23,6 +23,7 @@ class Re(object):
         self.error = re.error
         self.escape = re.escape    
         self.Scanner = re.Scanner
+        self.purge = re.purge
         
     def __str__(self):
         return 'Python re'
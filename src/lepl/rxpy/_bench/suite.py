@@ -0,0 +1,240 @@
+#LICENCE
+
+'''
+A benchmark suite that compares the RXPY engines with Python's `re` module.
+
+Each case in the catalogue is a (mostly real-world) pattern with a function
+that generates input text of a given size.  For every engine, case and size
+we measure the time to compile the pattern, the time to match (or search)
+the text, and (when `tracemalloc` is available) the peak memory allocated
+while matching.  The results are a list of dicts that can be written as
+JSON or CSV and compared against an earlier run to find regressions:
+
+  python -m lepl.rxpy._bench.suite --json new.json --compare old.json
+
+A match is a regression if it is slower by more than both the `--threshold`
+ratio and `--minimum` seconds (so that noise in very fast cases is not
+reported).
+
+Engines that do not support a pattern (or that fail) are recorded with an
+error rather than stopping the run.  Sizes larger than one that took more
+than `max_secs` are skipped for that engine and case, so that exponential
+cases do not stall the suite.
+'''
+
+from __future__ import print_function
+
+from csv import DictWriter
+from optparse import OptionParser
+import sys
+
+from lepl.rxpy._bench.re_python import _re as R_PYTHON
+from lepl.rxpy.engine.backtrack.re import _re as R_B
+from lepl.rxpy.engine.complex.re import _re as R_C
+from lepl.rxpy.engine.hybrid.re import _re as R_H
+from lepl.rxpy.engine.lexer.re import _re as R_L
+from lepl.rxpy.engine.simple.re import _re as R_S
+from lepl.support.timer import best_of, peak_memory, compare, save_json, \
+    load_json
+
+
+ENGINES = {'re': R_PYTHON, 'backtrack': R_B, 'complex': R_C,
+           'hybrid': R_H, 'lexer': R_L, 'simple': R_S}
+'''The engines that can be benchmarked (by name).'''
+
+FIELDS = ['engine', 'case', 'size', 'compile', 'match', 'chars_per_sec',
+          'peak_kb', 'matched', 'error']
+'''The fields in each result (and the columns in CSV output).'''
+
+
+class Case(object):
+    '''
+    A pattern, a function that generates text of a given size, and whether
+    the text is searched (rather than matched at the start).
+    '''
+
+    def __init__(self, name, pattern, text, search=False):
+        self.name = name
+        self.pattern = pattern
+        self.text = text
+        self.search = search
+
+    def __str__(self):
+        return self.name
+
+
+def repeated(sample, suffix=''):
+    '''
+    Generate text by repeating a sample (size is the number of repeats).
+    '''
+    return lambda size: sample * size + suffix
+
+
+CATALOGUE = [
+    Case('email', r'[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+(?:\.[a-zA-Z0-9-]+)+',
+         repeated('lorem ipsum dolor ', 'contact: someone.else@example.com'),
+         search=True),
+    Case('ipv4', r'(?:(?:25[0-5]|2[0-4]\d|1?\d?\d)\.){3}'
+                 r'(?:25[0-5]|2[0-4]\d|1?\d?\d)',
+         repeated('host unknown; ', 'host 192.168.100.254'), search=True),
+    Case('iso-date', r'(\d{4})-(\d{2})-(\d{2})',
+         repeated('no date here ', 'logged 2011-03-27'), search=True),
+    Case('url', r'https?://[a-z0-9.-]+(?::\d+)?(?:/[^ ?#]*)?(?:\?[^ #]*)?',
+         repeated('see also ', 'http://www.acooke.org/lepl/index.html?x=1'),
+         search=True),
+    Case('log-line', r'(\S+) \S+ \S+ \[([^\]]+)\] "(\w+) ([^ "]+)[^"]*" '
+                     r'(\d{3}) (\d+|-)',
+         lambda size: '127.0.0.1 - - [10/Oct/2000:13:55:36 -0700] "GET /' +
+                      'a' * size + ' HTTP/1.0" 200 2326'),
+    Case('quoted-string', r'"(?:[^"\\]|\\.)*"',
+         lambda size: '"' + 'abc\\"def' * size + '"'),
+    Case('float', r'[+-]?(?:\d+\.\d*|\.\d+|\d+)(?:[eE][+-]?\d+)?',
+         lambda size: '1' * size + '.' + '2' * size + 'e-10'),
+    Case('identifier-list', r'[A-Za-z_]\w*(?:\s*,\s*[A-Za-z_]\w*)*',
+         repeated('alpha, beta_2 , gamma3,', 'delta')),
+    Case('html-tag', r'<([a-z]+)(?:\s+[a-z]+="[^"]*")*\s*>',
+         repeated('some text ', '<a href="x" title="y">'), search=True),
+    Case('dot-star', r'.*b', repeated('a', 'b')),
+    Case('lazy-search', r'.*?a*b', repeated('a', 'b'), search=True),
+    Case('alternation', r'(?:a|b|c|d|e)*f', repeated('abcde', 'f')),
+    Case('nested-groups', r'((a)|(b)|(c)|(d))*e', repeated('abcd', 'e')),
+    Case('pathological', r'(a|aa)*b', repeated('a')),
+]
+'''The default cases.'''
+
+SIZES = [10, 100, 1000]
+'''The default sizes.'''
+
+
+def measure(engine, case, size, repeat=3, memory=True):
+    '''
+    Measure a single engine, case and size.
+    '''
+    result = dict((field, None) for field in FIELDS)
+    result.update(engine=str(engine), case=case.name, size=size)
+    text = case.text(size)
+    try:
+        # re caches compiled patterns, so the cache is cleared before each
+        # repeat (the RXPY engines have no cache)
+        result['compile'] = best_of(repeat, 
+                                    lambda: engine.compile(case.pattern),
+                                    before=getattr(engine, 'purge', None))
+        regexp = engine.compile(case.pattern)
+        if case.search:
+            function = lambda: regexp.search(text)
+        else:
+            function = lambda: regexp.match(text)
+        result['matched'] = bool(function())
+        result['match'] = best_of(repeat, function)
+        if result['match']:
+            result['chars_per_sec'] = len(text) / result['match']
+        if memory:
+            result['peak_kb'] = peak_memory(function)
+    except Exception as error: # pylint: disable-msg=W0703
+        result['error'] = '{0}: {1}'.format(type(error).__name__,
+                                            str(error).split('\n')[0])
+    return result
+
+
+def run(engines=None, cases=None, sizes=None, repeat=3, memory=True,
+        max_secs=1.0, trace=False):
+    '''
+    Run the benchmarks, returning a list of results.  `engines` is a list of
+    names from `ENGINES`.
+    '''
+    engines = sorted(ENGINES) if engines is None else engines
+    cases = CATALOGUE if cases is None else cases
+    sizes = SIZES if sizes is None else sizes
+    results = []
+    for case in cases:
+        for name in engines:
+            for size in sorted(sizes):
+                result = measure(ENGINES[name], case, size, repeat=repeat,
+                                 memory=memory)
+                result['engine'] = name
+                results.append(result)
+                if trace:
+                    print(format_result(result))
+                if result['error'] or result['match'] > max_secs:
+                    break
+    return results
+
+
+def format_result(result):
+    '''
+    A single line summary of a result.
+    '''
+    if result['error']:
+        return '{0:10s} {1:16s} {2:6d}  {3}'.format(
+                    result['engine'], result['case'], result['size'],
+                    result['error'])
+    else:
+        return '{0:10s} {1:16s} {2:6d} {3:10.6f} {4:10.6f} {5}'.format(
+                    result['engine'], result['case'], result['size'],
+                    result['compile'], result['match'],
+                    '' if result['matched'] else 'no match')
+
+
+def key(result):
+    '''
+    Identify a result (for comparison between runs).
+    '''
+    return (result['engine'], result['case'], result['size'])
+
+
+def write_csv(results, path):
+    '''
+    Save results as CSV.
+    '''
+    with open(path, 'w') as output:
+        writer = DictWriter(output, FIELDS)
+        writer.writerow(dict((field, field) for field in FIELDS))
+        for result in results:
+            writer.writerow(result)
+
+
+def main(args=None):
+    '''
+    Run from the command line.  Returns a non-zero value if regressions are
+    found.
+    '''
+    parser = OptionParser(usage='%prog [options]')
+    parser.add_option('-e', '--engine', action='append', dest='engines',
+                      help='engine to run (repeat for more; default all)')
+    parser.add_option('-c', '--case', action='append', dest='cases',
+                      help='case to run (repeat for more; default all)')
+    parser.add_option('-s', '--size', action='append', dest='sizes',
+                      type='int', help='input size (repeat for more)')
+    parser.add_option('-r', '--repeat', type='int', default=3,
+                      help='number of timings (the best is used)')
+    parser.add_option('--no-memory', action='store_false', dest='memory',
+                      default=True, help='do not measure memory')
+    parser.add_option('--json', help='write results as JSON')
+    parser.add_option('--csv', help='write results as CSV')
+    parser.add_option('--compare', help='earlier results (JSON) to compare')
+    parser.add_option('--threshold', type='float', default=1.2,
+                      help='slow-down ratio reported as a regression')
+    parser.add_option('--minimum', type='float', default=0.001,
+                      help='smallest slow-down (in seconds) reported')
+    (options, _) = parser.parse_args(args)
+    cases = CATALOGUE
+    if options.cases:
+        cases = [case for case in CATALOGUE if case.name in options.cases]
+    results = run(options.engines, cases, options.sizes,
+                  repeat=options.repeat, memory=options.memory, trace=True)
+    if options.json:
+        save_json(results, options.json)
+    if options.csv:
+        write_csv(results, options.csv)
+    if options.compare:
+        regressions = compare(load_json(options.compare), results, key,
+                              options.threshold, 'match', 
+                              minimum=options.minimum)
+        for (ident, before, after) in regressions:
+            print('REGRESSION {0}: {1} -> {2}'.format(ident, before, after))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
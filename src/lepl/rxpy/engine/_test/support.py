@@ -3,7 +3,7 @@
 
 from unittest import TestCase
 
-from lepl.rxpy.engine.support import StreamTargetMixin
+from lepl.rxpy.engine.support import StreamTargetMixin, Groups, Loops
 from lepl.stream.factory import DEFAULT_STREAM_FACTORY
 
 
@@ -94,3 +94,32 @@ class StreamTargetTest(TestCase):
         target._advance(3)
         self.assert_target(target, 3, None, None, 2)
 
+
+
+class CopyOnWriteTest(TestCase):
+
+    def test_groups(self):
+        stream = DEFAULT_STREAM_FACTORY.from_string('abc')
+        groups = Groups(stream=stream)
+        groups.start_group(1, 0)
+        clone = groups.clone()
+        assert clone == groups
+        clone.end_group(1, 2)
+        assert clone != groups
+        assert clone.group(1) == 'ab', clone.group(1)
+        assert 1 not in groups.groups
+        groups.end_group(1, 1)
+        assert groups.group(1) == 'a', groups.group(1)
+        assert clone.group(1) == 'ab', clone.group(1)
+
+    def test_loops(self):
+        loops = Loops()
+        loops.increment('x')
+        clone = loops.clone()
+        assert clone == loops
+        assert clone.increment('x') == 1
+        assert clone != loops
+        loops.increment('y')
+        clone.drop('x')
+        assert loops.increment('x') == 1
+        assert clone.increment('x') == 0
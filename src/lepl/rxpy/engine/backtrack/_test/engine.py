@@ -3,7 +3,10 @@
 
 from unittest import TestCase
 
-from lepl.rxpy.engine.backtrack.engine import BacktrackingEngine
+from lepl.rxpy.engine.backtrack.engine import BacktrackingEngine, \
+    StepLimitError
+from lepl.rxpy.parser.pattern import parse_pattern
+from lepl.rxpy.parser.support import ParserState
 from lepl.rxpy.engine._test.engine import EngineTest
 
 
@@ -50,3 +53,50 @@ class BacktrackingEngineTest(EngineTest, TestCase):
         assert self.engine(self.parse('.(.).(?<=(?:a|z))'), 'xxa', ticks=11)
         assert self.engine(self.parse('.(.).(?<=(a|z))'), 'xxa', ticks=13)
         
+        
+    def test_memo(self):
+        # without memoisation this takes ~2**n steps
+        parse = self.parse('(a|aa)*b')
+        engine = self.default_engine()(*parse)
+        assert not engine.run(self.default_factory()('a' * 100))
+        assert engine.ticks < 2000, engine.ticks
+        # back-references disable memoisation
+        assert not self.default_engine()(*self.parse('(a)\\1'))._memoizable
+        assert not self.default_engine()(*self.parse('a{2,3}'))._memoizable
+        # but results are unchanged
+        assert self.engine(self.parse('(a|aa)*b'), 'aaab')
+        assert self.engine(self.parse('(a|ab)*c'), 'abac').group(1) == 'a'
+        
+    def test_memo_checkpoint(self):
+        # empty loop guards depend on the path taken, so disable the memo
+        results = []
+        for engine in (self.default_engine(), 
+                       BacktrackingEngine.configure(memo_size=0)):
+            parse = parse_pattern('(?:a*|b)*c', engine, 
+                                  alphabet=self._alphabet,
+                                  flags=ParserState._EMPTY)
+            groups = engine(*parse).run(self.default_factory()('bac'),
+                                        search=True)
+            results.append(groups.data(0)[0])
+        assert results == ['ac', 'ac'], results
+        
+    def test_memo_short_searches(self):
+        # the memo records only the positions visited, so repeated short
+        # matches over a long input (as in findall) are not quadratic
+        parse = self.parse('a(b|c)')
+        engine = self.default_engine()(*parse)
+        stream = self.default_factory()('ab ' * 10000)
+        for pos in (0, 15000, 29997):
+            assert engine.run(stream, pos=pos)
+            assert engine.memo_entries < 10, engine.memo_entries
+        assert len(self._re.compile('a(b|c)').findall('ab ' * 10000)) == 10000
+        
+    def test_step_limit(self):
+        engine = BacktrackingEngine.configure(memo_size=0, max_steps=1000)
+        parse = parse_pattern('(a|aa)*b', engine, alphabet=self._alphabet)
+        self.assertRaises(StepLimitError, 
+                          engine(*parse).run, self.default_factory()('a' * 30))
+        # with memoisation the limit is not reached
+        engine = BacktrackingEngine.configure(max_steps=1000)
+        parse = parse_pattern('(a|aa)*b', engine, alphabet=self._alphabet)
+        assert not engine(*parse).run(self.default_factory()('a' * 30))
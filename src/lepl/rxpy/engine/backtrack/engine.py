@@ -6,17 +6,40 @@ encapsulated in `State` while program flow uses trampolining to avoid
 exhausting the Python stack.  In addition, to further reduce the use of the
 (non-Python) stack, simple repetition is "run length" compressed (this
 addresses ".*" matching against long strings, for example).
+
+For patterns without back-references or counted repeats the outcome of a
+match from a given opcode and offset does not depend on how that point was 
+reached, so (up to a size limit) visited pairs are recorded in a bit vector 
+and not explored again.  This makes the engine linear in the length of the 
+input for those patterns.  A limit on the number of steps can also be given,
+to guard against expensive matches on patterns where this does not apply.
 '''                                    
 
 from lepl.rxpy.engine.base import BaseMatchEngine
-from lepl.rxpy.engine.support import Groups, Loops, Fail, Match, StreamTargetMixin
+from lepl.rxpy.engine.support import Groups, Loops, Fail, Match, \
+    StreamTargetMixin
 from lepl.rxpy.graph.base_compilable import compile
+from lepl.rxpy.graph.opcode import Repeat, Checkpoint
+from lepl.rxpy.graph.support import node_iterator, ReadsGroup
+from lepl.rxpy.support import RxpyError
 from lepl.stream.core import s_next, s_stream
+from lepl.support.lib import fmt
+
+
+class StepLimitError(RxpyError):
+    '''
+    Raised when a match takes more than `BacktrackingEngine.MAX_STEPS` 
+    steps.
+    '''
+    pass
 
 
 class State(StreamTargetMixin):
     '''
     State for a particular position moment / graph position / text offset.
+    
+    Groups and loops are copied on write, so cloning a state (which happens
+    for each choice point) does not copy their contents.
     '''
     
     def __init__(self, parser_state, stream, groups, pos=None,
@@ -38,18 +61,21 @@ class State(StreamTargetMixin):
         '''
         if groups is None:
             groups = self.__groups.clone()
-        previous = self._previous
+        # checkpoints are replaced, never modified, so can be shared
         if offset is None or offset == self._offset:
-            offset = self._offset
-            stream = self._stream
+            # a shallow copy avoids reading the stream again
+            state = State.__new__(State)
+            state.__dict__.update(self.__dict__)
+            state.__groups = groups
+            state.__loops = self.__loops.clone()
+            return state
         else:
             delta = offset - self._offset
             (advanced, stream) = s_next(self._stream, delta)
-            previous = advanced[-1:]
-        checkpoints = set(self.__checkpoints) if self.__checkpoints else None
-        return State(self._parser_state, stream, groups,
-                     previous=previous, offset=offset,
-                     loops=self.__loops.clone(), checkpoints=checkpoints)
+            return State(self._parser_state, stream, groups,
+                         previous=advanced[-1:], offset=offset,
+                         loops=self.__loops.clone(), 
+                         checkpoints=self.__checkpoints)
         
     def search_forwards(self):
         if self._current is not None:
@@ -188,11 +214,32 @@ class Stack(object):
 class BacktrackingEngine(BaseMatchEngine):
     '''
     The interpreter.
+    
+    Subclasses can redefine MEMO_SIZE (the maximum number of visited opcode /
+    offset pairs recorded; zero disables this) and MAX_STEPS
+    (the number of opcodes evaluated before `StepLimitError` is raised; 
+    `None` for no limit).  See `configure()`.
     '''
+    
+    MEMO_SIZE = 1 << 20
+    MAX_STEPS = None
 
     def __init__(self, parser_state, graph):
         super(BacktrackingEngine, self).__init__(parser_state, graph)
         self._program = compile(graph, self)
+        # checkpoints (empty loop guards) depend on the path taken
+        self._memoizable = not any(isinstance(node, 
+                                              (ReadsGroup, Repeat, Checkpoint))
+                                   for node in node_iterator(graph))
+        
+    @classmethod
+    def configure(cls, memo_size=MEMO_SIZE, max_steps=MAX_STEPS):
+        '''
+        Create a subclass with the given limits, which can be used as the
+        `engine` argument to `compile()` etc.
+        '''
+        return type(cls.__name__, (cls,), 
+                    {'MEMO_SIZE': memo_size, 'MAX_STEPS': max_steps})
 
     def run(self, stream, pos=0, search=False):
         '''
@@ -208,6 +255,7 @@ class BacktrackingEngine(BaseMatchEngine):
         # for testing optimizations
         self.ticks = 0
         self.max_depth = 0
+        self.memo_entries = 0
 
         self.__stack = None
         self.__state = None
@@ -215,14 +263,26 @@ class BacktrackingEngine(BaseMatchEngine):
         self.__lookaheads = {} # map from node to set of known ok states
 
         state.start_group(0)
-        (match, state) = self.__run(0, state, search=search)
+        (match, state) = self.__run(0, state, search=search, 
+                                    memo=self.__memo())
         if match:
             state.end_group(0)
             return state.groups
         else:
             return Groups()
 
-    def __run(self, index, state, search=False):
+    def __memo(self):
+        '''
+        The (initially empty) set used to record visited opcode / offset
+        pairs, or None if this cannot be used.  The set is sparse, so the
+        cost of a search depends on the positions visited, not on the
+        length of the input.
+        '''
+        if self._memoizable and self.MEMO_SIZE:
+            return set()
+        return None
+
+    def __run(self, index, state, search=False, memo=None):
         '''
         Run a sub-search.  We support multiple searches (stacks) so that we
         can invoke the same interpreter for lookaheads etc.
@@ -230,11 +290,17 @@ class BacktrackingEngine(BaseMatchEngine):
         This is a simple trampoline - it stores state on a stack and invokes
         the the compiled program.  Callbacks return the new program index,
         raise `Fail` on failure, or `Match` on success.
+        
+        If `memo` is given then opcode / offset pairs that have already been
+        visited fail immediately (for the top-level search only).
         '''
         self.__stacks.append((self.__stack, self.__state))
         self.__stack = Stack()
         self.__state = state
         save_index = None
+        visited = memo
+        (width, limit) = (len(self._program), self.MEMO_SIZE)
+        max_steps = self.MAX_STEPS
         try:
             try:
                 # search loop
@@ -245,6 +311,16 @@ class BacktrackingEngine(BaseMatchEngine):
                     # backtrack loop
                     while True:
                         try:
+                            if visited is not None:
+                                key = self.__state._offset * width + index
+                                if key in visited:
+                                    raise Fail
+                                if len(visited) < limit:
+                                    visited.add(key)
+                            if max_steps is not None and self.ticks > max_steps:
+                                raise StepLimitError(
+                                    fmt('Match abandoned after {0} steps.',
+                                        self.ticks))
                             # can't loop completely inside program as we exceed
                             # stack depth
                             index = self._program[index]()
@@ -269,6 +345,8 @@ class BacktrackingEngine(BaseMatchEngine):
         finally:
             # restore state so that another run can resume
             self.max_depth = max(self.max_depth, self.__stack.max_depth)
+            if visited is not None:
+                self.memo_entries = len(visited)
             self.__stack, self.__state = self.__stacks.pop()
             self.__match = False
             
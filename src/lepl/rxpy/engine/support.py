@@ -29,16 +29,31 @@ class Loops(object):
     '''
     The state needed to track explicit repeats.  This assumes that loops are 
     nested (as they must be).
+    
+    Clones share data with the original until either is modified (copy on
+    write), so cloning is cheap.
     '''
     
-    def __init__(self, counts=None, order=None):
+    def __init__(self, counts=None, order=None, shared=False):
         # counts for loops in nested order
-        self.__counts = counts if counts else []
+        self.__counts = counts if counts is not None else []
         # map from node to position in counts list
-        self.__order = order if order else {}
+        self.__order = order if order is not None else {}
+        # are the counts and order shared with another instance?
+        self.__shared = shared
+        
+    def __write(self):
+        '''
+        Take a private copy of shared data before modification.
+        '''
+        if self.__shared:
+            self.__counts = list(self.__counts)
+            self.__order = dict(self.__order)
+            self.__shared = False
         
     def increment(self, node):
         if node not in self.__order:
+            self.__write()
             order = len(self.__counts)
             self.__order[node] = order
             self.__counts.append(0)
@@ -49,13 +64,17 @@ class Loops(object):
         return self.__counts[order]
     
     def drop(self, node):
+        self.__write()
         self.__counts = self.__counts[0:self.__order[node]]
         del self.__order[node]
         
     def clone(self):
-        return Loops(list(self.__counts), dict(self.__order))
+        self.__shared = True
+        return Loops(self.__counts, self.__order, shared=True)
     
     def __eq__(self, other):
+        if self.__counts is other.__counts and self.__order is other.__order:
+            return True
         return self.__counts == other.__counts and self.__order == other.__order
     
     def __hash__(self):
@@ -64,9 +83,14 @@ class Loops(object):
                                    for node in self.__order], 0)
 
 class Groups(object):
+    '''
+    The groups matched so far.  Clones share data with the original until 
+    either is modified (copy on write), so cloning is cheap.
+    '''
     
     def __init__(self, group_state=None, stream=None,
-                 groups=None, offsets=None, last_index=None):
+                 groups=None, offsets=None, last_index=None, shared=False,
+                 str_=None):
         '''
         `group_state` - The group definitions (GroupState)
         
@@ -77,23 +101,35 @@ class Groups(object):
         self.__state = group_state if group_state else GroupState()
         self.__stream = stream
         # map from index to (text, start, end)
-        self.__groups = groups if groups else {}
+        self.__groups = groups if groups is not None else {}
         # map from index to start for pending groups
-        self.__offsets = offsets if offsets else {}
+        self.__offsets = offsets if offsets is not None else {}
         # last index matched
         self.__last_index = last_index
+        # are the groups and offsets shared with another instance?
+        self.__shared = shared
         # cache for str
+        self.__str = str_
+        
+    def __write(self):
+        '''
+        Take a private copy of shared data before modification.
+        '''
         self.__str = None
+        if self.__shared:
+            self.__groups = dict(self.__groups)
+            self.__offsets = dict(self.__offsets)
+            self.__shared = False
         
     def start_group(self, number, offset):
         assert isinstance(number, int)
-        self.__str = None
+        self.__write()
         self.__offsets[number] = offset
         
     def end_group(self, number, offset):
         assert isinstance(number, int)
         assert number in self.__offsets, 'Unopened group: ' + str(number)
-        self.__str = None
+        self.__write()
         (_, stream) = s_next(self.__stream, self.__offsets[number])
         (text, _) = s_next(stream, offset - self.__offsets[number])
         self.__groups[number] = (text, self.__offsets[number], offset)
@@ -115,7 +151,12 @@ class Groups(object):
         Ignores values from context (so does not work for comparison across 
         matches).
         '''
-        return type(self) == type(other) and str(self) == str(other)
+        if type(self) != type(other):
+            return False
+        if self.__groups is other.__groups and \
+                self.__offsets is other.__offsets:
+            return True
+        return str(self) == str(other)
             
     def __hash__(self):
         '''
@@ -140,9 +181,11 @@ class Groups(object):
         return self.__str
 
     def clone(self):
+        self.__shared = True
         return Groups(group_state=self.__state, stream=self.__stream,
-                      groups=dict(self.__groups),  offsets=dict(self.__offsets), 
-                      last_index=self.__last_index)
+                      groups=self.__groups, offsets=self.__offsets, 
+                      last_index=self.__last_index, shared=True, 
+                      str_=self.__str)
     
     def data(self, number):
         if number in self.__state.names:
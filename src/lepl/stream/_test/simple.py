@@ -26,9 +26,13 @@
 # above, a recipient may use your version of this file under either the
 # MPL or the LGPL License.
 
+from unittest import skipIf
+
 from lepl.support.lib import fmt
 from lepl._test.base import BaseTest
-from lepl.stream.core import s_empty, s_fmt, s_line, s_next, s_stream
+from lepl.stream.core import s_empty, s_fmt, s_line, s_next, s_stream, \
+    s_delta, s_kargs
+from lepl.stream.simple import LineIndex
 from lepl.stream.factory import DEFAULT_STREAM_FACTORY
 
 
@@ -40,6 +44,7 @@ class GenericTest(BaseTest):
                                     (f.from_sequence, []),
                                     (f.from_sequence, ()),
                                     (f.from_string, ''),
+                                    (f.from_bytes, b''),
                                     (f.from_list, [])):
             s = constructor(data)
             assert s_empty(s)
@@ -60,6 +65,7 @@ class GenericTest(BaseTest):
                                     (f.from_sequence, [1]),
                                     (f.from_sequence, (2,)),
                                     (f.from_string, 'b'),
+                                    (f.from_bytes, b'b'),
                                     (f.from_list, ['c'])):
             s = constructor(data)
             assert not s_empty(s)
@@ -76,6 +82,7 @@ class GenericTest(BaseTest):
                                     (f.from_sequence, [1, 2]),
                                     (f.from_sequence, (2,3)),
                                     (f.from_string, 'bc'),
+                                    (f.from_bytes, bytearray(b'bc')),
                                     (f.from_list, ['c', 6])):
             s = constructor(data)
             assert not s_empty(s)
@@ -103,4 +110,74 @@ class GenericTest(BaseTest):
         assert locn == 'line 2, character 3', locn
         
         
-        
\ No newline at end of file
+                
+    def test_line_index(self):
+        # scans=0 uses the index; otherwise the text is scanned
+        for scans in (0, 64):
+            index = LineIndex('ab\n\ncd\n', scans=scans)
+            assert index.locate(0) == (0, 0, 2), index.locate(0)
+            assert index.locate(2) == (0, 0, 2), index.locate(2)
+            assert index.locate(3) == (1, 3, 3), index.locate(3)
+            assert index.locate(5) == (2, 4, 6), index.locate(5)
+            assert index.locate(7) == (3, 7, 7), index.locate(7)
+            assert LineIndex('', scans=scans).locate(0) == (0, 0, 0)
+        index = LineIndex(b'a\nb', newline=b'\n', scans=0)
+        assert index.locate(3) == (1, 2, 3), index.locate(3)
+        
+    def test_string_delta(self):
+        f = DEFAULT_STREAM_FACTORY
+        text = 'ab\ncde\n\nf'
+        for state in range(len(text) + 1):
+            line_no = text.count('\n', 0, state) + 1
+            char = state - text.rfind('\n', 0, state)
+            s = f.from_string(text)
+            if state:
+                (_, s) = s_next(s, count=state)
+            assert s_delta(s) == (state, line_no, char), s_delta(s)
+            
+    def test_long_line(self):
+        f = DEFAULT_STREAM_FACTORY
+        s = f.from_string('a' * 10000 + 'b\nc')
+        (_, s) = s_next(s, count=10000)
+        kargs = s_kargs(s)
+        assert kargs['location'] == 'line 1, character 10001', kargs['location']
+        assert kargs['rest'] == "'b'", kargs['rest']
+        s = f.from_string('x\n' + 'a' * 10000)
+        (_, s) = s_next(s, count=3)
+        kargs = s_kargs(s)
+        assert kargs['location'] == 'line 2, character 2', kargs['location']
+        assert len(kargs['rest']) < 1100, len(kargs['rest'])
+        assert kargs['rest'].endswith("'..."), kargs['rest'][-10:]
+        assert len(kargs['all']) < 1100, len(kargs['all'])
+        assert len(kargs['text']) <= 60, kargs['text']
+        # an error far along a single long line
+        s = f.from_string('a' * 100000 + 'b' + 'c' * 10)
+        (_, s) = s_next(s, count=100000)
+        kargs = s_kargs(s)
+        assert kargs['location'] == 'line 1, character 100001', \
+            kargs['location']
+        assert len(kargs['all']) < 1100, len(kargs['all'])
+        assert kargs['all'][kargs['all_char'] - 1] == 'b', kargs['all_char']
+        
+    @skipIf(bytes is str, 'Byte streams need Python 3')
+    def test_bytes(self):
+        f = DEFAULT_STREAM_FACTORY
+        s = f(b'ab\ncd')
+        (line, n) = s_line(s, False)
+        assert isinstance(line, memoryview), type(line)
+        assert line == b'ab\ncd' and s_empty(n)
+        (value, n) = s_next(s, count=2)
+        assert value == b'ab' and isinstance(value, bytes), value
+        assert s_fmt(n, '{location}: {rest}') == "offset 2, value 10: b'\\ncd'", \
+            s_fmt(n, '{location}: {rest}')
+        sub = s_stream(n, line[3:])
+        (value, _) = s_next(sub, count=2)
+        assert value == b'cd' and isinstance(value, bytes), value
+        
+    def test_sequence_rest(self):
+        f = DEFAULT_STREAM_FACTORY
+        s = f.from_list(list(range(1000)))
+        (_, s) = s_next(s, count=2)
+        rest = s_kargs(s)['rest']
+        assert rest.startswith('[2, 3, 4') and rest.endswith('...]'), rest
+        assert len(rest) <= 60, rest
@@ -59,7 +59,13 @@ class StreamHelper(_StreamHelper):
     '''
     The interface that all helpers should implement.
     '''
-    
+
+    horizon = None
+    '''
+    The offset just past the data read so far, for helpers that record it
+    (see `IncrementalHelper`); otherwise None.
+    '''
+
     def __init__(self, id=None, factory=None, max=None, global_kargs=None,
                  cache_level=None):
         from lepl.stream.factory import DEFAULT_STREAM_FACTORY
@@ -297,11 +303,17 @@ class MutableMaxDepth(object):
     '''
     Track maximum depth (offset) reached and the associated stream.  Used to
     generate error message for incomplete matches.
+    
+    If `track` is False then helpers do not call `update()` (this avoids
+    the cost for every value read from the stream).  It can be set later
+    (eg by `FullFirstMatch` when repeating a failed match to find the
+    error).
     '''
     
-    def __init__(self):
+    def __init__(self, track=True):
         self.depth = 0
         self.stream = None
+        self.track = track
         
     def update(self, depth, stream):
         # the '=' here allows a token to nudge on to the next stream without
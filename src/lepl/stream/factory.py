@@ -28,13 +28,37 @@
 
 
 from collections import Iterable
+from sys import modules
 
-from lepl.stream.simple import SequenceHelper, StringHelper, ListHelper
+from lepl.stream.simple import SequenceHelper, StringHelper, ListHelper, \
+    BytesHelper, IncrementalHelper
 from lepl.stream.iter import IterableHelper, Cons
+from lepl.stream.core import MutableMaxDepth
 from lepl.support.lib import basestring, fmt, add_defaults, file
 from lepl.lexer.stream import TokenHelper
 
 
+def _max_kargs(kargs):
+    '''
+    Replace the `deepest` flag (if given) with a new `MutableMaxDepth` that
+    will (or will not) track the deepest match.
+    '''
+    if 'deepest' in kargs:
+        deepest = kargs.pop('deepest')
+        if 'max' not in kargs:
+            kargs['max'] = MutableMaxDepth(deepest)
+
+
+def _is_bits(sequence):
+    '''
+    Is this a `BitString`?  If `lepl.bin` has not been imported, it cannot 
+    be (and importing it here would be expensive, and fails with Python 2).
+    With Python 2 the module can be imported, but does not define it.
+    '''
+    bit_string = getattr(modules.get('lepl.bin.bits'), 'BitString', None)
+    return bit_string is not None and isinstance(sequence, bit_string)
+
+
 class StreamFactory(object):
     '''
     Given a value (typically a sequence), generate a stream.
@@ -45,13 +69,43 @@ class StreamFactory(object):
         Provide a stream for the contents of the string.
         '''
         add_defaults(kargs, {'factory': self})
+        _max_kargs(kargs)
         return (0, StringHelper(text, **kargs))
 
+    def from_incremental(self, text, **kargs):
+        '''
+        Provide a stream for the contents of the string that records how
+        far it is read, so that it can be parsed again incrementally after
+        an edit (see `ParseSession`).
+        '''
+        add_defaults(kargs, {'factory': self})
+        _max_kargs(kargs)
+        return (0, IncrementalHelper(text, **kargs))
+
+    def from_bytes(self, data, **kargs):
+        '''
+        Provide a stream for bytes (or a bytearray).  Use with the 
+        `ByteAlphabet` to compile regular expressions and tokens.
+        '''
+        add_defaults(kargs, {'factory': self})
+        _max_kargs(kargs)
+        return (0, BytesHelper(data, **kargs))
+
+    def from_bits(self, bits, **kargs):
+        '''
+        Provide a stream for a `BitString` (from `lepl.bin`).
+        '''
+        from lepl.bin.stream import BitHelper
+        add_defaults(kargs, {'factory': self})
+        _max_kargs(kargs)
+        return (0, BitHelper(bits, **kargs))
+
     def from_list(self, list_, **kargs):
         '''
         Provide a stream for the contents of the list.
         '''
         add_defaults(kargs, {'factory': self})
+        _max_kargs(kargs)
         return (0, ListHelper(list_, **kargs))
 
     def from_sequence(self, sequence, **kargs):
@@ -59,6 +113,7 @@ class StreamFactory(object):
         Return a generic stream for any indexable sequence.
         '''
         add_defaults(kargs, {'factory': self})
+        _max_kargs(kargs)
         return (0, SequenceHelper(sequence, **kargs))
 
     def from_iterable(self, iterable, **kargs):
@@ -68,6 +123,9 @@ class StreamFactory(object):
         passed to the stream factory.
         '''
         add_defaults(kargs, {'factory': self})
+        # the helper and the first line share the same max
+        _max_kargs(kargs)
+        add_defaults(kargs, {'max': MutableMaxDepth()})
         cons = Cons(iterable)
         return ((cons, self(cons.head, **kargs)), IterableHelper(**kargs))
     
@@ -101,16 +159,28 @@ class StreamFactory(object):
         '''
         Auto-detect type and wrap appropriately.
         '''
+        return self.dispatch(sequence)(sequence, **kargs)
+    
+    def dispatch(self, sequence):
+        '''
+        The method that provides a stream for the type of the sequence 
+        (this lets callers with many values of the same type check the 
+        type once).
+        '''
         if isinstance(sequence, basestring):
-            return self.from_string(sequence, **kargs)
+            return self.from_string
+        elif isinstance(sequence, (bytes, bytearray)):
+            return self.from_bytes
         elif isinstance(sequence, list):
-            return self.from_list(sequence, **kargs)
+            return self.from_list
+        elif _is_bits(sequence):
+            return self.from_bits
         elif isinstance(sequence, file):
-            return self.from_file(sequence, **kargs)
+            return self.from_file
         elif hasattr(sequence, '__getitem__') and hasattr(sequence, '__len__'):
-            return self.from_sequence(sequence, **kargs)
+            return self.from_sequence
         elif isinstance(sequence, Iterable):
-            return self.from_iterable(sequence, **kargs)
+            return self.from_iterable
         else:
             raise TypeError(fmt('Cannot generate a stream for type {0}',
                                    type(sequence)))
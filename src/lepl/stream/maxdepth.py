@@ -30,7 +30,7 @@
 Raise an exception if the stream is not consumed entirely.
 '''
 
-from lepl.stream.core import s_empty, s_fmt, s_deepest, s_next
+from lepl.stream.core import s_empty, s_fmt, s_deepest, s_next, s_max
 from lepl.matchers.support import trampoline_matcher_factory
 
 
@@ -44,26 +44,48 @@ def FullFirstMatch(matcher, eos=True):
     This only works for the first match because we cannot reset the stream
     facade for subsequent matches (also, if you want multiple matches you
     probably want more sophisticated error handling than this).
+    
+    If the stream is not tracking the deepest match (see 
+    `ConfigBuilder.lazy_deepest()`) then a failed match is repeated, with
+    tracking enabled, to find the location for the exception.  
     '''
     
     def _matcher(support, stream1):
         # set default maxdepth
         s_next(stream1, count=0)
+        max_ = s_max(stream1)
         # first match
         generator = matcher._match(stream1)
+        failed = None
         try:
             (result2, stream2) = yield generator
             if eos and not s_empty(stream2):
-                raise FullFirstMatchException(stream2)
-            else:
-                yield (result2, stream2)
+                failed = stream2
+        except StopIteration:
+            failed = stream1
+            
+        if failed is None:
+            yield (result2, stream2)
+            # subsequent matches:
+            while True:
+                result = yield generator
+                yield result
+        elif max_.track:
+            raise FullFirstMatchException(failed)
+                
+        # repeat the match, tracking the deepest point.  the helper's id is
+        # changed so that memoised results are not re-used (they would hide 
+        # the input read earlier).
+        support._debug('Repeating failed match to find deepest point.')
+        max_.track = True
+        helper = stream1[1]
+        helper.id = hash((helper.id, FullFirstMatchException))
+        s_next(stream1, count=0)
+        try:
+            (_, stream2) = yield matcher._match(stream1)
+            raise FullFirstMatchException(stream2)
         except StopIteration:
             raise FullFirstMatchException(stream1)
-        
-        # subsequent matches:
-        while True:
-            result = yield generator
-            yield result
 
     return _matcher
 
@@ -33,12 +33,78 @@ The state is an integer offset.  Sequence and a possible delta for the
 offset are stored in the helper.
 '''
 
-from itertools import chain
+from array import array
+from bisect import bisect_left
+from itertools import chain, count
 
 from lepl.support.lib import fmt, add_defaults, str, LogMixin
 from lepl.stream.core import StreamHelper, OFFSET, LINE_NO, CHAR, HashKey
 
 
+try:
+    array('q')
+    # 'l' is only 32 bits on some platforms
+    _new_offsets = lambda: array('q')
+except ValueError:
+    # no 64 bit typecode before Python 3.3
+    _new_offsets = list
+
+
+class LineIndex(object):
+    '''
+    Locate lines in a text.
+    
+    The first queries scan the text directly (`count()` and `find()` are 
+    fast, but take time proportional to the offset).  Once the scanning 
+    done would have paid for it (`scans` passes over the whole text), the
+    offsets of all newlines are stored and later queries use bisection, so 
+    repeatedly locating positions in a large input does not re-scan the 
+    text.
+    
+    The text can be anything with `count()`, `find()` and `rfind()` 
+    methods (a string, bytes, or a memory-mapped file, with a matching 
+    `newline`).
+    '''
+    
+    def __init__(self, text, newline='\n', scans=64):
+        self.__text = text
+        self.__newline = newline
+        self.__offsets = None
+        self.__budget = scans * len(text)
+        
+    def _offsets(self):
+        '''The offsets of the newlines (built on the first call).'''
+        if self.__offsets is None:
+            offsets = _new_offsets()
+            (find, newline) = (self.__text.find, self.__newline)
+            offset = find(newline)
+            while offset > -1:
+                offsets.append(offset)
+                offset = find(newline, offset + 1)
+            self.__offsets = offsets
+        return self.__offsets
+    
+    def locate(self, offset):
+        '''
+        Return `(line, start, end)` where `line` is the number of newlines
+        before `offset` (zero for the first line), `start` is the offset
+        of the start of the line, and `end` the offset of the newline that
+        ends it (or the length of the text).
+        '''
+        if self.__offsets is None and self.__budget > offset:
+            self.__budget -= offset
+            (text, newline) = (self.__text, self.__newline)
+            line = text.count(newline, 0, offset)
+            start = text.rfind(newline, 0, offset) + 1
+            end = text.find(newline, offset)
+            return (line, start, end if end > -1 else len(text))
+        offsets = self._offsets()
+        line = bisect_left(offsets, offset)
+        start = offsets[line-1] + 1 if line else 0
+        end = offsets[line] if line < len(offsets) else len(self.__text)
+        return (line, start, end)
+    
+
 class BaseHelper(LogMixin, StreamHelper):
     
     def __init__(self, id=None, factory=None, max=None, global_kargs=None, 
@@ -112,6 +178,14 @@ class SequenceHelper(BaseHelper):
             begin = max(begin, 0)
             end = min(end, len(sequence))
                 
+    def _rest(self, state, max_len=60):
+        '''
+        fmt the data from state onwards.  Only enough is copied to fill
+        `max_len` (every value takes at least one character).
+        '''
+        window = self._sequence[state:state+max_len+1]
+        return self._fmt(window, 0, max_len=max_len, index=False)
+                
     def _location(self, kargs, prefix):
         '''Location (separate method so subclasses can replace).'''
         return fmt('offset {' + prefix + 'global_offset}, value {' + prefix + 'repr}',
@@ -140,7 +214,7 @@ class SequenceHelper(BaseHelper):
         offset = state + self._delta[OFFSET]
         if kargs is None: kargs = {}
         add_defaults(kargs, self._kargs, prefix=prefix)
-        within = -1 < offset < len(self._sequence)
+        within = -1 < state < len(self._sequence)
         data = self._fmt(self._sequence, state)
         text = self._fmt(self._sequence, state, index=False)
         # some values below may be already present in self._global_kargs
@@ -150,9 +224,9 @@ class SequenceHelper(BaseHelper):
                     'global_text': text,
                     'offset': state,
                     'global_offset': offset,
-                    'rest': self._fmt(self._sequence[offset:], 0, index=False),
-                    'repr': repr(self._sequence[offset]) if within else '<EOS>',
-                    'str': str(self._sequence[offset]) if within else '',
+                    'rest': self._rest(state),
+                    'repr': repr(self._sequence[state]) if within else '<EOS>',
+                    'str': str(self._sequence[state]) if within else '',
                     'line_no': 1,
                     'char': offset+1}
         add_defaults(kargs, defaults, prefix=prefix)
@@ -163,7 +237,8 @@ class SequenceHelper(BaseHelper):
         new_state = state+count
         if new_state <= len(self._sequence):
             stream = (new_state, self)
-            self.max.update(self._delta[OFFSET] + new_state - 1, stream)
+            if self.max.track:
+                self.max.update(self._delta[OFFSET] + new_state - 1, stream)
             return (self._sequence[state:new_state], stream)
         else:
             raise StopIteration
@@ -183,7 +258,8 @@ class SequenceHelper(BaseHelper):
         new_state = len(self._sequence)
         if state < new_state or (empty_ok and state == new_state):
             stream = (new_state, self)
-            self.max.update(self._delta[OFFSET] + new_state, stream)
+            if self.max.track:
+                self.max.update(self._delta[OFFSET] + new_state, stream)
             return (self._sequence[state:new_state], stream)
         else:
             raise StopIteration
@@ -225,10 +301,18 @@ class SequenceHelper(BaseHelper):
 class StringHelper(SequenceHelper):
     '''
     String-specific formatting and location.
+    
+    Line numbers and the text of the current line come from a `LineIndex`,
+    which is only built if they are needed (for errors, and for the deltas
+    of nested streams).  Context in error messages is bounded by 
+    `max_context`, so that locating an error in a long line is cheap.
     '''
 
     __counter = 0
     
+    max_context = 1000
+    '''The maximum number of characters of a line used in error messages.'''
+    
     def __init__(self, sequence, id=None, factory=None, max=None, 
                  global_kargs=None, cache_level=None, delta=None):
         # avoid duplicating processing on known strings
@@ -241,6 +325,14 @@ class StringHelper(SequenceHelper):
         super(StringHelper, self).__init__(sequence, id=id, factory=factory, 
                 max=max, global_kargs=global_kargs, cache_level=cache_level, 
                 delta=delta)
+        self.__lines = None
+        
+    @property
+    def _lines(self):
+        '''The (lazily created) line index.'''
+        if self.__lines is None:
+            self.__lines = LineIndex(self._sequence)
+        return self.__lines
 
     def _fmt(self, sequence, offset, max_len=60, left="'", right="'", index=True):
         return super(StringHelper, self)._fmt(sequence, offset, max_len=max_len, 
@@ -249,33 +341,36 @@ class StringHelper(SequenceHelper):
     def _location(self, kargs, prefix):
         return fmt('line {' + prefix + 'line_no:d}, character {' + prefix + 'char:d}', **kargs)
     
-    def delta(self, state):
-        offset = self._delta[OFFSET] + state
-        line_no = self._delta[LINE_NO] + self._sequence.count('\n', 0, state)
-        start = self._sequence.rfind('\n', 0, state)
-        if start > -1:
-            char = state - start
+    def __delta(self, state):
+        '''The delta and the limits of the line (excluding \n).'''
+        (line, start, end) = self._lines.locate(state)
+        if line:
+            char = state - start + 1
         else:
             char = self._delta[CHAR] + state
-        return (offset, line_no, char)
+        return ((self._delta[OFFSET] + state, self._delta[LINE_NO] + line, 
+                 char), start, end)
+    
+    def delta(self, state):
+        return self.__delta(state)[0]
         
     def kargs(self, state, prefix='', kargs=None):
         if kargs is None: kargs = {}
-        (_, line_no, char) = self.delta(state)
-        start = self._sequence.rfind('\n', 0, state) + 1 # omit \n
-        end = self._sequence.find('\n', state) # omit \n
+        ((_, line_no, char), start, end) = self.__delta(state)
+        # truncate long lines around the current position
+        limit = state + self.max_context
+        rest = repr(self._sequence[state:min(end, limit)])
+        if end > limit:
+            rest += '...'
+        first = max(start, state - self.max_context)
         # all is str() because passed to SyntaxError constructor
-        if end < 0:
-            rest = repr(self._sequence[state:])
-            all = str(self._sequence[start:])
-        else:
-            rest = repr(self._sequence[state:end])
-            all = str(self._sequence[start:end])
+        all = str(self._sequence[first:min(end, limit)])
         add_defaults(kargs, {
             'type': '<string>',
             'filename': '<string>',
             'rest': rest,
             'all': all,
+            'all_char': state - first + 1,
             'line_no': line_no,
             'char': char}, prefix=prefix)
         return super(StringHelper, self).kargs(state, prefix=prefix, kargs=kargs)
@@ -300,6 +395,131 @@ class StringHelper(SequenceHelper):
                             max=max, global_kargs=self.global_kargs, 
                             delta=self.delta(state))
         
+
+class IncrementalHelper(StringHelper):
+    '''
+    A string helper that records how far the text has been read (as
+    `horizon`), so that memoised results can be re-used after the text is
+    edited (see `ParseSession`).
+    
+    Finding the end of the text counts as reading one character past the 
+    end (results that depend on where the text ends must not be re-used 
+    when text is added there).  Each instance has a new id, so that memoised
+    results for different versions of the text are not confused.
+    '''
+    
+    __ids = count(1)
+    
+    def __init__(self, sequence, id=None, factory=None, max=None, 
+                 global_kargs=None, cache_level=None, delta=None, mark=None):
+        if id is None:
+            id = next(IncrementalHelper.__ids)
+        super(IncrementalHelper, self).__init__(sequence, id=id, 
+                factory=factory, max=max, global_kargs=global_kargs, 
+                cache_level=cache_level, delta=delta)
+        # shared with the copies made by new_max()
+        self.__mark = [0] if mark is None else mark
+        self.__eos = len(sequence) + 1
+        
+    @property
+    def horizon(self):
+        return self.__mark[0]
+    
+    @horizon.setter
+    def horizon(self, horizon):
+        self.__mark[0] = horizon
+        
+    def __read(self, end):
+        '''Record that the text was read up to `end`.'''
+        if end > self.__mark[0]:
+            self.__mark[0] = end
+            
+    def next(self, state, count=1):
+        self.__read(min(state + count, self.__eos))
+        return super(IncrementalHelper, self).next(state, count)
+    
+    def empty(self, state):
+        self.__read(min(state + 1, self.__eos))
+        return super(IncrementalHelper, self).empty(state)
+    
+    def line(self, state, empty_ok):
+        '''As for `StringHelper`, but the newline is found only once.'''
+        max_len = len(self._sequence)
+        end = self._sequence.find('\n', state) + 1
+        self.__read(end if end else self.__eos)
+        if state < max_len or (empty_ok and state == max_len):
+            if not end: end = max_len
+            return (self._sequence[state:end], (end, self))
+        else:
+            raise StopIteration
+        
+    def len(self, state):
+        self.__read(self.__eos)
+        return super(IncrementalHelper, self).len(state)
+        
+    def new_max(self, state):
+        return (self.max,
+                (state, IncrementalHelper(self._sequence, id=self.id, 
+                                          factory=self.factory, max=None,
+                                          global_kargs=self.global_kargs, 
+                                          delta=self._delta, 
+                                          mark=self.__mark)))
+
+    
+class BytesHelper(SequenceHelper):
+    '''
+    Bytes-specific formatting, and a zero-copy `line()`.
+    
+    The data are bytes or a bytearray (values from `next()` have the same 
+    type).  There are no lines, so `line()` returns the rest of the data 
+    and is used by regular expressions to scan ahead; this is a `memoryview`
+    (indexing gives integer byte values, which is what the `ByteAlphabet` 
+    expects), so no data are copied.  Note that a bytearray cannot be 
+    resized while such views exist.
+    '''
+
+    __ids = count(1)
+    
+    def __init__(self, sequence, id=None, factory=None, max=None, 
+                 global_kargs=None, cache_level=None, delta=None):
+        if id is None:
+            try:
+                id = hash(sequence)
+            except TypeError:
+                # a bytearray; each needs a new id (for memoisation)
+                id = next(BytesHelper.__ids)
+        super(BytesHelper, self).__init__(sequence, id=id, factory=factory, 
+                max=max, global_kargs=global_kargs, cache_level=cache_level, 
+                delta=delta)
+        self._view = memoryview(sequence)
+        
+    def _fmt(self, sequence, offset, max_len=60, left="b'", right="'", index=True):
+        if isinstance(sequence, bytearray):
+            (left, right) = ("bytearray(b'", "')")
+        return super(BytesHelper, self)._fmt(sequence, offset, max_len=max_len, 
+                                             left=left, right=right, index=index)
+        
+    def join(self, state, *values):
+        assert values, 'Cannot join zero byte sequences'
+        return values[0][:0].join(values)
+    
+    def line(self, state, empty_ok):
+        '''
+        Returns a view of the rest of the data.  As for `StringHelper`, the
+        deepest match is not updated (the caller, eg. a regular expression,
+        uses less than the whole line).
+        '''
+        new_state = len(self._sequence)
+        if state < new_state or (empty_ok and state == new_state):
+            return (self._view[state:new_state], (new_state, self))
+        else:
+            raise StopIteration
+        
+    def stream(self, state, value, id_=None, max=None):
+        if isinstance(value, memoryview):
+            value = value.tobytes()
+        return super(BytesHelper, self).stream(state, value, id_=id_, max=max)
+        
     
 class ListHelper(SequenceHelper):
     '''
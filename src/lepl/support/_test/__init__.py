@@ -41,4 +41,5 @@ import lepl.support._test.graph
 import lepl.support._test.lib
 import lepl.support._test.list
 import lepl.support._test.node
+import lepl.support._test.state
 import lepl.support._test.timer
@@ -37,7 +37,7 @@ from unittest import TestCase
 from lepl import *
 from lepl._test.base import assert_str
 from lepl.support.list import clone_sexpr, count_sexpr, join, \
-    sexpr_flatten, sexpr_to_str
+    sexpr_flatten, sexpr_to_str, sexpr_leaves, sexpr_tree_lines
 
 
 class FoldTest(TestCase):
@@ -87,6 +87,50 @@ class FoldTest(TestCase):
         test(Foo([1,2,(3,List([4]))]), 'Foo([1,2,(3,List([4]))])')
 
 
+class DeepTest(TestCase):
+    
+    def deep(self, depth):
+        list_ = List([depth])
+        for i in range(depth-1, -1, -1):
+            list_ = List([i, list_])
+        return list_
+    
+    def test_fold(self):
+        deep = self.deep(5000)
+        assert count_sexpr(deep) == 5001
+        assert sexpr_flatten(deep) == list(range(5001))
+        copy = clone_sexpr(deep)
+        assert type(copy) is List
+        assert sexpr_flatten(copy) == list(range(5001))
+        assert sexpr_to_str(self.deep(2)) == 'List([0,List([1,List([2])])])'
+        
+    def test_throw(self):
+        deep = self.deep(5000)
+        deep[1][1][1].append(Error('oops', {}))
+        try:
+            sexpr_throw(deep)
+            assert False, 'expected error'
+        except Error as e:
+            assert e.msg == 'oops', e.msg
+        
+    def test_leaves(self):
+        leaves = sexpr_leaves([[1, 'two'], ({'three': 3},), [[]]])
+        assert next(leaves) == 1
+        assert list(leaves) == ['two', 'three', 3]
+        
+    def test_tree(self):
+        text = str(self.deep(2))
+        assert_str(text, """List
+ +- 0
+ `- List
+     +- 1
+     `- List
+         `- 2""")
+        lines = sexpr_tree_lines(self.deep(5000))
+        assert next(lines) == 'List'
+        assert len(list(lines)) == 10001
+        
+        
 class AstTest(TestCase):
     
     def test_ast(self):
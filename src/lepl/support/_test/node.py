@@ -37,6 +37,7 @@ from unittest import TestCase
 from lepl import Delayed, Digit, Any, Node, make_error, node_throw, Or, Space, \
     AnyBut, Eos
 from lepl.support.graph import order, PREORDER, POSTORDER, LEAF
+from lepl.support.node import MutableNode
 from lepl._test.base import assert_str
 
 
@@ -267,4 +268,57 @@ class NodeEqualityTest(TestCase):
         assert Node(a) != a
         assert Node(a)._recursively_eq(Node(a))
         assert not Node(a)._recursively_eq(a)
-        
\ No newline at end of file
+        
+
+class AttributeTest(TestCase):
+    
+    def test_named(self):
+        n = Node(('foo', 23), ('bar', 'baz'), 43, ('foo', 'again'))
+        assert n.foo == [23, 'again'], n.foo
+        assert n.bar == ['baz'], n.bar
+        assert n.foo is n.foo
+        assert sorted(dir(n)) == ['bar', 'foo'], dir(n)
+        assert n[:] == [23, 'baz', 43, 'again'], n[:]
+        
+    def test_missing(self):
+        n = Node('a', ('foo', 1))
+        assert not hasattr(n, 'bar')
+        assert not hasattr(Node('a'), 'foo')
+        assert dir(Node('a')) == [], dir(Node('a'))
+        
+    def test_subclass(self):
+        class Term(Node): pass
+        n = Node(Term('a'), ('other', Node('b')), 'c')
+        assert len(n.Term) == 1 and n.Term[0][0] == 'a', n.Term
+        assert type(n.other[0]).__name__ == 'other', n.other
+        (args, kargs) = n._constructor_args()
+        assert args[0] is n[0], args
+        assert args[1] is n.other[0], args
+        assert args[2] == 'c', args
+        assert kargs == {}, kargs
+        
+    def test_mutable(self):
+        n = MutableNode('a', ('foo', 1))
+        assert n.foo == [1], n.foo
+        n[1] = 2
+        assert n[:] == ['a', 2], n[:]
+        assert n.foo == [2], n.foo
+        
+    def test_compact(self):
+        n = Node('a', 'b')
+        assert not hasattr(n, '_log')
+        assert set(n.__dict__) == \
+            set(['_Node__children', '_Node__names', '_Node__index']), \
+            n.__dict__
+
+
+class DeepNodeTest(TestCase):
+    
+    def test_deep(self):
+        node = Node('end')
+        for i in range(5000):
+            node = Node(i, node)
+        lines = str(node).split('\n')
+        assert len(lines) == 10002, len(lines)
+        assert lines[-1].endswith("`- 'end'"), lines[-1]
+        assert node_throw(node) is node
@@ -0,0 +1,84 @@
+
+# The contents of this file are subject to the Mozilla Public License
+# (MPL) Version 1.1 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License
+# at http://www.mozilla.org/MPL/
+#
+# Software distributed under the License is distributed on an "AS IS"
+# basis, WITHOUT WARRANTY OF ANY KIND, either express or implied. See
+# the License for the specific language governing rights and
+# limitations under the License.
+#
+# The Original Code is LEPL (http://www.acooke.org/lepl)
+# The Initial Developer of the Original Code is Andrew Cooke.
+# Portions created by the Initial Developer are Copyright (C) 2009-2010
+# Andrew Cooke (andrew@acooke.org). All Rights Reserved.
+#
+# Alternatively, the contents of this file may be used under the terms
+# of the LGPL license (the GNU Lesser General Public License,
+# http://www.gnu.org/licenses/lgpl.html), in which case the provisions
+# of the LGPL License are applicable instead of those above.
+#
+# If you wish to allow use of your version of this file only under the
+# terms of the LGPL License and not to allow others to use your version
+# of this file under the MPL, indicate your decision by deleting the
+# provisions above and replace them with the notice and other provisions
+# required by the LGPL License.  If you do not delete the provisions
+# above, a recipient may use your version of this file under either the
+# MPL or the LGPL License.
+
+'''
+Tests for the lepl.support.state module.
+'''
+
+from unittest import TestCase
+
+from lepl.lexer.lines.monitor import BlockMonitor
+from lepl.support.state import State
+
+
+# pylint: disable-msg=C0103, C0111, C0301, W0702, C0324, R0201, R0913
+# (dude this is just a test)
+
+
+class StateTest(TestCase):
+    
+    def test_hash(self):
+        '''
+        The incrementally updated hash matches the combined entries.
+        '''
+        state = State()
+        assert hash(state) == 0
+        state['a'] = 1
+        state['b'] = 2
+        assert state.hash == hash('a') ^ hash(1) ^ hash('b') ^ hash(2)
+        state['a'] = 3
+        assert state.hash == hash('a') ^ hash(3) ^ hash('b') ^ hash(2)
+        del state['b']
+        assert state.hash == hash('a') ^ hash(3)
+        assert 'b' not in state
+        del state['a']
+        assert state.hash == 0
+        
+    def test_block_scope(self):
+        '''
+        Block levels are restored when popped, so a nested parse does not
+        change the state seen by an outer parse.
+        '''
+        state = State.singleton()
+        initial = state.hash
+        outer = BlockMonitor()
+        outer.push_level(4)
+        assert state[BlockMonitor] == 4
+        outer_hash = state.hash
+        inner = BlockMonitor()
+        inner.push_level(2)
+        inner.push_level(6)
+        assert state[BlockMonitor] == 6
+        inner.pop_level()
+        inner.pop_level()
+        assert state[BlockMonitor] == 4
+        assert state.hash == outer_hash
+        outer.pop_level()
+        assert BlockMonitor not in state
+        assert state.hash == initial
@@ -35,6 +35,7 @@ from unittest import TestCase
 
 from lepl import *
 from lepl.support.lib import StringIO
+from lepl.support.timer import compare
 
 
 class TimerTest(TestCase):
@@ -80,3 +81,23 @@ class TimerTest(TestCase):
         print(table)
         assert 'Timing Results' in table, table
         
+
+
+class CompareTest(TestCase):
+    
+    def test_compare(self):
+        key = lambda result: result['name']
+        old = [{'name': 'a', 'time': 1.0, 'error': None},
+               {'name': 'b', 'time': 1.0, 'error': None},
+               {'name': 'c', 'time': 1.0, 'error': None},
+               {'name': 'd', 'time': None, 'error': 'bad'}]
+        new = [{'name': 'a', 'time': 1.1, 'error': None},
+               {'name': 'b', 'time': 2.0, 'error': None},
+               {'name': 'c', 'time': None, 'error': 'bad'},
+               {'name': 'd', 'time': 1.0, 'error': None},
+               {'name': 'e', 'time': 9.0, 'error': None}]
+        assert compare(old, new, key, 1.2, 'time') == \
+            [('b', 1.0, 2.0), ('c', 1.0, 'bad')]
+        # small differences are ignored
+        assert compare(old, new, key, 1.2, 'time', minimum=1.5) == \
+            [('c', 1.0, 'bad')]
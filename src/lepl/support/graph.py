@@ -296,6 +296,31 @@ class ArgAsAttributeMixin(ConstructorGraphNode):
         '''
         return (self.__args(), self.__kargs())
 
+    def _arguments_like(self, other, args, kargs):
+        '''
+        Set arguments using the names from another instance, given arguments
+        in the form returned by `_constructor_args()`.  Returns False (and
+        sets nothing) if they do not match the names.
+        '''
+        names = [name for name in other.__arg_names 
+                 if not name.startswith('*')]
+        varargs = [name[1:] for name in other.__arg_names 
+                   if name.startswith('*')]
+        if len(varargs) > 1 or len(args) < len(names) \
+                or (len(args) > len(names) and not varargs) \
+                or len(kargs) != len(other.__karg_names) \
+                or any(name not in kargs for name in other.__karg_names):
+            return False
+        for (name, value) in zip(names, args):
+            setattr(self, name, value)
+        for name in varargs:
+            setattr(self, name, tuple(args[len(names):]))
+        for name in other.__karg_names:
+            setattr(self, name, kargs[name])
+        self.__arg_names = list(other.__arg_names)
+        self.__karg_names = list(other.__karg_names)
+        return True
+
     def __iter__(self):
         '''
         Return all children, in order.
@@ -480,6 +505,56 @@ class _LineOverflow(Exception):
     pass
 
 
+class _Branch(object):
+    '''
+    The function generated by `GraphStr` for a node.
+
+    Called with the prefixes for the first line and the rest, and the name
+    (if any), this generates the ASCII picture of the node and its children.
+    Child branches are expanded with an explicit stack rather than by
+    calling them, so deep graphs do not hit Python's recursion limit.
+
+    Does this need to be so complex - see my answer at
+    https://www.quora.com/Is-there-an-easy-way-to-print-trees-with-nodes-and-lines-maybe
+    '''
+
+    def __init__(self, type_, args, kargs):
+        self.type_ = type_
+        self.__args = args
+        self.__kargs = kargs
+
+    def _spec(self):
+        '''
+        Generate (first, rest, name, function) for each child.
+        '''
+        spec = []
+        for arg in self.__args:
+            spec.append((' +- ', ' |  ', '', arg))
+        for arg in self.__kargs:
+            spec.append((' +- ', ' |  ', arg, self.__kargs[arg]))
+        # fix the last branch
+        if spec:
+            spec[-1] = (' `- ', '    ', spec[-1][2], spec[-1][3])
+        return iter(spec)
+
+    def __call__(self, first, rest, name):
+        yield first + name + (' ' if name else '') + self.type_
+        stack = [(rest, self._spec())]
+        while stack:
+            (prefix, spec) = stack[-1]
+            for (first_, rest_, name_, fun_) in spec:
+                if isinstance(fun_, _Branch):
+                    yield prefix + first_ + name_ + (' ' if name_ else '') \
+                        + fun_.type_
+                    stack.append((prefix + rest_, fun_._spec()))
+                    break
+                else:
+                    for line in fun_(first_, rest_, name_):
+                        yield prefix + line
+            else:
+                stack.pop()
+
+
 class GraphStr(Visitor):
     '''
     Generate an ASCII graph of the nodes.
@@ -522,30 +597,7 @@ class GraphStr(Visitor):
         Generate a function that can construct the local section of the
         graph when given the appropriate prefixes.
         '''
-        def fun(first, rest, name, type_=self._type):
-            '''
-            Build the ASCII picture; this is rather terse...  First is the
-            prefix to the first line; rest is the prefix to the rest.  Args
-            and Kargs are the equivalent functions for the constructor
-            arguments; we evaluate them here as we "expend" the ASCII
-            picture.
-
-            Does this need to be so complex - see my answer at
-            https://www.quora.com/Is-there-an-easy-way-to-print-trees-with-nodes-and-lines-maybe
-            '''
-            spec = []
-            for arg in args:
-                spec.append((' +- ', ' |  ', '', arg))
-            for arg in kargs:
-                spec.append((' +- ', ' |  ', arg, kargs[arg]))
-            # fix the last branch
-            if spec:
-                spec[-1] = (' `- ', '    ', spec[-1][2], spec[-1][3])
-            yield first + name + (' ' if name else '') + type_
-            for (first_, rest_, name_, fun_) in spec:
-                for line in fun_(first_, rest_, name_):
-                    yield rest + line
-        return fun
+        return _Branch(self._type, args, kargs)
 
     def leaf(self, value):
         '''
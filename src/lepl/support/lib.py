@@ -47,6 +47,7 @@ if PYTHON3:
     bytes = bytes
     basestring = str
     file = IOBase
+    from functools import reduce
 else:
     chr = unichr
     bytes = lambda x, s=str: s(bytearray(x))
@@ -55,6 +56,8 @@ else:
     file = file
     from StringIO import StringIO
 
+from functools import reduce
+
 
 def assert_type(name, value, type_, none_ok=False):
     '''
@@ -32,7 +32,7 @@ Support for S-expression ASTs using subclasses of Python's list class.
 The general support works with any nested iterables (except strings).
 '''
 
-from functools import reduce
+from itertools import chain
 
 from lepl.support.lib import fmt, basestring
 from lepl.support.node import Node
@@ -66,6 +66,21 @@ def clone_iterable(type_, items):
         return type_(items)
     
 
+def _sublist(item, exclude):
+    '''
+    An iterator over the contents of item, or None if it is an atomic value.
+    '''
+    try:
+        if not exclude(item):
+            if isinstance(item, dict):
+                return iter(item.items())
+            else:
+                return iter(item)
+    except TypeError:
+        pass
+    return None
+
+
 def sexpr_fold(per_list=None, per_item=None, 
                exclude=lambda x: isinstance(x, basestring)):
     '''
@@ -75,33 +90,64 @@ def sexpr_fold(per_list=None, per_item=None,
     (see comments later).
     
     We divide everything into iterables ("lists") and atomic values ("items").
-    per_list is called with a generator over the (transformed) top-most list, 
-    in order.  Items (ie atomic values) in that list, when requested from the 
-    generator, will be processed by per_item; iterables will be processed by a 
-    separate call to per_list (ie recursively).
+    per_list is called with an iterator over the (transformed) top-most list, 
+    in order.  Items (ie atomic values) in that list have been processed by 
+    per_item; iterables have been processed by a separate call to per_list.
     
     So this is more like a recursive map than a fold, but with Python's 
     mutable state and lack of typing it appears to be equally powerful.
     Note that per_list is passed the previous type, which can be used for
     dispatching operations.
+    
+    The traversal uses an explicit stack (rather than recursion), so deeply
+    nested lists do not hit Python's recursion limit.  Lists are processed
+    in postorder: all the contents of a list are transformed before per_list
+    is called for that list.
     '''
     if per_list is None:
         per_list = clone_iterable
     if per_item is None:
         per_item = lambda x: x
-    def items(iterable):
-        for item in iterable:
-            try:
-                if not exclude(item):
-                    if isinstance(item, dict):
-                        yield per_list(type(item), items(item.items()))
-                    else:
-                        yield per_list(type(item), items(iter(item)))
-                    continue
-            except TypeError:
-                pass
-            yield per_item(item)
-    return lambda list_: per_list(type(list_), items(iter(list_)))
+    def fold(list_):
+        '''
+        Each stack entry is the type of a list, an iterator over the list's
+        contents, and the values generated so far.
+        '''
+        stack = [(type(list_), iter(list_), [])]
+        while True:
+            (type_, items, values) = stack[-1]
+            for item in items:
+                contents = _sublist(item, exclude)
+                if contents is None:
+                    values.append(per_item(item))
+                else:
+                    stack.append((type(item), contents, []))
+                    break
+            else:
+                stack.pop()
+                value = per_list(type_, iter(values))
+                if not stack:
+                    return value
+                stack[-1][2].append(value)
+    return fold
+
+
+def sexpr_leaves(list_, exclude=lambda x: isinstance(x, basestring)):
+    '''
+    Generate the atomic values in a nested list, in order (this is a 
+    streaming version of `sexpr_flatten`).
+    '''
+    stack = [iter(list_)]
+    while stack:
+        for item in stack[-1]:
+            contents = _sublist(item, exclude)
+            if contents is None:
+                yield item
+            else:
+                stack.append(contents)
+                break
+        else:
+            stack.pop()
 
 
 clone_sexpr = sexpr_fold()
@@ -109,28 +155,31 @@ clone_sexpr = sexpr_fold()
 Clone a set of listed iterables.
 '''
 
-count_sexpr = sexpr_fold(per_list=lambda type_, items: sum(items), 
-                         per_item=lambda item: 1)
-'''
-Count the number of value nodes in an AST.
-
-(Note that size(List) gives the number of entries in that list, counting each
-sublist as "1", while this descends embedded lists, counting their non-iterable
-contents.  
-'''
+def count_sexpr(list_):
+    '''
+    Count the number of value nodes in an AST.
+    
+    (Note that size(List) gives the number of entries in that list, counting 
+    each sublist as "1", while this descends embedded lists, counting their 
+    non-iterable contents.  
+    '''
+    count = 0
+    for _item in sexpr_leaves(list_):
+        count += 1
+    return count
 
-join = lambda items: reduce(lambda x, y: x+y, items, [])
+join = lambda items: list(chain.from_iterable(items))
 '''
 Flatten a list of lists by one level, so [[1],[2, [3]]] becomes [1,2,[3]].
 
 Note: this will *only* work correctly if all entries are lists.
 '''
 
-sexpr_flatten = sexpr_fold(per_list=lambda type_, items: join(items),
-                           per_item=lambda item: [item])
-'''
-Flatten a list completely, so [[1],[2, [3]]] becomes [1,2,3]
-'''
+def sexpr_flatten(list_):
+    '''
+    Flatten a list completely, so [[1],[2, [3]]] becomes [1,2,3]
+    '''
+    return list(sexpr_leaves(list_))
 
 _fmt = {list: '[{1}]', tuple: '({1})'}
 
@@ -142,29 +191,48 @@ sexpr_to_str = sexpr_fold(per_list=lambda type_, items:
 A flat representation of nested lists (a set of constructors).
 '''
 
+def _mark_last(items):
+    '''
+    Generate (item, is_last) pairs.
+    '''
+    items = iter(items)
+    try:
+        previous = next(items)
+    except StopIteration:
+        return
+    for item in items:
+        yield (previous, False)
+        previous = item
+    yield (previous, True)
+
+
+def sexpr_tree_lines(list_, exclude=lambda x: isinstance(x, basestring)):
+    '''
+    Generate the lines of `sexpr_to_tree()` one at a time (so that large
+    trees can be written without building the whole text).
+    '''
+    yield type(list_).__name__
+    stack = [('', _mark_last(list_))]
+    while stack:
+        (prefix, items) = stack[-1]
+        for (item, last) in items:
+            (first, rest) = (' `- ', '    ') if last else (' +- ', ' |  ')
+            contents = _sublist(item, exclude)
+            if contents is None:
+                yield prefix + first + repr(item)
+            else:
+                yield prefix + first + type(item).__name__
+                stack.append((prefix + rest, _mark_last(contents)))
+                break
+        else:
+            stack.pop()
+
+
 def sexpr_to_tree(list_):
     '''
-    Generate a tree using the same "trick" as `GraphStr`.
-    
-    The initial fold returns a function (str, str) -> list(str) at each
-    level.
-    '''
-    def per_item(item):
-        #noinspection PyUnusedLocal
-        def fun(first, _rest):
-            return [first + repr(item)]
-        return fun
-    def per_list(type_, list_):
-        def fun(first, rest):
-            yield [first + str(type_.__name__)]
-            force = list(list_) # need to access last item explicitly
-            if force:
-                for item in force[:-1]:
-                    yield item(rest + ' +- ', rest + ' |  ')
-                yield force[-1](rest + ' `- ', rest + '    ')
-        return lambda first, rest: join(list(fun(first, rest)))
-    fold = sexpr_fold(per_list, per_item)
-    return '\n'.join(fold(list_)('', ''))
+    Generate a tree using the same layout as `GraphStr`.
+    '''
+    return '\n'.join(sexpr_tree_lines(list_))
 
 
 def sexpr_throw(node):
@@ -32,7 +32,7 @@ Base classes for AST nodes (and associated functions).
 
 from lepl.support.graph import GraphStr, ConstructorGraphNode, ConstructorWalker,\
     postorder
-from lepl.support.lib import LogMixin, basestring, fmt
+from lepl.support.lib import basestring, fmt
 
 
 class NodeException(Exception):
@@ -73,7 +73,7 @@ def coerce(arg):
         return arg
     
 
-class Node(LogMixin, ConstructorGraphNode):
+class Node(ConstructorGraphNode):
     '''
     A base class for AST nodes.
 
@@ -120,6 +120,11 @@ class Node(LogMixin, ConstructorGraphNode):
     However, a named pair with a Node as a value is coerced into a subclass of
     Node with the given name (this keeps Nodes connected into a single tree and
     so simplifies traversal).
+    
+    Parsers can create very many nodes, so each instance stores only the 
+    list of children and (if any child is named) a parallel list of names.
+    The lists of named values are built on the first attribute lookup and
+    the walker used by ``str()`` is created when needed.
     '''
     
     def __init__(self, *args):
@@ -128,53 +133,55 @@ class Node(LogMixin, ConstructorGraphNode):
         the ``>`` operator.
         '''
         super(Node, self).__init__()
-        self.__postorder = ConstructorWalker(self, Node)
-        self.__children = []
-        self.__paths = []
-        self.__names = set()
+        children = []
+        names = None
         for arg in map(coerce, args):
             if is_named(arg):
-                self.__add_named_child(arg[0], arg[1])
+                (name, arg) = arg
             elif isinstance(arg, Node):
-                self.__add_named_child(arg.__class__.__name__, arg)
+                name = arg.__class__.__name__
             else:
-                self.__add_anon_child(arg)
-        
-    def __add_named_child(self, name, value):
-        '''
-        Add a value associated with a name (either a named pair or the class
-        of a Node subclass).
-        '''
-        index = self.__add_attribute(name, value)
-        self.__children.append(value)
-        self.__paths.append((name, index))
+                name = None
+            if name is not None and names is None:
+                names = [None] * len(children)
+            children.append(arg)
+            if names is not None:
+                names.append(name)
+        self.__children = children
+        self.__names = names
+        self.__index = None
         
-    def __add_anon_child(self, value):
-        '''
-        Add a nameless value.
-        '''
-        index = len(self.__children)
-        self.__children.append(value)
-        self.__paths.append(index)
-            
-    def __add_attribute(self, name, value):
+    def __attributes(self):
         '''
-        Attributes are associated with lists of (named) values.
+        Attributes are associated with lists of (named) values.  These are 
+        constructed (once) on demand.
         '''
-        if name not in self.__names:
-            self.__names.add(name)
-            setattr(self, name, [])
-        attr = getattr(self, name)
-        index = len(attr)
-        attr.append(value)
-        return index
+        if self.__index is None:
+            index = {}
+            if self.__names:
+                for (name, value) in zip(self.__names, self.__children):
+                    if name is not None:
+                        index.setdefault(name, []).append(value)
+            self.__index = index
+        return self.__index
+    
+    def __getattr__(self, name):
+        # called only when normal lookup fails; the guard avoids recursion
+        # when the node is not yet initialised (eg. during unpickling)
+        if not name.startswith('_Node__'):
+            try:
+                return self.__attributes()[name]
+            except KeyError:
+                pass
+        raise AttributeError(fmt('{0} has no attribute {1!r}', 
+                                 self.__class__.__name__, name))
         
     def __dir__(self):
         '''
         The names of all the attributes constructed from the results.
         '''
         # this must return a list, not an iterator (Python requirement)
-        return list(self.__names)
+        return list(self.__attributes())
     
     def __getitem__(self, index):
         return self.__children[index]
@@ -184,7 +191,7 @@ class Node(LogMixin, ConstructorGraphNode):
     
     def __str__(self):
         visitor = NodeTreeStr()
-        return self.__postorder(visitor)
+        return ConstructorWalker(self, Node)(visitor)
     
     def __repr__(self):
         return self.__class__.__name__ + '(...)'
@@ -230,18 +237,23 @@ class Node(LogMixin, ConstructorGraphNode):
         '''
         Regenerate the constructor arguments (returns (args, kargs)).
         '''
+        if not self.__names:
+            return (list(self.__children), {})
         args = []
-        for (path, value) in zip(self.__paths, self.__children):
-            if isinstance(path, int):
+        for (name, value) in zip(self.__names, self.__children):
+            if name is None or name == value.__class__.__name__:
                 args.append(value)
             else:
-                name = path[0]
-                if name == value.__class__.__name__:
-                    args.append(value)
-                else:
-                    args.append((name, value))
+                args.append((name, value))
         return (args, {})
     
+    def _set_child(self, index, value):
+        '''
+        Replace a child (the name, if any, is unchanged).
+        '''
+        self.__children[index] = value
+        self.__index = None
+    
     
 class MutableNode(Node):
     '''
@@ -249,7 +261,7 @@ class MutableNode(Node):
     '''
     
     def __setitem__(self, index, value):
-        self.__children[index] = value
+        self._set_child(index, value)
         
         
 class NodeTreeStr(GraphStr):
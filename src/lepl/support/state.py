@@ -54,7 +54,9 @@ from lepl.support.lib import singleton
 class State(local):
     '''
     A thread local map from key (typically calling class) to value.  The hash
-    attribute is updated on each mutation and cached for rapid access. 
+    attribute is updated on each mutation (in constant time) and can be used
+    directly as an integer that identifies the current state (eg when
+    constructing memoisation keys). 
     '''
     
     def __init__(self):
@@ -63,7 +65,7 @@ class State(local):
         '''
         super(State, self).__init__()
         self.__map = {}
-        self.hash = self.__hash()
+        self.hash = 0
         
     @classmethod
     def singleton(cls):
@@ -72,14 +74,13 @@ class State(local):
         '''
         return singleton(cls)
     
-    def __hash(self):
+    @staticmethod
+    def __entry(key, value):
         '''
-        Calculate the hash for the current dict.
+        The contribution of a single entry to the hash (entries are combined
+        with XOR, so an entry can be removed by repeating the operation).
         '''
-        value = 0
-        for key in self.__map:
-            value ^= hash(key) ^ hash(self.__map[key])
-        return value
+        return hash(key) ^ hash(value)
         
     def __getitem__(self, key):
         return self.__map[key]
@@ -90,13 +91,17 @@ class State(local):
         '''
         return self.__map.get(key, default)
     
+    def __contains__(self, key):
+        return key in self.__map
+    
     def __setitem__(self, key, value):
+        if key in self.__map:
+            self.hash ^= self.__entry(key, self.__map[key])
         self.__map[key] = value
-        self.hash = self.__hash()
+        self.hash ^= self.__entry(key, value)
     
     def __delitem__(self, key):
-        del self.__map[key]
-        self.hash = self.__hash()
+        self.hash ^= self.__entry(key, self.__map.pop(key))
        
     def __hash__(self):
         return self.hash
@@ -33,6 +33,11 @@ Support for measuring the speed of different parsers and configurations.
 from time import time
 from sys import stdout
 from gc import collect
+from json import dump, load
+try:
+    from tracemalloc import start, stop, get_traced_memory, is_tracing
+except ImportError:
+    start = None
 
 from lepl.support.lib import fmt
 
@@ -146,3 +151,77 @@ def print_timing(input, matchers, count=10, count_compile=None, best_of=3,
                 
     _print()
     
+
+
+# the following are shared by the benchmark suites (lepl._performance.suite
+# and lepl.rxpy._bench.suite)
+
+def best_of(repeat, function, before=None):
+    '''
+    The shortest time taken to call the function (`before` is called,
+    untimed, before each call).
+    '''
+    best = None
+    for _i in range(repeat):
+        if before:
+            before()
+        collect()
+        begin = time()
+        function()
+        elapsed = time() - begin
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def peak_memory(function):
+    '''
+    The peak memory (in kB) allocated while calling the function, or None 
+    (if `tracemalloc` is not available, or is already in use).
+    '''
+    if start is None or is_tracing():
+        return None
+    collect()
+    start()
+    try:
+        function()
+        return get_traced_memory()[1] / 1024.0
+    finally:
+        stop()
+
+
+def compare(old, new, key, threshold, field, minimum=0):
+    '''
+    Compare two lists of results (dicts, identified by the function `key`),
+    returning `(key, old, new)` for those where the value of `field` is 
+    larger than `threshold` times the old value (and larger by more than 
+    `minimum`, so that noise in very small values is ignored), or where an 
+    old success (no value for "error") is now an error.
+    '''
+    previous = dict((key(result), result) for result in old)
+    regressions = []
+    for result in new:
+        before = previous.get(key(result))
+        if before is None or before['error']:
+            continue
+        if result['error']:
+            regressions.append((key(result), before[field], result['error']))
+        elif result[field] > threshold * before[field] and \
+                result[field] - before[field] > minimum:
+            regressions.append((key(result), before[field], result[field]))
+    return regressions
+
+
+def save_json(results, path):
+    '''
+    Save results as JSON.
+    '''
+    with open(path, 'w') as output:
+        dump(results, output, indent=1, sort_keys=True)
+
+
+def load_json(path):
+    '''
+    Load results saved by `save_json()`.
+    '''
+    with open(path) as source:
+        return load(source)